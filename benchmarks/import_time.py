@@ -0,0 +1,63 @@
+"""
+Import-time regression benchmark for the llm-jina plugin.
+
+llm imports every installed plugin on each invocation, so whatever
+``import llm_jina`` costs is added to ``llm --help`` and every other command.
+This runs ``python -X importtime`` in fresh interpreters, reports the median
+time spent importing llm_jina on top of llm itself, and checks that the HTTP
+stacks are not imported until a Jina command or model is used.
+
+    python benchmarks/import_time.py --runs 7 --max-ms 40
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+
+# Modules that must only be imported once a Jina command or model runs.
+LAZY_MODULES = ("requests", "httpx", "urllib3", "multiprocessing", "llm_jina.client", "llm_jina.commands")
+
+def import_time_us() -> int:
+    """Cumulative microseconds spent importing llm_jina in a fresh interpreter."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import llm; import llm_jina"],
+        capture_output=True, text=True, check=True,
+    )
+    for line in result.stderr.splitlines():
+        parts = [part.strip() for part in line.split("|")]
+        if len(parts) == 3 and parts[2] == "llm_jina":
+            return int(parts[1])
+    raise RuntimeError("llm_jina not found in -X importtime output")
+
+def eager_modules():
+    """Lazy modules that are nevertheless imported by loading the plugin."""
+    code = (
+        "import sys, llm, llm_jina\n"
+        "llm_jina.register_embedding_models(lambda model, aliases=(): None)\n"
+        f"print(' '.join(m for m in {LAZY_MODULES!r} if m in sys.modules))\n"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return result.stdout.split()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters to time")
+    parser.add_argument("--max-ms", type=float, help="fail if the median import time exceeds this")
+    args = parser.parse_args()
+
+    times = sorted(import_time_us() / 1000 for _ in range(args.runs))
+    median = statistics.median(times)
+    print(f"import llm_jina: median {median:.1f} ms (min {times[0]:.1f}, max {times[-1]:.1f}) over {args.runs} runs")
+
+    failed = False
+    eager = eager_modules()
+    if eager:
+        print(f"FAIL: imported at plugin load: {', '.join(eager)}")
+        failed = True
+    if args.max_ms is not None and median > args.max_ms:
+        print(f"FAIL: median import time above {args.max_ms} ms")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+"""
+Local stand-in for the Jina API, for offline benchmarks.
+
+Serves the embeddings, rerank, classify, reader, search and segment endpoints
+with canned responses shaped like the real ones. Latency, payload sizes and
+the share of requests rejected with 429 are configurable:
+
+    python benchmarks/mock_server.py --port 8765 --latency-ms 20 --rate-429 0.05
+
+Paths mirror the real hosts: ``/v1/embeddings``, ``/v1/rerank``,
+``/v1/classify``, ``/reader/``, ``/search/`` and ``/segment/``. Request bodies
+may be gzip or brotli encoded; with ``--compress-responses`` responses are
+too, when the client accepts it. ``GET /_stats`` returns the request and
+response body bytes seen on the wire so far.
+"""
+import argparse
+import array
+import base64
+import functools
+import gzip
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+class MockConfig:
+    def __init__(self, latency_ms=0.0, jitter_ms=0.0, dimensions=1024, content_bytes=20000, rate_429=0.0, seed=0,
+                 compress_responses=False):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.dimensions = dimensions
+        self.content_bytes = content_bytes
+        self.rate_429 = rate_429
+        self.compress_responses = compress_responses
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.stats = {"requests": 0, "bytes_in": 0, "bytes_out": 0}
+
+    def count(self, bytes_in, bytes_out):
+        with self.lock:
+            self.stats["requests"] += 1
+            self.stats["bytes_in"] += bytes_in
+            self.stats["bytes_out"] += bytes_out
+
+
+def _usage(texts):
+    return {"total_tokens": sum(len(str(t)) // 4 + 1 for t in texts)}
+
+
+# Distinct vectors cycled through responses. Real embeddings barely compress,
+# so no batch up to this size repeats a row for a compressor to exploit.
+VECTOR_POOL = 1024
+
+@functools.lru_cache(maxsize=None)
+def _vectors(dimensions, seed):
+    rng = random.Random(seed)
+    vectors = [array.array("f", (rng.gauss(0, 0.05) for _ in range(dimensions))) for _ in range(VECTOR_POOL)]
+    return ([base64.b64encode(vector.tobytes()).decode("ascii") for vector in vectors],
+            [[round(value, 8) for value in vector.tolist()] for vector in vectors])
+
+
+def embeddings(body, config):
+    inputs = body.get("input") or []
+    dimensions = body.get("dimensions") or config.dimensions
+    encoded, floats = _vectors(dimensions, 0)
+    pool = encoded if body.get("embedding_type") == "base64" else floats
+    data = [{"object": "embedding", "index": i, "embedding": pool[i % VECTOR_POOL]} for i in range(len(inputs))]
+    return {"model": body.get("model"), "object": "list", "usage": _usage(inputs), "data": data}
+
+
+def rerank(body, config):
+    documents = body.get("documents") or []
+    results = [{"index": i, "relevance_score": 1.0 / (i + 1)} for i in range(len(documents))]
+    if body.get("return_documents"):
+        for result in results:
+            result["document"] = {"text": documents[result["index"]]}
+    top_n = body.get("top_n")
+    return {"model": body.get("model"), "usage": _usage(documents + [body.get("query", "")]),
+            "results": results[:top_n] if top_n else results}
+
+
+def classify(body, config):
+    inputs = body.get("input") or []
+    labels = body.get("labels") or ["a"]
+    data = [{"object": "classification", "index": i, "prediction": labels[i % len(labels)], "score": 0.9,
+             "predictions": [{"label": label, "score": 1.0 / len(labels)} for label in labels]}
+            for i in range(len(inputs))]
+    return {"usage": _usage(inputs), "data": data}
+
+
+def reader(body, config):
+    content = ("lorem ipsum " * (config.content_bytes // 12 + 1))[:config.content_bytes]
+    return {"code": 200, "data": {"url": body.get("url"), "title": "Mock", "content": content,
+                                  "usage": {"tokens": len(content) // 4}}}
+
+
+def search(body, config):
+    content = ("lorem ipsum " * (config.content_bytes // 120 + 1))[:config.content_bytes // 10]
+    return {"code": 200, "data": [{"url": f"https://example.com/{i}", "title": f"Result {i}", "content": content}
+                                  for i in range(5)]}
+
+
+def segment(body, config):
+    content = body.get("content", "")
+    step = 500
+    positions = [[i, min(i + step, len(content))] for i in range(0, len(content), step)]
+    return {"num_tokens": len(content) // 4, "chunks": [content[s:e] for s, e in positions],
+            "chunk_positions": positions}
+
+
+ROUTES = {
+    "/v1/embeddings": embeddings,
+    "/v1/rerank": rerank,
+    "/v1/classify": classify,
+    "/reader": reader,
+    "/search": search,
+    "/segment": segment,
+}
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; with Nagle on, delayed ACKs
+    # would add ~40 ms to every response and swamp what is being measured.
+    disable_nagle_algorithm = True
+    config = MockConfig()
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status, payload, headers=None, bytes_in=0):
+        body = json.dumps(payload).encode("utf-8")
+        headers = dict(headers or {})
+        if self.config.compress_responses:
+            accepted = self.headers.get("Accept-Encoding", "")
+            if brotli is not None and "br" in accepted:
+                body = brotli.compress(body, quality=4)
+                headers["Content-Encoding"] = "br"
+            elif "gzip" in accepted:
+                body = gzip.compress(body, compresslevel=5)
+                headers["Content-Encoding"] = "gzip"
+        # Counted before replying, so a client reading /_stats afterwards sees it.
+        self.config.count(bytes_in, len(body))
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path != "/_stats":
+            self._reply(404, {"detail": f"No mock for {self.path}"})
+            return
+        with self.config.lock:
+            stats = dict(self.config.stats)
+        body = json.dumps(stats).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length)
+        reply = functools.partial(self._reply, bytes_in=length)
+        route = ROUTES.get(self.path.rstrip("/"))
+        if route is None:
+            reply(404, {"detail": f"No mock for {self.path}"})
+            return
+        encoding = self.headers.get("Content-Encoding")
+        try:
+            if encoding == "gzip":
+                raw = gzip.decompress(raw)
+            elif encoding == "br" and brotli is not None:
+                raw = brotli.decompress(raw)
+            elif encoding:
+                reply(415, {"detail": f"Unsupported Content-Encoding {encoding}"})
+                return
+        except (OSError, EOFError, getattr(brotli, "error", OSError)):
+            reply(400, {"detail": f"Invalid {encoding} body"})
+            return
+        config = self.config
+        with config.lock:
+            rejected = config.random.random() < config.rate_429
+            delay = (config.latency_ms + config.random.uniform(0, config.jitter_ms)) / 1000
+        if rejected:
+            reply(429, {"detail": "Rate limit exceeded"}, {"Retry-After": "0"})
+            return
+        if delay:
+            time.sleep(delay)
+        try:
+            body = json.loads(raw or b"{}")
+        except ValueError:
+            reply(400, {"detail": "Invalid JSON"})
+            return
+        reply(200, route(body, config))
+
+
+def start_server(config: MockConfig, port: int = 0):
+    """Starts the mock server on a daemon thread; returns the server and its base URL."""
+    handler = type("ConfiguredMockHandler", (MockHandler,), {"config": config})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="jina-mock-server", daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the Jina API")
+    parser.add_argument("--port", type=int, default=0, help="port to listen on (0 picks a free one)")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="added latency per request")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="random extra latency up to this much")
+    parser.add_argument("--dimensions", type=int, default=1024, help="embedding dimensions")
+    parser.add_argument("--content-bytes", type=int, default=20000, help="reader content size")
+    parser.add_argument("--rate-429", type=float, default=0.0, help="fraction of requests rejected with 429")
+    parser.add_argument("--compress-responses", action="store_true", help="gzip/brotli responses when accepted")
+    args = parser.parse_args()
+    config = MockConfig(args.latency_ms, args.jitter_ms, args.dimensions, args.content_bytes, args.rate_429,
+                        compress_responses=args.compress_responses)
+    server, base_url = start_server(config, args.port)
+    # The first line tells a parent process where to connect.
+    print(base_url, flush=True)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+        sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+"""
+Offline throughput and overhead benchmarks against the local mock Jina API.
+
+Starts ``mock_server.py`` in a separate process (so its CPU time is not
+charged to the client), points the endpoint modules at it and drives
+``JinaClient.post``, ``JinaEmbeddings.embed_batch`` and the endpoint
+functions from a thread pool at each concurrency level. Reports operations
+per second, p50/p99 latency, client CPU per operation and peak RSS.
+
+    python benchmarks/run.py --concurrency 1,8,32 --ops 400 --latency-ms 5 --json results.json
+    python benchmarks/run.py --compare results.json   # exit 1 on a regression
+
+Every operation sends a distinct body, so request coalescing and the response
+cache (disabled here anyway) cannot inflate the numbers.
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+
+# Measure the client, not the caches and recorders layered on top of it.
+os.environ.setdefault("JINA_API_KEY", "benchmark")
+os.environ["LLM_JINA_EMBEDDING_CACHE"] = "0"
+os.environ["LLM_JINA_HTTP_CACHE"] = "0"
+os.environ["LLM_JINA_TELEMETRY"] = "0"
+
+from requests.adapters import HTTPAdapter  # noqa: E402
+from llm_jina import classifier, embeddings, reader, rerank, search, segmenter, tracing  # noqa: E402
+from llm_jina.client import JinaClient, close_clients, set_client  # noqa: E402
+
+TEXT = "The quick brown fox jumps over the lazy dog while benchmarks run. " * 3
+DOCUMENTS = [f"{TEXT} document {i}" for i in range(100)]
+SEGMENT_CONTENT = TEXT * 100
+
+_client = None
+
+
+def scenarios(base_url):
+    """Maps scenario names to callables taking a distinct operation number."""
+    model = embeddings.JinaEmbeddings("jina-embeddings-v3")
+    return {
+        "client.post": lambda i: _client.post(f"{base_url}/v1/rerank",
+                                              {"model": "m", "query": f"q{i}", "documents": ["a", "b"]}),
+        "embed_batch": lambda i: model.embed_batch([f"{TEXT} {i} {j}" for j in range(64)]),
+        "rerank": lambda i: rerank.rerank(f"query {i}", DOCUMENTS, top_n=10),
+        "classify": lambda i: classifier.classify([f"{TEXT} {i} {j}" for j in range(32)], ["positive", "negative"]),
+        "read": lambda i: reader.read(f"https://example.com/{i}"),
+        "search": lambda i: search.search(f"query {i}"),
+        "segment": lambda i: segmenter.segment(f"{i} {SEGMENT_CONTENT}", return_chunks=True),
+    }
+
+
+def point_at(base_url, pool_size):
+    """Redirects every endpoint module to the mock server and installs a pooled client."""
+    global _client
+    embeddings.EMBEDDINGS_URL = f"{base_url}/v1/embeddings"
+    rerank.RERANK_URL = f"{base_url}/v1/rerank"
+    classifier.CLASSIFY_URL = f"{base_url}/v1/classify"
+    reader.READER_URL = f"{base_url}/reader/"
+    search.SEARCH_URL = f"{base_url}/search/"
+    segmenter.SEGMENT_URL = f"{base_url}/segment/"
+    close_clients()
+    _client = JinaClient()
+    _client.session.mount(f"{base_url}/", HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+    set_client(_client)
+
+
+def cpu_seconds():
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def run_scenario(func, ops, concurrency):
+    latencies = []
+
+    def timed(i):
+        started = time.perf_counter()
+        func(i)
+        latencies.append(time.perf_counter() - started)
+
+    for i in range(min(10, ops)):  # warm connections and code paths
+        func(-i - 1)
+    latencies.clear()
+    cpu_before = cpu_seconds()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(timed, range(ops)))
+    wall = time.perf_counter() - started
+    cpu = cpu_seconds() - cpu_before
+    latencies.sort()
+    return {
+        "ops": ops,
+        "ops_per_second": round(ops / wall, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 2),
+        "p99_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000, 2),
+        "cpu_ms_per_op": round(cpu / ops * 1000, 3),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def start_mock(args):
+    command = [sys.executable, str(HERE / "mock_server.py"), "--latency-ms", str(args.latency_ms),
+               "--dimensions", str(args.dimensions), "--content-bytes", str(args.content_bytes),
+               "--rate-429", str(args.rate_429)]
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+    base_url = process.stdout.readline().strip()
+    if not base_url:
+        process.kill()
+        raise RuntimeError("mock server failed to start")
+    return process, base_url
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=str(HERE), capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, tolerance):
+    """Lists regressions beyond ``tolerance`` (a fraction) against a baseline run."""
+    previous = {(r["scenario"], r["concurrency"]): r for r in baseline["results"]}
+    regressions = []
+    for result in results:
+        before = previous.get((result["scenario"], result["concurrency"]))
+        if before is None:
+            continue
+        label = f"{result['scenario']} @ {result['concurrency']}"
+        if result["ops_per_second"] < before["ops_per_second"] * (1 - tolerance):
+            regressions.append(f"{label}: ops/s {before['ops_per_second']} -> {result['ops_per_second']}")
+        if result["p99_ms"] > before["p99_ms"] * (1 + tolerance):
+            regressions.append(f"{label}: p99 {before['p99_ms']} ms -> {result['p99_ms']} ms")
+        if result["cpu_ms_per_op"] > before["cpu_ms_per_op"] * (1 + tolerance):
+            regressions.append(f"{label}: CPU/op {before['cpu_ms_per_op']} ms -> {result['cpu_ms_per_op']} ms")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scenarios", help="comma-separated subset of scenarios to run")
+    parser.add_argument("--concurrency", default="1,8,32", help="comma-separated thread counts")
+    parser.add_argument("--ops", type=int, default=200, help="operations per scenario and concurrency")
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="mock server latency per request")
+    parser.add_argument("--dimensions", type=int, default=1024, help="embedding dimensions served")
+    parser.add_argument("--content-bytes", type=int, default=20000, help="reader content size")
+    parser.add_argument("--rate-429", type=float, default=0.0, help="fraction of requests rejected with 429")
+    parser.add_argument("--trace", action="store_true", help="run with request tracing on, to measure its overhead")
+    parser.add_argument("--json", dest="json_path", help="write results to this file")
+    parser.add_argument("--compare", help="baseline results file; exit 1 on a regression")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="allowed regression as a fraction")
+    args = parser.parse_args()
+
+    levels = [int(level) for level in args.concurrency.split(",")]
+    if args.trace:
+        tracing.set_tracer(tracing.TimingCollector())
+    process, base_url = start_mock(args)
+    try:
+        point_at(base_url, max(levels))
+        available = scenarios(base_url)
+        names = args.scenarios.split(",") if args.scenarios else list(available)
+        results = []
+        print(f"{'scenario':<12} {'conc':>5} {'ops/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'CPU ms/op':>10} {'RSS MB':>8}")
+        for name in names:
+            for concurrency in levels:
+                result = dict(scenario=name, concurrency=concurrency,
+                              **run_scenario(available[name], args.ops, concurrency))
+                results.append(result)
+                print(f"{name:<12} {concurrency:>5} {result['ops_per_second']:>9} {result['p50_ms']:>8} "
+                      f"{result['p99_ms']:>8} {result['cpu_ms_per_op']:>10} {result['peak_rss_mb']:>8}")
+    finally:
+        close_clients()
+        process.kill()
+        process.wait()
+
+    report = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {key: value for key, value in vars(args).items() if key not in ("json_path", "compare")},
+        "results": results,
+    }
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps(report, indent=2))
+    if args.compare:
+        regressions = compare(results, json.loads(Path(args.compare).read_text()), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Bytes on the wire per request, by transport and compression setting.
+
+Sends realistic embedding, rerank and classify payloads to the local mock
+Jina API (``mock_server.py``, which gzip/brotli-encodes responses when the
+client accepts it) and reports request and response body bytes as counted by
+the server, plus mean latency, for each combination of transport and request
+compression:
+
+    python benchmarks/wire_bytes.py --repeat 5 --json wire.json
+
+The mock server speaks HTTP/1.1 only, so ``httpx`` here measures the
+transport itself; HTTP/2 multiplexing needs a real TLS endpoint.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE))
+
+os.environ.setdefault("JINA_API_KEY", "benchmark")
+os.environ["LLM_JINA_HTTP_CACHE"] = "0"
+os.environ["LLM_JINA_TELEMETRY"] = "0"
+
+import requests  # noqa: E402
+import mock_server  # noqa: E402
+from llm_jina import codec  # noqa: E402
+from llm_jina.client import JinaClient  # noqa: E402
+
+try:
+    import brotli  # noqa: F401
+    COMPRESSIONS = (None, "gzip", "br")
+except ImportError:
+    COMPRESSIONS = (None, "gzip")
+
+TRANSPORTS = ("requests", "httpx")
+
+
+def texts(count, words, seed):
+    """Pseudo-prose from a fixed vocabulary: compresses like real text, not like repeated strings."""
+    rng = random.Random(seed)
+    vocabulary = [
+        "".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(2, 10)))
+        for _ in range(5000)
+    ]
+    return [" ".join(rng.choice(vocabulary) for _ in range(words)) for _ in range(count)]
+
+
+def scenarios():
+    inputs = texts(256, 60, seed=1)
+    documents = texts(500, 80, seed=2)
+    return {
+        "embeddings-base64": ("/v1/embeddings", {"model": "jina-embeddings-v3", "input": inputs,
+                                                 "embedding_type": "base64"}),
+        "embeddings-float": ("/v1/embeddings", {"model": "jina-embeddings-v3", "input": inputs}),
+        "rerank-documents": ("/v1/rerank", {"model": "jina-reranker-v2-base-multilingual", "query": "query",
+                                            "documents": documents, "top_n": 50, "return_documents": True}),
+        "classify": ("/v1/classify", {"model": "jina-embeddings-v3", "input": inputs,
+                                      "labels": ["positive", "negative", "neutral"]}),
+    }
+
+
+def measure(base_url, transport, compress, path, data, repeat):
+    stats_url = f"{base_url}/_stats"
+    with JinaClient(transport=transport, compress=compress, coalesce=False) as client:
+        client.post(f"{base_url}{path}", data)  # warm the connection
+        before = requests.get(stats_url).json()
+        started = time.perf_counter()
+        for _ in range(repeat):
+            client.post(f"{base_url}{path}", data)
+        elapsed = time.perf_counter() - started
+    after = requests.get(stats_url).json()
+    return {
+        "bytes_out": (after["bytes_in"] - before["bytes_in"]) // repeat,
+        "bytes_in": (after["bytes_out"] - before["bytes_out"]) // repeat,
+        "mean_ms": round(elapsed / repeat * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="requests per scenario and setting")
+    parser.add_argument("--dimensions", type=int, default=1024, help="embedding dimensions served")
+    parser.add_argument("--identity-responses", action="store_true", help="serve responses uncompressed")
+    parser.add_argument("--json", dest="json_path", help="write results to this file")
+    args = parser.parse_args()
+
+    config = mock_server.MockConfig(dimensions=args.dimensions, compress_responses=not args.identity_responses)
+    server, base_url = mock_server.start_server(config)
+    results = []
+    try:
+        print(f"{'scenario':<18} {'transport':<9} {'compress':<8} {'sent':>10} {'received':>10} "
+              f"{'total':>10} {'saved':>7} {'ms':>8}")
+        for name, (path, data) in scenarios().items():
+            baseline = None
+            for transport in TRANSPORTS:
+                for compress in COMPRESSIONS:
+                    result = measure(base_url, transport, compress, path, data, args.repeat)
+                    total = result["bytes_out"] + result["bytes_in"]
+                    if baseline is None:
+                        baseline = total
+                    result.update(scenario=name, transport=transport, compress=compress or "none",
+                                  saved=round(1 - total / baseline, 3))
+                    results.append(result)
+                    print(f"{name:<18} {transport:<9} {result['compress']:<8} {result['bytes_out']:>10} "
+                          f"{result['bytes_in']:>10} {total:>10} {result['saved']:>7.1%} {result['mean_ms']:>8}")
+    finally:
+        server.shutdown()
+
+    if args.json_path:
+        report = {"orjson": codec.orjson is not None, "config": vars(args), "results": results}
+        Path(args.json_path).write_text(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
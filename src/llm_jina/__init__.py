@@ -1,14 +1,34 @@
 """
 llm-jina: A Python library and LLM plugin for the Jina AI API.
 """
+import click
 import llm
 from .embeddings import register_embedding_models
-from .commands import cli as jina_cli
+
+
+class LazyJinaCommand(click.Command):
+    """Stand-in for the 'jina' command group that imports it on first use.
+
+    llm loads every plugin on each invocation, so importing the command
+    modules (and with them requests and httpx) here would slow down even
+    ``llm --help``. The real group is only imported once ``llm jina`` is run.
+    """
+
+    def __init__(self, name: str):
+        super().__init__(name, help="Jina AI API command-line interface.")
+
+    def _load(self) -> click.Command:
+        from .commands import cli
+        return cli
+
+    def make_context(self, info_name, args, parent=None, **extra):
+        return self._load().make_context(info_name, args, parent=parent, **extra)
+
 
 @llm.hookimpl
 def register_commands(cli):
     """Register the 'jina' subcommand."""
-    cli.add_command(jina_cli, name="jina")
+    cli.add_command(LazyJinaCommand("jina"), name="jina")
 
 @llm.hookimpl
 def register_embedding_models_hook(register):
@@ -0,0 +1,308 @@
+"""
+Asynchronous HTTP client for Jina AI API interactions.
+"""
+import asyncio
+import os
+import threading
+import time
+import weakref
+import httpx
+from typing import Dict, Any, AsyncIterator, Optional, Tuple
+from . import codec, tracing
+from .batching import estimate_payload_tokens
+from .cache import cache_enabled, request_key
+from .exceptions import JinaAPIError
+from .ratelimit import RateLimit, RateLimiter, RetryPolicy
+from .singleflight import AsyncSingleFlight
+from .telemetry import StreamUsage, UsageRecorder, get_recorder, usage_tokens
+from .tracing import RequestTrace, Tracer
+
+DEFAULT_MAX_CONCURRENCY = 64
+
+class AsyncJinaClient:
+    """Asyncio counterpart of JinaClient backed by httpx.AsyncClient.
+
+    At most ``max_concurrency`` requests are in flight at once; further
+    callers wait on a semaphore instead of opening more connections. Retries
+    and rate limits behave as in JinaClient, and so does ``coalesce``:
+    concurrent identical requests from tasks on the loop share one call.
+    Requests are recorded to ``telemetry`` and traced like JinaClient's, and
+    ``http2`` and ``compress`` behave as in JinaClient.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        timeout: Optional[float] = None,
+        retry: Optional[RetryPolicy] = None,
+        rate_limits: Optional[Dict[str, RateLimit]] = None,
+        coalesce: bool = True,
+        telemetry: Optional[UsageRecorder] = None,
+        tracer: Optional[Tracer] = None,
+        http2: Optional[bool] = None,
+        compress: Optional[str] = None,
+        compress_min_bytes: int = codec.DEFAULT_COMPRESS_MIN_BYTES,
+    ):
+        self.api_key = api_key or os.getenv("JINA_API_KEY")
+        if not self.api_key:
+            raise JinaAPIError("JINA_API_KEY environment variable is required.")
+        if http2 is None:
+            http2 = cache_enabled("LLM_JINA_HTTP2", default=False)
+        if compress is None:
+            compress = os.getenv("LLM_JINA_COMPRESS") or None
+        if compress is not None and compress not in codec.COMPRESSIONS:
+            raise ValueError(f"compress must be one of {', '.join(codec.COMPRESSIONS)}")
+        self.compress = compress
+        self.compress_min_bytes = compress_min_bytes
+
+        self.max_concurrency = max_concurrency
+        self._semaphore = None
+        try:
+            self.http = httpx.AsyncClient(
+                headers={
+                    "Authorization": f"Bearer {self.api_key}",
+                    "Content-Type": "application/json",
+                    "Accept": "application/json"
+                },
+                limits=httpx.Limits(
+                    max_connections=max_concurrency,
+                    max_keepalive_connections=max_concurrency,
+                ),
+                timeout=timeout,
+                http2=http2,
+            )
+        except ImportError:
+            raise ImportError("HTTP/2 requires the h2 package: pip install 'llm-jina[http2]'")
+        self.retry = retry or RetryPolicy()
+        self.rate_limiter = RateLimiter(rate_limits)
+        self.sleep = asyncio.sleep
+        self.inflight = AsyncSingleFlight() if coalesce else None
+        self.telemetry = telemetry if telemetry is not None else get_recorder()
+        self.tracer = tracer
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def aclose(self):
+        """Closes the underlying httpx client and its pooled connections."""
+        await self.http.aclose()
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        # Created lazily so it binds to the loop the client is used on.
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def _send(self, url: str, data: Dict[str, Any], headers: Optional[Dict[str, str]],
+                    stream: bool = False, trace: Optional[RequestTrace] = None) -> httpx.Response:
+        tokens = estimate_payload_tokens(data)
+        # Encoded once, not on every retry.
+        body = codec.dumps(data)
+        if self.compress is not None and len(body) >= self.compress_min_bytes:
+            body = codec.compress(body, self.compress)
+            headers = dict(headers or {})
+            headers["Content-Encoding"] = self.compress
+        attempt = 0
+        while True:
+            wait = self.rate_limiter.reserve(url, tokens)
+            if wait > 0:
+                await self.sleep(wait)
+                if trace is not None:
+                    trace.add("queue", wait)
+            try:
+                if trace is None:
+                    request = self.http.build_request("POST", url, content=body, headers=headers)
+                    async with self.semaphore:
+                        response = await self.http.send(request, stream=stream)
+                else:
+                    response = await self._traced_send(url, body, headers, trace)
+            except httpx.TransportError as e:
+                if not self.retry.should_retry(attempt):
+                    raise JinaAPIError(f"API request failed: {e}")
+                await self._backoff(self.retry.delay(attempt), trace)
+                attempt += 1
+                continue
+            except httpx.HTTPError as e:
+                raise JinaAPIError(f"API request failed: {e}")
+
+            if response.status_code < 400 or not self.retry.should_retry(attempt, response.status_code):
+                return response
+            await response.aclose()
+            delay = self.retry.delay(attempt, response.headers.get("Retry-After"))
+            if response.status_code == 429:
+                self.rate_limiter.pause(url, delay)
+            else:
+                await self._backoff(delay, trace)
+            attempt += 1
+
+    async def _traced_send(self, url: str, body: bytes, headers: Optional[Dict[str, str]],
+                           trace: RequestTrace) -> httpx.Response:
+        # Always streamed, so the body download is timed separately from the wait.
+        trace.attempts += 1
+        request = self.http.build_request("POST", url, content=body, headers=headers,
+                                          extensions={"trace": trace.ahttpcore_event})
+        with trace.phase("queue"):
+            await self.semaphore.acquire()
+        try:
+            connecting = trace.connection_time()
+            started = time.perf_counter()
+            try:
+                return await self.http.send(request, stream=True)
+            finally:
+                trace.add("wait", time.perf_counter() - started - (trace.connection_time() - connecting))
+        finally:
+            self.semaphore.release()
+
+    async def _backoff(self, delay: float, trace: Optional[RequestTrace]):
+        await self.sleep(delay)
+        if trace is not None:
+            trace.add("retry", delay)
+
+    async def post(self, url: str, data: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """Makes a POST request to the Jina API."""
+        if self.inflight is None:
+            return await self._post(url, data, headers)
+        key = request_key(url, data, headers or {})
+        return await self.inflight.do(key, lambda: self._post(url, data, headers))
+
+    async def _post(self, url: str, data: Dict[str, Any], headers: Optional[Dict[str, str]]) -> Dict[str, Any]:
+        started = time.perf_counter()
+        tracer = self.tracer or tracing.get_tracer()
+        trace = RequestTrace(url, data.get("model")) if tracer is not None else None
+        response = result = error = None
+        try:
+            response = await self._send(url, data, headers, trace=trace)
+            if trace is not None:
+                try:
+                    with trace.phase("download"):
+                        await response.aread()
+                except httpx.HTTPError as e:
+                    raise JinaAPIError(f"API request failed: {e}")
+                finally:
+                    await response.aclose()
+            try:
+                response.raise_for_status()
+            except httpx.HTTPError as e:
+                raise JinaAPIError(f"API request failed: {e}", status_code=response.status_code)
+            try:
+                if trace is None:
+                    result = codec.loads(response.content)
+                else:
+                    with trace.phase("decode"):
+                        result = codec.loads(response.content)
+            except ValueError:
+                raise JinaAPIError(f"Invalid JSON response from {url}: {response.text}")
+            return result
+        except JinaAPIError as e:
+            error = e
+            raise
+        finally:
+            self._record(url, data, response, result, started)
+            if trace is not None:
+                trace.finish(*_sizes(response), error=error)
+                tracer.record(trace)
+
+    def _record(self, url: str, data: Dict[str, Any], response: Optional[httpx.Response],
+                result: Any, started: float):
+        if self.telemetry is None:
+            return
+        self.telemetry.record(url, data.get("model"), *_sizes(response),
+                              usage_tokens(result), time.perf_counter() - started)
+
+    async def post_stream(self, url: str, data: Dict[str, Any],
+                          headers: Optional[Dict[str, str]] = None) -> AsyncIterator[str]:
+        """Makes a streaming POST request and yields response lines as they arrive."""
+        request_headers = {"Accept": "text/event-stream"}
+        if headers:
+            request_headers.update(headers)
+
+        started = time.perf_counter()
+        tracer = self.tracer or tracing.get_tracer()
+        trace = RequestTrace(url, data.get("model")) if tracer is not None else None
+        usage = StreamUsage()
+        response = error = None
+        try:
+            response = await self._send(url, data, request_headers, stream=True, trace=trace)
+            try:
+                try:
+                    response.raise_for_status()
+                except httpx.HTTPError as e:
+                    raise JinaAPIError(f"API request failed: {e}", status_code=response.status_code)
+                lines = response.aiter_lines()
+                try:
+                    while True:
+                        waited = time.perf_counter()
+                        try:
+                            line = await lines.__anext__()
+                        except StopAsyncIteration:
+                            break
+                        finally:
+                            if trace is not None:
+                                trace.add("download", time.perf_counter() - waited)
+                        usage.feed(line)
+                        yield line
+                except httpx.HTTPError as e:
+                    raise JinaAPIError(f"API stream failed: {e}")
+            finally:
+                await response.aclose()
+        except JinaAPIError as e:
+            error = e
+            raise
+        finally:
+            status = response.status_code if response is not None else None
+            bytes_out = len(response.request.content) if response is not None else None
+            if self.telemetry is not None:
+                self.telemetry.record(url, data.get("model"), status, bytes_out, usage.bytes_in,
+                                      usage.tokens, time.perf_counter() - started)
+            if trace is not None:
+                trace.finish(status, bytes_out, usage.bytes_in, error=error)
+                tracer.record(trace)
+
+
+def _sizes(response: Optional[httpx.Response]) -> Tuple[Optional[int], Optional[int], Optional[int]]:
+    """Status, request body size and response body size of a response, if any."""
+    if response is None:
+        return None, None, None
+    return response.status_code, len(response.request.content), len(response.content)
+
+
+# httpx.AsyncClient is bound to the event loop it was first used on, so shared
+# async clients are kept per loop (and per API key within a loop).
+_async_clients = weakref.WeakKeyDictionary()
+_async_clients_lock = threading.Lock()
+
+def get_async_client(api_key: Optional[str] = None) -> AsyncJinaClient:
+    """Returns the shared async client for the running event loop."""
+    api_key = api_key or os.getenv("JINA_API_KEY")
+    if not api_key:
+        raise JinaAPIError("JINA_API_KEY environment variable is required.")
+    loop = asyncio.get_running_loop()
+    with _async_clients_lock:
+        clients = _async_clients.setdefault(loop, {})
+        client = clients.get(api_key)
+        if client is None:
+            client = AsyncJinaClient(api_key=api_key)
+            clients[api_key] = client
+        return client
+
+def set_async_client(client: AsyncJinaClient) -> Optional[AsyncJinaClient]:
+    """Installs a client as the shared async instance for the running loop."""
+    loop = asyncio.get_running_loop()
+    with _async_clients_lock:
+        clients = _async_clients.setdefault(loop, {})
+        previous = clients.get(client.api_key)
+        clients[client.api_key] = client
+        return previous
+
+async def close_async_clients():
+    """Closes and forgets the shared async clients of the running loop."""
+    loop = asyncio.get_running_loop()
+    with _async_clients_lock:
+        clients = list(_async_clients.pop(loop, {}).values())
+    for client in clients:
+        await client.aclose()
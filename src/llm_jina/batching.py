@@ -0,0 +1,84 @@
+"""
+Batch planning for Jina API requests with per-request item and token limits.
+"""
+from typing import Callable, Iterable, Iterator, List, Sequence, TypeVar, Union
+
+T = TypeVar("T")
+
+# Rough characters-per-token ratio for Jina's tokenizers on mixed-language text.
+CHARS_PER_TOKEN = 4
+# Flat token charge assumed for a binary item such as an image.
+BINARY_ITEM_TOKENS = 1000
+
+def estimate_tokens(item: Union[str, bytes, dict]) -> int:
+    """Cheaply estimates the number of tokens an input item will consume."""
+    if isinstance(item, str):
+        return len(item) // CHARS_PER_TOKEN + 1
+    if isinstance(item, dict) and isinstance(item.get("text"), str):
+        return len(item["text"]) // CHARS_PER_TOKEN + 1
+    return BINARY_ITEM_TOKENS
+
+def plan_batches(
+    items: Sequence,
+    max_items: int,
+    max_tokens: int,
+    estimate: Callable[[object], int] = estimate_tokens,
+) -> List[List[int]]:
+    """
+    Packs items greedily, in order, into batches that respect both limits.
+
+    An item whose estimate alone exceeds ``max_tokens`` gets a batch of its own
+    so the API can truncate or reject it without failing its neighbours.
+
+    Returns:
+        List[List[int]]: Indices into ``items`` for each batch.
+    """
+    batches = []
+    current = []
+    current_tokens = 0
+    for index, item in enumerate(items):
+        tokens = estimate(item)
+        if current and (len(current) >= max_items or current_tokens + tokens > max_tokens):
+            batches.append(current)
+            current = []
+            current_tokens = 0
+        current.append(index)
+        current_tokens += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+def iter_batches(
+    items: Iterable[T],
+    max_items: int,
+    max_tokens: int,
+    estimate: Callable[[T], int] = estimate_tokens,
+) -> Iterator[List[T]]:
+    """
+    Streaming counterpart of ``plan_batches``: packs items from an iterable
+    of unknown length and yields each batch of items as soon as it is full.
+    """
+    current = []
+    current_tokens = 0
+    for item in items:
+        tokens = estimate(item)
+        if current and (len(current) >= max_items or current_tokens + tokens > max_tokens):
+            yield current
+            current = []
+            current_tokens = 0
+        current.append(item)
+        current_tokens += tokens
+    if current:
+        yield current
+
+def estimate_payload_tokens(data: object) -> int:
+    """Estimates the tokens a request body will be billed for, from its text fields."""
+    if isinstance(data, str):
+        return estimate_tokens(data)
+    if isinstance(data, dict):
+        if "image" in data:
+            return BINARY_ITEM_TOKENS
+        return sum(estimate_payload_tokens(value) for key, value in data.items() if key != "model")
+    if isinstance(data, (list, tuple)):
+        return sum(estimate_payload_tokens(value) for value in data)
+    return 0
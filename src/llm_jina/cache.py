@@ -0,0 +1,356 @@
+"""
+Persistent SQLite-backed caches stored in the llm user directory.
+"""
+import array
+import hashlib
+import json
+import os
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple, Union
+from .ratelimit import endpoint_key
+from .utils import connect_db, user_dir
+
+DEFAULT_MAX_ENTRIES = 50000
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+# SQLite limits the number of bound parameters per statement.
+_CHUNK = 500
+
+def _chunks(items: List[Any]) -> Iterable[List[Any]]:
+    for start in range(0, len(items), _CHUNK):
+        yield items[start:start + _CHUNK]
+
+def _to_blob(vector: Sequence[float]) -> bytes:
+    if isinstance(vector, array.array) and vector.typecode == "f":
+        return vector.tobytes()
+    return array.array("f", vector).tobytes()
+
+def request_key(url: str, data: Dict[str, Any], headers: Dict[str, str]) -> str:
+    """Canonical hash of a request: URL, body and the headers that shape the response."""
+    relevant = sorted(
+        (name.lower(), str(value)) for name, value in headers.items()
+        if name.lower().startswith("x-") or name.lower() == "accept"
+    )
+    canonical = json.dumps([url, data, relevant], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+def cache_enabled(env_var: str, default: bool = True) -> bool:
+    """Whether a cache is switched on by its environment variable."""
+    value = os.environ.get(env_var)
+    if value is None:
+        return default
+    return value.lower() not in ("0", "false", "no", "off", "")
+
+
+class EmbeddingCache:
+    """Content-addressed embedding store with least-recently-used eviction.
+
+    Entries are keyed by model, request options and a hash of the input, and
+    the cache holds at most ``max_entries`` vectors.
+    """
+
+    def __init__(self, path: Optional[Path] = None, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = Path(path) if path else user_dir() / "jina-embeddings-cache.db"
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = connect_db(self.path)
+        self._conn.executescript("""
+            create table if not exists embeddings (
+                key text primary key,
+                vector blob not null,
+                last_used real not null
+            );
+            create index if not exists embeddings_last_used on embeddings (last_used);
+            create table if not exists stats (
+                name text primary key,
+                value integer not null
+            );
+        """)
+
+    @staticmethod
+    def key(model_id: str, options: Dict[str, Any], item: Union[str, bytes]) -> str:
+        """Returns the cache key for embedding ``item`` with a model and options."""
+        digest = hashlib.sha256()
+        digest.update(model_id.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(json.dumps(options or {}, sort_keys=True).encode("utf-8"))
+        digest.update(b"\0")
+        if isinstance(item, str):
+            digest.update(b"s" + item.encode("utf-8"))
+        else:
+            digest.update(b"b" + bytes(item))
+        return digest.hexdigest()
+
+    def get_many(self, keys: List[str]) -> Dict[str, array.array]:
+        """Looks up keys, returning a mapping for the ones that are cached."""
+        unique = list(dict.fromkeys(keys))
+        found = {}
+        with self._lock:
+            for chunk in _chunks(unique):
+                rows = self._conn.execute(
+                    "select key, vector from embeddings where key in ({})".format(",".join("?" * len(chunk))),
+                    chunk,
+                )
+                for key, blob in rows:
+                    vector = array.array("f")
+                    vector.frombytes(blob)
+                    found[key] = vector
+            hits = sum(1 for key in keys if key in found)
+            misses = len(keys) - hits
+            self.hits += hits
+            self.misses += misses
+            now = time.time()
+            self._conn.execute("begin immediate")
+            try:
+                for chunk in _chunks(list(found)):
+                    self._conn.execute(
+                        "update embeddings set last_used = ? where key in ({})".format(",".join("?" * len(chunk))),
+                        [now] + chunk,
+                    )
+                self._bump("hits", hits)
+                self._bump("misses", misses)
+                self._conn.execute("commit")
+            except Exception:
+                self._conn.execute("rollback")
+                raise
+        return found
+
+    def put_many(self, entries: Dict[str, Sequence[float]]):
+        """Stores vectors and evicts the least recently used entries over the limit."""
+        if not entries:
+            return
+        now = time.time()
+        rows = [(key, _to_blob(vector), now) for key, vector in entries.items()]
+        with self._lock:
+            self._conn.execute("begin immediate")
+            try:
+                self._conn.executemany(
+                    "insert or replace into embeddings (key, vector, last_used) values (?, ?, ?)", rows
+                )
+                (count,) = self._conn.execute("select count(*) from embeddings").fetchone()
+                if count > self.max_entries:
+                    self._conn.execute(
+                        "delete from embeddings where key in "
+                        "(select key from embeddings order by last_used limit ?)",
+                        (count - self.max_entries,),
+                    )
+                self._conn.execute("commit")
+            except Exception:
+                self._conn.execute("rollback")
+                raise
+
+    def _bump(self, name: str, amount: int):
+        if amount:
+            self._conn.execute(
+                "insert into stats (name, value) values (?, ?) "
+                "on conflict(name) do update set value = value + excluded.value",
+                (name, amount),
+            )
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns entry counts plus hit/miss counters for this process and in total."""
+        with self._lock:
+            (entries,) = self._conn.execute("select count(*) from embeddings").fetchone()
+            totals = dict(self._conn.execute("select name, value from stats"))
+        return {
+            "path": str(self.path),
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "total_hits": totals.get("hits", 0),
+            "total_misses": totals.get("misses", 0),
+        }
+
+    def clear(self):
+        """Removes every cached vector and resets the counters."""
+        with self._lock:
+            self._conn.execute("delete from embeddings")
+            self._conn.execute("delete from stats")
+            self.hits = 0
+            self.misses = 0
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_embedding_cache = None
+_embedding_cache_lock = threading.Lock()
+
+def get_embedding_cache() -> Optional[EmbeddingCache]:
+    """Returns the shared embedding cache, or None if LLM_JINA_EMBEDDING_CACHE=0."""
+    global _embedding_cache
+    if not cache_enabled("LLM_JINA_EMBEDDING_CACHE"):
+        return None
+    with _embedding_cache_lock:
+        if _embedding_cache is None:
+            _embedding_cache = EmbeddingCache()
+        return _embedding_cache
+
+
+class CachePolicy(NamedTuple):
+    """How long responses from an endpoint stay fresh, then usable while refreshing."""
+    ttl: float
+    stale_while_revalidate: float = 0.0
+
+
+HOUR = 3600.0
+DAY = 24 * HOUR
+
+# Embeddings have their own cache and DeepSearch answers are not reusable, so
+# neither appears here; endpoints without a policy are never cached.
+DEFAULT_POLICIES = {
+    "r.jina.ai": CachePolicy(ttl=HOUR, stale_while_revalidate=DAY),
+    "s.jina.ai": CachePolicy(ttl=15 * 60, stale_while_revalidate=HOUR),
+    "segment.jina.ai": CachePolicy(ttl=30 * DAY),
+    "api.jina.ai/v1/rerank": CachePolicy(ttl=7 * DAY),
+    "api.jina.ai/v1/classify": CachePolicy(ttl=7 * DAY),
+}
+
+FRESH = "fresh"
+STALE = "stale"
+
+
+class ResponseCache:
+    """Cache of decoded JSON responses keyed by URL, request body and option headers.
+
+    Entries are fresh for their endpoint's TTL, may then be served while a
+    refresh runs for ``stale_while_revalidate`` seconds, and the least
+    recently used entries are evicted once the stored bodies exceed
+    ``max_bytes``.
+    """
+
+    def __init__(self, path: Optional[Path] = None, max_bytes: int = DEFAULT_MAX_BYTES,
+                 policies: Optional[Dict[str, CachePolicy]] = None):
+        self.path = Path(path) if path else user_dir() / "jina-http-cache.db"
+        self.max_bytes = max_bytes
+        self.policies = dict(DEFAULT_POLICIES if policies is None else policies)
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = connect_db(self.path)
+        self._conn.executescript("""
+            create table if not exists responses (
+                key text primary key,
+                url text not null,
+                body blob not null,
+                size integer not null,
+                stored_at real not null,
+                fresh_until real not null,
+                stale_until real not null,
+                last_used real not null
+            );
+            create index if not exists responses_last_used on responses (last_used);
+        """)
+
+    def policy(self, url: str) -> Optional[CachePolicy]:
+        """Returns the caching policy for a URL's endpoint, if it is cacheable."""
+        endpoint = endpoint_key(url)
+        if endpoint in self.policies:
+            return self.policies[endpoint]
+        return self.policies.get(endpoint.split("/", 1)[0])
+
+    @staticmethod
+    def key(url: str, data: Dict[str, Any], headers: Dict[str, str]) -> str:
+        """Canonical hash of a request: URL, body and the headers that shape the response."""
+        return request_key(url, data, headers)
+
+    def get(self, key: str) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """Returns ``(response, FRESH|STALE)``, or ``(None, None)`` on a miss or expiry."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "select body, fresh_until, stale_until from responses where key = ?", (key,)
+            ).fetchone()
+            if row is None or row[2] <= now:
+                self.misses += 1
+                return None, None
+            self._conn.execute("update responses set last_used = ? where key = ?", (now, key))
+            state = FRESH if row[1] > now else STALE
+            if state == FRESH:
+                self.hits += 1
+            else:
+                self.stale_hits += 1
+        return json.loads(zlib.decompress(row[0])), state
+
+    def put(self, key: str, url: str, response: Dict[str, Any], policy: CachePolicy):
+        """Stores a response and evicts least recently used entries beyond ``max_bytes``."""
+        body = zlib.compress(json.dumps(response, separators=(",", ":")).encode("utf-8"))
+        now = time.time()
+        fresh_until = now + policy.ttl
+        with self._lock:
+            self._conn.execute("begin immediate")
+            try:
+                self._conn.execute(
+                    "insert or replace into responses "
+                    "(key, url, body, size, stored_at, fresh_until, stale_until, last_used) "
+                    "values (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (key, url, body, len(body), now, fresh_until,
+                     fresh_until + policy.stale_while_revalidate, now),
+                )
+                self._conn.execute("delete from responses where stale_until <= ?", (now,))
+                (total,) = self._conn.execute("select coalesce(sum(size), 0) from responses").fetchone()
+                if total > self.max_bytes:
+                    excess = total - self.max_bytes
+                    doomed = []
+                    for old_key, size in self._conn.execute(
+                        "select key, size from responses order by last_used"
+                    ):
+                        doomed.append(old_key)
+                        excess -= size
+                        if excess <= 0:
+                            break
+                    for chunk in _chunks(doomed):
+                        self._conn.execute(
+                            "delete from responses where key in ({})".format(",".join("?" * len(chunk))), chunk
+                        )
+                self._conn.execute("commit")
+            except Exception:
+                self._conn.execute("rollback")
+                raise
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns entry counts, stored bytes and this process's hit counters."""
+        with self._lock:
+            entries, size = self._conn.execute(
+                "select count(*), coalesce(sum(size), 0) from responses"
+            ).fetchone()
+        return {
+            "path": str(self.path),
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+        }
+
+    def clear(self):
+        """Removes every cached response."""
+        with self._lock:
+            self._conn.execute("delete from responses")
+            self.hits = self.stale_hits = self.misses = 0
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_response_cache = None
+_response_cache_lock = threading.Lock()
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """Returns the shared response cache if LLM_JINA_HTTP_CACHE=1, otherwise None."""
+    global _response_cache
+    if not cache_enabled("LLM_JINA_HTTP_CACHE", default=False):
+        return None
+    with _response_cache_lock:
+        if _response_cache is None:
+            _response_cache = ResponseCache()
+        return _response_cache
@@ -1,17 +1,27 @@
 """
 Jina AI Classifier API implementation.
 """
-from typing import Dict, Any, List, Union, Optional
-from .client import JinaClient
+from typing import Dict, Any, Iterable, Iterator, List, Tuple, Union, Optional
+from .client import get_client
+from .async_client import get_async_client
+from .batching import estimate_tokens, iter_batches
+from .concurrency import iter_completed, iter_ordered
+from .images import DEFAULT_BATCH_SIZE as DEFAULT_IMAGE_BATCH_SIZE, ImageSource, MODEL_RESOLUTIONS, iter_encoded
+from .records import Checkpoint
 
-def classify(
+CLASSIFY_URL = "https://api.jina.ai/v1/classify"
+
+# The classify endpoint accepts at most 2048 inputs per request; bulk shards
+# default to half that so a shard's tokens also stay within the request budget.
+MAX_INPUTS = 2048
+DEFAULT_SHARD_SIZE = 1024
+DEFAULT_SHARD_TOKENS = 64000
+
+def _data(
     inputs: List[Union[str, Dict[str, str]]],
     labels: List[str],
-    model: Optional[str] = None
+    model: Optional[str]
 ) -> Dict[str, Any]:
-    """Classify text or images using Jina AI Classifier API."""
-    client = JinaClient()
-    
     if not model:
         if isinstance(inputs[0], str):
             model = "jina-embeddings-v3"
@@ -31,8 +41,98 @@ def classify(
                 formatted_inputs.append(item)
         api_inputs = formatted_inputs
 
-    data = {"model": model, "input": api_inputs, "labels": labels}
-    
-    response = client.post("https://api.jina.ai/v1/classify", data=data)
+    return {"model": model, "input": api_inputs, "labels": labels}
+
+def classify(
+    inputs: List[Union[str, Dict[str, str]]],
+    labels: List[str],
+    model: Optional[str] = None
+) -> Dict[str, Any]:
+    """Classify text or images using Jina AI Classifier API."""
+    client = get_client()
+    data = _data(inputs, labels, model)
+    response = client.post(CLASSIFY_URL, data=data)
     return response
 
+async def aclassify(
+    inputs: List[Union[str, Dict[str, str]]],
+    labels: List[str],
+    model: Optional[str] = None
+) -> Dict[str, Any]:
+    """Awaitable variant of classify()."""
+    client = get_async_client()
+    data = _data(inputs, labels, model)
+    return await client.post(CLASSIFY_URL, data=data)
+
+def classify_bulk(
+    records: Iterable[Tuple[str, Union[str, Dict[str, str]]]],
+    labels: List[str],
+    model: Optional[str] = None,
+    shard_size: int = DEFAULT_SHARD_SIZE,
+    shard_tokens: int = DEFAULT_SHARD_TOKENS,
+    max_workers: int = 4,
+    ordered: bool = True,
+    checkpoint: Optional[Checkpoint] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Classifies a stream of ``(id, input)`` records shard by shard.
+
+    Shards of up to ``shard_size`` inputs are sent concurrently and
+    ``{"id", "label", "score"}`` rows are yielded in input order, or as shards
+    complete when ``ordered`` is false. Records are read lazily, so memory
+    use is bounded by ``max_workers`` shards.
+
+    With a ``checkpoint``, completed shards are skipped on the next run. A
+    shard is marked complete once the consumer asks for the row after its
+    last one, so rows may be repeated after a crash but are never lost.
+    """
+    shard_size = min(shard_size, MAX_INPUTS)
+    shards = enumerate(iter_batches(records, shard_size, shard_tokens,
+                                    estimate=lambda record: estimate_tokens(record[1])))
+    if checkpoint is not None:
+        shards = ((number, rows) for number, rows in shards if number not in checkpoint)
+
+    def run(shard):
+        _, rows = shard
+        response = classify([value for _, value in rows], labels, model)
+        if not isinstance(response, dict) or "data" not in response:
+            raise ValueError(f"Unexpected response from classify API: {response}")
+        return response["data"]
+
+    iterate = iter_ordered if ordered else iter_completed
+    for (number, rows), data in iterate(run, shards, max_workers):
+        for item in sorted(data, key=lambda item: item["index"]):
+            yield {"id": rows[item["index"]][0], "label": item.get("prediction"), "score": item.get("score")}
+        if checkpoint is not None:
+            checkpoint.mark(number)
+
+def classify_images(
+    images: Iterable[ImageSource],
+    labels: List[str],
+    model: str = "jina-clip-v2",
+    max_size: Optional[int] = None,
+    batch_size: int = DEFAULT_IMAGE_BATCH_SIZE,
+    max_workers: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Classifies image files, bytes or URLs without loading them all at once.
+
+    Images are encoded in a process pool, downsized to ``max_size`` pixels
+    (by default the model's input resolution; ``0`` sends them unchanged)
+    and sent in requests of ``batch_size``. The result has the same shape as
+    classify(), with ``index`` counting across all images.
+    """
+    if max_size is None:
+        max_size = MODEL_RESOLUTIONS.get(model)
+    data = []
+    total_tokens = 0
+    offset = 0
+    for batch in iter_encoded(images, max_size=max_size, batch_size=batch_size, max_workers=max_workers):
+        response = classify([{"image": image} for image in batch], labels, model)
+        for item in response.get("data", []):
+            item = dict(item)
+            item["index"] = item.get("index", 0) + offset
+            data.append(item)
+        total_tokens += response.get("usage", {}).get("total_tokens", 0)
+        offset += len(batch)
+    return {"usage": {"total_tokens": total_tokens}, "data": data}
@@ -2,36 +2,493 @@
 Core HTTP client for Jina AI API interactions.
 """
 import os
+import threading
+import time
 import requests
-from typing import Dict, Any, Optional
+from requests.adapters import HTTPAdapter
+from typing import Dict, Any, Iterator, Optional, Tuple
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from . import codec, tracing
+from .batching import estimate_payload_tokens
+from .cache import STALE, ResponseCache, cache_enabled, get_response_cache, request_key
 from .exceptions import JinaAPIError
+from .ratelimit import RateLimit, RateLimiter, RetryPolicy
+from .singleflight import SingleFlight
+from .telemetry import StreamUsage, UsageRecorder, get_recorder, usage_tokens
+from .tracing import RequestTrace, Tracer
+
+# Connection pool size per Jina API host. Each host gets its own adapter so a
+# burst against one endpoint cannot starve the warm connections of another.
+DEFAULT_POOL_SIZES = {
+    "api.jina.ai": 32,
+    "r.jina.ai": 16,
+    "s.jina.ai": 16,
+    "segment.jina.ai": 8,
+    "deepsearch.jina.ai": 4,
+}
+
+TRANSPORTS = ("requests", "httpx")
+
+# Bytes read per step when decoding a response incrementally.
+STREAM_CHUNK_SIZE = 64 * 1024
+
+class _TracedConnection:
+    """Attributes connection setup time to the request being traced on this thread."""
+
+    def _new_conn(self):
+        trace = tracing.current()
+        if trace is None:
+            return super()._new_conn()
+        with trace.phase("connect"):
+            return super()._new_conn()
+
+    def connect(self):
+        trace = tracing.current()
+        if trace is None:
+            return super().connect()
+        connecting = trace.phases.get("connect", 0.0)
+        started = time.perf_counter()
+        super().connect()
+        if isinstance(self, HTTPSConnection):
+            # connect() opens the socket through _new_conn, then does the handshake.
+            trace.add("tls", time.perf_counter() - started - (trace.phases.get("connect", 0.0) - connecting))
+
+
+class _TracedHTTPConnection(_TracedConnection, HTTPConnection):
+    pass
+
+
+class _TracedHTTPSConnection(_TracedConnection, HTTPSConnection):
+    pass
+
+
+class _TracedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TracedHTTPConnection
+
+
+class _TracedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TracedHTTPSConnection
+
+
+class _TracingAdapter(HTTPAdapter):
+    """HTTPAdapter whose connections report connect and TLS time to the current trace."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _TracedHTTPConnectionPool,
+            "https": _TracedHTTPSConnectionPool,
+        }
+
 
 class JinaClient:
-    """Central HTTP client for all Jina AI API endpoints."""
-    
-    def __init__(self, api_key: Optional[str] = None):
+    """Central HTTP client for all Jina AI API endpoints.
+
+    Rate-limited (429) and transient 5xx or connection failures are retried
+    according to ``retry``. ``rate_limits`` maps endpoints such as
+    ``api.jina.ai/v1/embeddings`` to client-side RPM/TPM budgets. Responses
+    from cacheable endpoints are served from ``response_cache`` (by default
+    the shared cache, enabled with ``LLM_JINA_HTTP_CACHE=1``). With
+    ``coalesce``, concurrent identical requests share one HTTP call. Every
+    request is recorded to ``telemetry`` (by default the shared recorder,
+    disabled with ``LLM_JINA_TELEMETRY=0``) and, when a ``tracer`` is given
+    or installed with ``tracing.set_tracer``, traced phase by phase.
+
+    ``transport`` is ``"requests"`` (the default) or ``"httpx"``; ``http2``
+    selects httpx with HTTP/2, so concurrent requests to a host share one
+    connection (also enabled with ``LLM_JINA_HTTP2=1``). ``compress`` sends
+    request bodies of at least ``compress_min_bytes`` with ``gzip`` or
+    ``br`` Content-Encoding (also set with ``LLM_JINA_COMPRESS``).
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        pool_sizes: Optional[Dict[str, int]] = None,
+        retry: Optional[RetryPolicy] = None,
+        rate_limits: Optional[Dict[str, RateLimit]] = None,
+        response_cache: Optional[ResponseCache] = None,
+        coalesce: bool = True,
+        telemetry: Optional[UsageRecorder] = None,
+        tracer: Optional[Tracer] = None,
+        transport: Optional[str] = None,
+        http2: Optional[bool] = None,
+        compress: Optional[str] = None,
+        compress_min_bytes: int = codec.DEFAULT_COMPRESS_MIN_BYTES,
+    ):
         self.api_key = api_key or os.getenv("JINA_API_KEY")
         if not self.api_key:
             raise JinaAPIError("JINA_API_KEY environment variable is required.")
-        
-        self.session = requests.Session()
+
+        if http2 is None:
+            http2 = cache_enabled("LLM_JINA_HTTP2", default=False)
+        self.transport = transport or ("httpx" if http2 else "requests")
+        if self.transport not in TRANSPORTS:
+            raise ValueError(f"transport must be one of {', '.join(TRANSPORTS)}")
+        if http2 and self.transport != "httpx":
+            raise ValueError("HTTP/2 requires transport='httpx'")
+        if compress is None:
+            compress = os.getenv("LLM_JINA_COMPRESS") or None
+        if compress is not None and compress not in codec.COMPRESSIONS:
+            raise ValueError(f"compress must be one of {', '.join(codec.COMPRESSIONS)}")
+        self.compress = compress
+        self.compress_min_bytes = compress_min_bytes
+
+        self.pool_sizes = dict(DEFAULT_POOL_SIZES)
+        if pool_sizes:
+            self.pool_sizes.update(pool_sizes)
+        if self.transport == "httpx":
+            from .transport import HttpxSession
+            self.session = HttpxSession(http2=http2, max_connections=sum(self.pool_sizes.values()))
+        else:
+            self.session = requests.Session()
+            self.session.mount("https://", _TracingAdapter())
+            self.session.mount("http://", _TracingAdapter())
+            for host, size in self.pool_sizes.items():
+                adapter = _TracingAdapter(pool_connections=1, pool_maxsize=size)
+                self.session.mount(f"https://{host}/", adapter)
         self.session.headers.update({
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json",
             "Accept": "application/json"
         })
-    
+
+        self.retry = retry or RetryPolicy()
+        self.rate_limiter = RateLimiter(rate_limits)
+        self.sleep = time.sleep
+        self.response_cache = response_cache if response_cache is not None else get_response_cache()
+        self._refreshing = set()
+        self._refreshing_lock = threading.Lock()
+        self.inflight = SingleFlight() if coalesce else None
+        self.telemetry = telemetry if telemetry is not None else get_recorder()
+        self.tracer = tracer
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Closes the underlying session and its pooled connections."""
+        self.session.close()
+
+    def _send(self, url: str, data: Dict[str, Any], headers: Dict[str, str], stream: bool = False,
+              trace: Optional[RequestTrace] = None) -> requests.Response:
+        tokens = estimate_payload_tokens(data)
+        # Encoded once, not on every retry.
+        body = codec.dumps(data)
+        if self.compress is not None and len(body) >= self.compress_min_bytes:
+            body = codec.compress(body, self.compress)
+            headers = dict(headers)
+            headers["Content-Encoding"] = self.compress
+        attempt = 0
+        while True:
+            wait = self.rate_limiter.reserve(url, tokens)
+            if wait > 0:
+                self.sleep(wait)
+                if trace is not None:
+                    trace.add("queue", wait)
+            try:
+                if trace is None:
+                    response = self.session.post(url, data=body, headers=headers, stream=stream)
+                else:
+                    response = self._traced_post(url, body, headers, trace)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                if not self.retry.should_retry(attempt):
+                    raise JinaAPIError(f"API request failed: {e}")
+                self._backoff(self.retry.delay(attempt), trace)
+                attempt += 1
+                continue
+            except requests.exceptions.RequestException as e:
+                raise JinaAPIError(f"API request failed: {e}")
+
+            if response.status_code < 400 or not self.retry.should_retry(attempt, response.status_code):
+                return response
+            response.close()
+            delay = self.retry.delay(attempt, response.headers.get("Retry-After"))
+            if response.status_code == 429:
+                self.rate_limiter.pause(url, delay)
+            else:
+                self._backoff(delay, trace)
+            attempt += 1
+
+    def _traced_post(self, url: str, body: bytes, headers: Dict[str, str],
+                     trace: RequestTrace) -> requests.Response:
+        # Always streamed, so the body download is timed separately from the wait.
+        trace.attempts += 1
+        connecting = trace.connection_time()
+        started = time.perf_counter()
+        with tracing.activate(trace):
+            try:
+                return self.session.post(url, data=body, headers=headers, stream=True)
+            finally:
+                trace.add("wait", time.perf_counter() - started - (trace.connection_time() - connecting))
+
+    def _backoff(self, delay: float, trace: Optional[RequestTrace]):
+        self.sleep(delay)
+        if trace is not None:
+            trace.add("retry", delay)
+
     def post(self, url: str, data: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
         """Makes a POST request to the Jina API."""
+        request_headers = self.session.headers.copy()
+        if headers:
+            request_headers.update(headers)
+
+        if self.inflight is None:
+            # The key costs a second full encode of the body; only pay it when used.
+            if self.response_cache is None or self.response_cache.policy(url) is None:
+                return self._fetch(url, data, request_headers)
+            return self._post(request_key(url, data, request_headers), url, data, request_headers)
+        key = request_key(url, data, request_headers)
+        return self.inflight.do(key, lambda: self._post(key, url, data, request_headers))
+
+    def _post(self, key: str, url: str, data: Dict[str, Any], request_headers: Dict[str, str]) -> Dict[str, Any]:
+        cache = self.response_cache
+        policy = cache.policy(url) if cache is not None else None
+        if policy is None:
+            return self._fetch(url, data, request_headers)
+
+        cached, state = cache.get(key)
+        if cached is not None:
+            if state == STALE:
+                self._refresh(key, url, data, request_headers)
+            return cached
+        result = self._fetch(url, data, request_headers)
+        cache.put(key, url, result, policy)
+        return result
+
+    def _refresh(self, key: str, url: str, data: Dict[str, Any], headers: Dict[str, str]):
+        """Re-fetches a stale cache entry in the background, once per key."""
+        with self._refreshing_lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def run():
+            try:
+                result = self._fetch(url, data, headers)
+                self.response_cache.put(key, url, result, self.response_cache.policy(url))
+            except JinaAPIError:
+                pass  # keep serving the stale entry until it expires
+            finally:
+                with self._refreshing_lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=run, name="jina-cache-refresh", daemon=True).start()
+
+    def _fetch(self, url: str, data: Dict[str, Any], request_headers: Dict[str, str]) -> Dict[str, Any]:
+        started = time.perf_counter()
+        tracer = self.tracer or tracing.get_tracer()
+        trace = RequestTrace(url, data.get("model")) if tracer is not None else None
+        response = result = error = None
         try:
-            request_headers = self.session.headers.copy()
-            if headers:
-                request_headers.update(headers)
-                
-            response = self.session.post(url, json=data, headers=request_headers)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            raise JinaAPIError(f"API request failed: {e}")
-        except ValueError:
-            raise JinaAPIError(f"Invalid JSON response from {url}: {response.text}")
+            response = self._send(url, data, request_headers, trace=trace)
+            try:
+                response.raise_for_status()
+            except requests.exceptions.RequestException as e:
+                raise JinaAPIError(f"API request failed: {e}", status_code=response.status_code)
+            try:
+                if trace is None:
+                    result = codec.loads(response.content)
+                else:
+                    with trace.phase("download"):
+                        response.content
+                    with trace.phase("decode"):
+                        result = codec.loads(response.content)
+            except ValueError:
+                raise JinaAPIError(f"Invalid JSON response from {url}: {response.text}")
+            return result
+        except JinaAPIError as e:
+            error = e
+            raise
+        finally:
+            self._record(url, data, response, result, started)
+            if trace is not None:
+                trace.finish(*_sizes(response), error=error)
+                tracer.record(trace)
+
+    def _record(self, url: str, data: Dict[str, Any], response: Optional[requests.Response],
+                result: Any, started: float):
+        if self.telemetry is None:
+            return
+        self.telemetry.record(url, data.get("model"), *_sizes(response),
+                              usage_tokens(result), time.perf_counter() - started)
+
+    def post_iter(self, url: str, data: Dict[str, Any], key: str = "data",
+                  envelope: Optional[Dict[str, Any]] = None,
+                  headers: Optional[Dict[str, str]] = None) -> Iterator[Any]:
+        """
+        Makes a POST request and yields the items of the response's ``key``
+        array as they are decoded from the body.
+
+        The response's other fields (``usage``, ``model`` and so on) are stored
+        in ``envelope`` once the items are exhausted. Bodies of at least
+        ``codec.STREAM_MIN_BYTES`` (or of unknown length) are never held whole,
+        either as bytes or as parsed JSON; smaller ones are decoded in one
+        step, which is faster. Requests are not coalesced;
+        cacheable endpoints go through post() so their responses are cached.
+        """
+        if envelope is None:
+            envelope = {}
+        if self.response_cache is not None and self.response_cache.policy(url) is not None:
+            result = self.post(url, data, headers)
+            envelope.update((name, value) for name, value in result.items() if name != key)
+            for item in result.get(key) or []:
+                yield item
+            return
+
+        request_headers = self.session.headers.copy()
+        if headers:
+            request_headers.update(headers)
+        started = time.perf_counter()
+        tracer = self.tracer or tracing.get_tracer()
+        trace = RequestTrace(url, data.get("model")) if tracer is not None else None
+        response = error = None
+        received = 0
+
+        def counted(chunks):
+            nonlocal received
+            for chunk in chunks:
+                received += len(chunk)
+                yield chunk
+
+        try:
+            response = self._send(url, data, request_headers, stream=True, trace=trace)
+            with response:
+                try:
+                    response.raise_for_status()
+                except requests.exceptions.RequestException as e:
+                    raise JinaAPIError(f"API request failed: {e}", status_code=response.status_code)
+                chunks = response.iter_content(STREAM_CHUNK_SIZE)
+                if trace is not None:
+                    chunks = tracing.timed(chunks, trace, "download")
+                try:
+                    if _streamed(response):
+                        items = codec.iter_items(counted(chunks), key, envelope)
+                    else:
+                        body = b"".join(counted(chunks))
+                        if trace is None:
+                            result = codec.loads(body)
+                        else:
+                            with trace.phase("decode"):
+                                result = codec.loads(body)
+                        if not isinstance(result, dict):
+                            raise ValueError("expected a JSON object")
+                        items = result.pop(key, None)
+                        if not isinstance(items, list):
+                            if items is not None:
+                                result[key] = items
+                            items = []
+                        envelope.update(result)
+                    for item in items:
+                        yield item
+                except ValueError as e:
+                    raise JinaAPIError(f"Invalid JSON response from {url}: {e}")
+                except requests.exceptions.RequestException as e:
+                    raise JinaAPIError(f"API stream failed: {e}")
+        except JinaAPIError as e:
+            error = e
+            raise
+        finally:
+            status = response.status_code if response is not None else None
+            if self.telemetry is not None:
+                self.telemetry.record(url, data.get("model"), status, _request_size(response), received,
+                                      usage_tokens(envelope), time.perf_counter() - started)
+            if trace is not None:
+                trace.finish(status, _request_size(response), received, error=error)
+                tracer.record(trace)
+
+    def post_stream(self, url: str, data: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> Iterator[str]:
+        """Makes a streaming POST request and yields response lines as they arrive."""
+        request_headers = self.session.headers.copy()
+        request_headers["Accept"] = "text/event-stream"
+        if headers:
+            request_headers.update(headers)
+
+        started = time.perf_counter()
+        tracer = self.tracer or tracing.get_tracer()
+        trace = RequestTrace(url, data.get("model")) if tracer is not None else None
+        usage = StreamUsage()
+        response = error = None
+        try:
+            response = self._send(url, data, request_headers, stream=True, trace=trace)
+            with response:
+                try:
+                    response.raise_for_status()
+                except requests.exceptions.RequestException as e:
+                    raise JinaAPIError(f"API request failed: {e}", status_code=response.status_code)
+                response.encoding = response.encoding or "utf-8"
+                lines = response.iter_lines(decode_unicode=True)
+                if trace is not None:
+                    lines = tracing.timed(lines, trace, "download")
+                try:
+                    for line in lines:
+                        usage.feed(line)
+                        yield line
+                except requests.exceptions.RequestException as e:
+                    raise JinaAPIError(f"API stream failed: {e}")
+        except JinaAPIError as e:
+            error = e
+            raise
+        finally:
+            status = response.status_code if response is not None else None
+            if self.telemetry is not None:
+                self.telemetry.record(url, data.get("model"), status, _request_size(response), usage.bytes_in,
+                                      usage.tokens, time.perf_counter() - started)
+            if trace is not None:
+                trace.finish(status, _request_size(response), usage.bytes_in, error=error)
+                tracer.record(trace)
+
+
+def _streamed(response) -> bool:
+    """Whether a response body is large enough, or of unknown size, to decode incrementally."""
+    length = response.headers.get("Content-Length")
+    return length is None or not length.isdigit() or int(length) >= codec.STREAM_MIN_BYTES
+
+def _sizes(response: Optional[requests.Response]) -> Tuple[Optional[int], Optional[int], Optional[int]]:
+    """Status, request body size and response body size of a response, if any."""
+    if response is None:
+        return None, None, None
+    return response.status_code, _request_size(response), len(response.content)
+
+def _request_size(response: Optional[requests.Response]) -> Optional[int]:
+    body = response.request.body if response is not None and response.request is not None else None
+    return len(body) if body is not None else None
+
+
+# Process-wide registry of shared clients, keyed by API key.
+_clients: Dict[str, JinaClient] = {}
+_clients_lock = threading.Lock()
+
+def get_client(api_key: Optional[str] = None) -> JinaClient:
+    """Returns the shared client for an API key, creating it on first use."""
+    api_key = api_key or os.getenv("JINA_API_KEY")
+    if not api_key:
+        raise JinaAPIError("JINA_API_KEY environment variable is required.")
+    with _clients_lock:
+        client = _clients.get(api_key)
+        if client is None:
+            client = JinaClient(api_key=api_key)
+            _clients[api_key] = client
+        return client
+
+def set_client(client: JinaClient) -> Optional[JinaClient]:
+    """Installs a client as the shared instance for its API key.
+
+    Returns the client it replaced, if any, so callers can close or restore it.
+    """
+    with _clients_lock:
+        previous = _clients.get(client.api_key)
+        _clients[client.api_key] = client
+        return previous
+
+def close_clients():
+    """Closes and forgets every shared client."""
+    with _clients_lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    for client in clients:
+        client.close()
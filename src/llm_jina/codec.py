@@ -0,0 +1,241 @@
+"""
+JSON encoding and decoding of Jina API requests and responses.
+
+orjson is used when installed (``pip install 'llm-jina[fast]'``); otherwise
+the standard library. ``iter_items`` decodes a response incrementally, so a
+large body never has to be held in memory alongside its parsed form, and
+``compress`` applies a request ``Content-Encoding``.
+"""
+import gzip
+import io
+import json
+import re
+from typing import Any, Dict, Iterable, Iterator, Optional, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+# Requests for at least this many items go through JinaClient.post_iter,
+# which streams the decode once the response reaches STREAM_MIN_BYTES on the
+# wire (or has no Content-Length); smaller bodies are decoded whole, which is
+# faster with orjson.
+STREAM_MIN_ITEMS = 128
+STREAM_MIN_BYTES = 4 * 1024 * 1024
+
+# Request body encodings, and the levels used: fast settings that still
+# shrink JSON text several times over.
+COMPRESSIONS = ("gzip", "br")
+GZIP_LEVEL = 5
+BROTLI_QUALITY = 4
+# Smaller bodies are sent uncompressed; the saving would be a few hundred
+# bytes at most.
+DEFAULT_COMPRESS_MIN_BYTES = 1024
+
+# Consumed bytes are only dropped from a streaming buffer beyond this size.
+_COMPACT_BYTES = 64 * 1024
+_WHITESPACE = b" \t\n\r"
+_QUOTE = ord('"')
+_BACKSLASH = ord("\\")
+_STRUCTURAL = b'"[]{}'
+_STRUCTURE = re.compile(rb'["\[\]{}]')
+_STRUCTURE_WINDOW = 256
+_SCALAR_END = re.compile(rb'[,\]}\s]')
+
+def dumps(obj: Any) -> bytes:
+    """Encodes a request body as compact UTF-8 JSON."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+def loads(data: Union[bytes, bytearray, str]) -> Any:
+    """Decodes a JSON document, raising ValueError if it is malformed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    """Compresses a request body with ``gzip`` or ``br`` (brotli)."""
+    if encoding == "gzip":
+        # mtime=0 makes identical bodies compress to identical bytes.
+        buffer = io.BytesIO()
+        with gzip.GzipFile(fileobj=buffer, mode="wb", compresslevel=GZIP_LEVEL, mtime=0) as file:
+            file.write(body)
+        return buffer.getvalue()
+    if encoding == "br":
+        try:
+            import brotli
+        except ImportError:
+            raise ImportError("Brotli compression requires brotli: pip install 'llm-jina[brotli]'")
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    raise ValueError(f"Unsupported compression {encoding!r}; use one of {', '.join(COMPRESSIONS)}")
+
+
+class _Buffer:
+    """
+    Bytes received so far from a stream of chunks, with a read position.
+
+    Values are delimited by scanning for quotes and brackets with ``find``
+    and a short regex window, never rescanning a byte, and each value is
+    then decoded once with ``loads`` (orjson when installed). Only ASCII
+    bytes are structural in JSON, so the scan runs on raw UTF-8.
+    """
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self.data = bytearray()
+        self.pos = 0
+
+    def more(self) -> bool:
+        """Appends the next chunk; False once the stream is exhausted."""
+        for chunk in self._chunks:
+            if chunk:
+                # Drop what has been consumed once it is most of the buffer, so
+                # the buffer stays small without copying it on every chunk.
+                if self.pos > _COMPACT_BYTES and self.pos * 2 > len(self.data):
+                    del self.data[:self.pos]
+                    self.pos = 0
+                self.data += chunk
+                return True
+        return False
+
+    def peek(self) -> int:
+        """Returns the next non-whitespace byte without consuming it."""
+        while True:
+            while self.pos < len(self.data) and self.data[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.data):
+                return self.data[self.pos]
+            if not self.more():
+                raise ValueError("Unexpected end of JSON response")
+
+    def expect(self, chars: bytes) -> int:
+        char = self.peek()
+        if char not in chars:
+            raise ValueError(f"Expected one of {chars.decode()!r} at offset {self.pos}, found {chr(char)!r}")
+        self.pos += 1
+        return char
+
+    def _end(self) -> int:
+        """Finds the end of the value at ``pos``, reading more chunks as needed."""
+        # The scan position is kept relative to ``pos`` because more() may
+        # shift the buffer; bytes already scanned are never scanned again.
+        scan = 0
+        if self.data[self.pos] not in b'"[{':
+            while True:
+                match = _SCALAR_END.search(self.data, self.pos + scan)
+                if match is not None:
+                    return match.start()
+                scan = len(self.data) - self.pos
+                if not self.more():
+                    return len(self.data)
+        depth = 0
+        in_string = False
+        upcoming = {}  # type: Dict[int, int]
+        while True:
+            if in_string:
+                # find() is a memchr, far faster than a regex over long strings.
+                quote = self.data.find(b'"', self.pos + scan)
+                if quote >= 0:
+                    scan = quote + 1 - self.pos
+                    backslashes = 0
+                    while self.data[quote - 1 - backslashes] == _BACKSLASH:
+                        backslashes += 1
+                    # A quote after an odd run of backslashes is escaped.
+                    if backslashes % 2 == 0:
+                        in_string = False
+                        if depth == 0:
+                            return quote + 1
+                    continue
+                scan = len(self.data) - self.pos
+            else:
+                found = self._next_structural(scan, upcoming)
+                if found is not None:
+                    char = self.data[self.pos + found]
+                    scan = found + 1
+                    if char == _QUOTE:
+                        in_string = True
+                    elif char in b"[{":
+                        depth += 1
+                    else:
+                        depth -= 1
+                        if depth == 0:
+                            return self.pos + scan
+                    continue
+                scan = len(self.data) - self.pos
+            # Characters not found so far may be in the next chunk.
+            upcoming = {char: found for char, found in upcoming.items() if found >= 0}
+            if not self.more():
+                raise ValueError("Truncated JSON response")
+
+    def _next_structural(self, scan: int, upcoming: Dict[int, int]) -> Optional[int]:
+        """
+        The offset from ``pos`` of the first quote or bracket at or after
+        ``scan``, or None if there is none in the buffer yet.
+
+        Each character is located with ``find`` (a memchr) and its position is
+        kept in ``upcoming`` (-1 when absent) until the scan passes it, so every
+        byte is searched at most once per character.
+        """
+        # Structure is usually dense (small objects, short keys); a regex over
+        # a short window finds it without the per-character bookkeeping.
+        start = self.pos + scan
+        match = _STRUCTURE.search(self.data, start, start + _STRUCTURE_WINDOW)
+        if match is not None:
+            return match.start() - self.pos
+        first = None
+        for char in _STRUCTURAL:
+            found = upcoming.get(char)
+            if found is None or 0 <= found < scan:
+                found = self.data.find(char, self.pos + scan)
+                found = upcoming[char] = found - self.pos if found >= 0 else -1
+            if found >= 0 and (first is None or found < first):
+                first = found
+        return first
+
+    def value(self) -> Any:
+        """Decodes the next complete JSON value, reading more chunks as needed."""
+        self.peek()
+        end = self._end()
+        value = loads(self.data[self.pos:end])
+        self.pos = end
+        return value
+
+
+def iter_items(chunks: Iterable[bytes], key: str = "data",
+               envelope: Optional[Dict[str, Any]] = None) -> Iterator[Any]:
+    """
+    Incrementally decodes a JSON object from byte chunks, yielding each
+    element of its top-level ``key`` array as soon as it is complete.
+
+    The object's other fields (``usage``, ``model`` and so on) are stored in
+    ``envelope``, which is complete once the iterator is exhausted. Raises
+    ValueError on malformed JSON or if the document is not an object.
+    """
+    buffer = _Buffer(chunks)
+    if envelope is None:
+        envelope = {}
+    buffer.expect(b"{")
+    if buffer.peek() == ord("}"):
+        buffer.pos += 1
+        return
+    while True:
+        name = buffer.value()
+        if not isinstance(name, str):
+            raise ValueError("Expected an object key in JSON response")
+        buffer.expect(b":")
+        if name == key and buffer.peek() == ord("["):
+            buffer.pos += 1
+            if buffer.peek() == ord("]"):
+                buffer.pos += 1
+            else:
+                while True:
+                    yield buffer.value()
+                    if buffer.expect(b",]") == ord("]"):
+                        break
+        else:
+            envelope[name] = buffer.value()
+        if buffer.expect(b",}") == ord("}"):
+            return
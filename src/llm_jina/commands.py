@@ -3,24 +3,63 @@ Command-line interface for llm-jina.
 """
 import click
 import json
+import time
 from pathlib import Path
 from . import reader, search, classifier, segmenter, deepsearch as ds
 from . import rerank as rerank_module
+from . import index as index_module
+from . import embed_file as embed_file_module
+from . import records
+from . import telemetry
+from . import tracing
 from .metaprompt import jina_metaprompt
+from .cache import EmbeddingCache, ResponseCache
 from .exceptions import APIError, CodeValidationError
 
 @click.group()
-def cli():
+@click.option('--trace', is_flag=True, help='Print a per-phase timing breakdown of API requests to stderr')
+@click.pass_context
+def cli(ctx, trace):
     """Jina AI API command-line interface."""
-    pass
+    if trace:
+        collector = tracing.TimingCollector()
+        previous = tracing.set_tracer(collector)
+
+        def report():
+            tracing.set_tracer(previous)
+            click.echo(collector.format(), err=True)
+
+        ctx.call_on_close(report)
 
 @cli.command()
-@click.argument('url')
+@click.argument('url', required=False)
 @click.option('--format', 'return_format', default='markdown', help='Return format (markdown, html, text)')
-def read(url, return_format):
-    """Read content from a URL."""
-    result = reader.read(url=url, return_format=return_format)
-    click.echo(json.dumps(result, indent=2))
+@click.option('--from-file', 'url_file', type=click.File('r'), help='Read every URL in this file (one per line, - for stdin)')
+@click.option('--concurrency', default=8, show_default=True, type=click.IntRange(min=1),
+              help='Maximum reads in flight with --from-file')
+@click.option('--per-domain', default=2, show_default=True, type=click.IntRange(min=1),
+              help='Maximum concurrent reads per domain with --from-file')
+@click.option('--domain-delay', default=0.0, show_default=True, help='Minimum seconds between reads of one domain')
+def read(url, return_format, url_file, concurrency, per_domain, domain_delay):
+    """Read content from a URL, or many URLs from a file as JSON lines."""
+    if url_file is None:
+        if not url:
+            raise click.UsageError("Provide a URL or --from-file")
+        result = reader.read(url=url, return_format=return_format)
+        click.echo(json.dumps(result, indent=2))
+        return
+
+    urls = list(url_file)
+    if url:
+        urls.insert(0, url)
+    failures = 0
+    total = 0
+    for record in reader.read_many(urls, return_format=return_format, max_workers=concurrency,
+                                   per_domain=per_domain, domain_delay=domain_delay):
+        total += 1
+        failures += not record["ok"]
+        click.echo(json.dumps(record))
+    click.echo(f"Read {total - failures} of {total} URLs, {failures} failed", err=True)
 
 @cli.command()
 @click.argument('query')
@@ -33,28 +72,83 @@ def websearch(query, site, num_results):
 
 @cli.command()
 @click.argument('query')
-@click.argument('documents', nargs=-1, required=True)
+@click.argument('documents', nargs=-1)
 @click.option('--model', default='jina-reranker-v2-base-multilingual', help='Reranker model')
 @click.option('--top-n', type=int, help='Number of top results')
-def rerank(query, documents, model, top_n):
+@click.option('--from-file', 'documents_file', type=click.File('r'), help='Read documents from this file, one per line')
+@click.option('--shard-size', default=rerank_module.DEFAULT_SHARD_SIZE, show_default=True,
+              help='Documents per request; larger sets are scored in concurrent shards')
+@click.option('--cascade', is_flag=True, help='Score everything with a cheap model first, then rerank the survivors with --model')
+@click.option('--cascade-model', default=rerank_module.DEFAULT_CASCADE_MODEL, show_default=True,
+              help='First-stage model for --cascade')
+@click.option('--survivors', default=rerank_module.DEFAULT_SURVIVORS, show_default=True,
+              help='Documents passed from the first stage to the second with --cascade')
+def rerank(query, documents, model, top_n, documents_file, shard_size, cascade, cascade_model, survivors):
     """Rerank documents by relevance."""
-    result = rerank_module.rerank(query=query, documents=list(documents), model=model, top_n=top_n)
+    documents = list(documents)
+    if documents_file is not None:
+        documents.extend(line.rstrip("\n") for line in documents_file if line.strip())
+    if not documents:
+        raise click.UsageError("Provide documents as arguments or with --from-file")
+    if cascade:
+        result = rerank_module.cascade_rerank(query=query, documents=documents, model=model,
+                                              first_model=cascade_model, survivors=survivors,
+                                              top_n=top_n, shard_size=shard_size)
+        for stage in result["stages"]:
+            click.echo(f"{stage['model']}: {stage['documents']} documents, "
+                       f"{stage['seconds']}s, {stage['total_tokens']} tokens", err=True)
+    elif len(documents) > shard_size:
+        result = rerank_module.rerank_sharded(query=query, documents=documents, model=model,
+                                              top_n=top_n, shard_size=shard_size)
+    else:
+        result = rerank_module.rerank(query=query, documents=documents, model=model, top_n=top_n)
     click.echo(json.dumps(result, indent=2))
 
 @cli.command()
-@click.argument('text')
+@click.argument('text', required=False)
 @click.option('--return-chunks', is_flag=True, help='Return semantic chunks')
-def segment(text, return_chunks):
+@click.option('--file', 'text_file', type=click.File('r'), help='Stream chunks of this file (- for stdin) as JSON lines')
+@click.option('--window-size', default=segmenter.DEFAULT_WINDOW_SIZE, show_default=True,
+              help='Characters sent per request with --file')
+@click.option('--overlap', default=segmenter.DEFAULT_OVERLAP, show_default=True,
+              help='Characters shared by consecutive windows with --file')
+@click.option('--concurrency', default=4, show_default=True, type=click.IntRange(min=1),
+              help='Windows segmented in parallel with --file')
+def segment(text, return_chunks, text_file, window_size, overlap, concurrency):
     """Segment text into tokens or chunks."""
+    if text_file is not None:
+        for chunk in segmenter.segment_stream(text_file, window_size=window_size, overlap=overlap,
+                                              max_workers=concurrency):
+            click.echo(json.dumps(chunk))
+        return
+    if text is None:
+        raise click.UsageError("Provide TEXT or --file")
     result = segmenter.segment(content=text, return_chunks=return_chunks)
     click.echo(json.dumps(result, indent=2))
 
 @cli.command()
 @click.argument('query')
-def deepsearch(query):
+@click.option('--stream', is_flag=True, help='Print reasoning and answer as they arrive')
+def deepsearch(query, stream):
     """Perform comprehensive investigation."""
-    result = ds.deepsearch(query=query)
-    click.echo(json.dumps(result, indent=2))
+    if not stream:
+        result = ds.deepsearch(query=query)
+        click.echo(json.dumps(result, indent=2))
+        return
+    # Reasoning and URLs go to stderr so stdout carries only the answer.
+    urls = []
+    for event in ds.stream_deepsearch(query=query):
+        if event["type"] == "reasoning":
+            click.echo(event["content"], nl=False, err=True)
+        elif event["type"] == "answer":
+            click.echo(event["content"], nl=False)
+        elif event["type"] == "urls" and event["source"] == "visitedURLs":
+            urls = event["urls"]
+    click.echo()
+    if urls:
+        click.echo("\nVisited URLs:", err=True)
+        for url in urls:
+            click.echo(f"  {url}", err=True)
 
 
 
@@ -71,27 +165,177 @@ if __name__ == '__main__':
     cli()
 
 @cli.command()
-@click.argument('input_text', nargs=-1, required=True)
+@click.argument('input_text', nargs=-1)
 @click.option('--labels', required=True, help='Comma-separated list of labels for classification')
 @click.option('--model', help='Model to use for classification (auto-detected if not specified)')
 @click.option('--image', is_flag=True, help='Treat input as image file paths')
-def classify(input_text, labels, model, image):
+@click.option('--max-size', type=int, help='Downsize images to at most this many pixels per side '
+              '(default: the model input resolution; 0 to send originals; needs Pillow)')
+@click.option('--batch-size', default=classifier.DEFAULT_IMAGE_BATCH_SIZE, show_default=True, help='Images per request with --image')
+@click.option('--from-file', 'input_file', type=click.File('r'),
+              help='Classify every record of this JSONL, CSV or text file (- for stdin), printing JSON lines')
+@click.option('--format', 'input_format', type=click.Choice(records.FORMATS), help='Input format (detected from the file name)')
+@click.option('--id-field', default='id', show_default=True, help='JSONL/CSV field holding the record id')
+@click.option('--text-field', default='text', show_default=True, help='JSONL/CSV field holding the text')
+@click.option('--shard-size', default=classifier.DEFAULT_SHARD_SIZE, show_default=True, help='Inputs per request with --from-file')
+@click.option('--concurrency', default=4, show_default=True, type=click.IntRange(min=1),
+              help='Shards classified in parallel with --from-file')
+@click.option('--unordered', is_flag=True, help='Print rows as shards complete instead of in input order')
+@click.option('--checkpoint', type=click.Path(dir_okay=False), help='Resume from and record progress in this file')
+@click.option('-o', '--output', type=click.Path(dir_okay=False, allow_dash=True), default='-',
+              help='Write JSON lines here; appended to when resuming from --checkpoint')
+def classify(input_text, labels, model, image, max_size, batch_size, input_file, input_format, id_field, text_field,
+             shard_size, concurrency, unordered, checkpoint, output):
     """Classify text or images using Jina AI Classifier API."""
     labels_list = [label.strip() for label in labels.split(',')]
-    
+
+    if input_file is not None:
+        if image:
+            raise click.UsageError("--image cannot be combined with --from-file")
+        input_name = getattr(input_file, "name", None)
+        input_format = input_format or records.detect_format(input_name)
+        rows = records.iter_records(input_file, format=input_format, id_field=id_field, text_field=text_field)
+        progress = None
+        if checkpoint:
+            # Everything that decides which records land in which shard.
+            source = '-' if input_name in (None, '-', '<stdin>') else str(Path(input_name).resolve())
+            progress = records.Checkpoint(checkpoint, params={
+                "input": source, "format": input_format, "id_field": id_field, "text_field": text_field,
+                "labels": labels_list, "model": model, "shard_size": shard_size,
+                "shard_tokens": classifier.DEFAULT_SHARD_TOKENS,
+            })
+        results = classifier.classify_bulk(rows, labels_list, model=model, shard_size=shard_size,
+                                           max_workers=concurrency, ordered=not unordered, checkpoint=progress)
+        mode = 'a' if progress is not None and progress.completed else 'w'
+        with click.open_file(output, mode) as out:
+            for row in results:
+                out.write(json.dumps(row) + "\n")
+                # Flushed per row so a checkpointed shard is never ahead of the output.
+                out.flush()
+        return
+    if not input_text:
+        raise click.UsageError("Provide INPUT_TEXT or --from-file")
+
     if image:
-        import base64
-        input_data = []
-        for img_path in input_text:
-            try:
-                with open(img_path, 'rb') as img_file:
-                    img_base64 = base64.b64encode(img_file.read()).decode('utf-8')
-                    input_data.append({'image': img_base64})
-            except IOError as e:
-                click.echo(f'Error reading image file {img_path}: {str(e)}', err=True)
-                return
-    else:
-        input_data = list(input_text)
-    
+        try:
+            result = classifier.classify_images(input_text, labels_list, model=model or "jina-clip-v2",
+                                                max_size=max_size, batch_size=batch_size)
+        except IOError as e:
+            click.echo(f'Error reading image file {e.filename}: {str(e)}', err=True)
+            return
+        click.echo(json.dumps(result, indent=2))
+        return
+
+    input_data = list(input_text)
     result = classifier.classify(inputs=input_data, labels=labels_list, model=model)
     click.echo(json.dumps(result, indent=2))
+
+@cli.group()
+def cache():
+    """Inspect or clear the local Jina caches."""
+    pass
+
+@cache.command(name="stats")
+def cache_stats():
+    """Show cache sizes and hit/miss counters."""
+    click.echo(json.dumps({
+        "embeddings": EmbeddingCache().stats(),
+        "responses": ResponseCache().stats(),
+    }, indent=2))
+
+@cache.command(name="clear")
+@click.option('--embeddings', 'which', flag_value='embeddings', help='Only clear cached embeddings')
+@click.option('--responses', 'which', flag_value='responses', help='Only clear cached API responses')
+def cache_clear(which):
+    """Remove cached embeddings and API responses."""
+    if which in (None, 'embeddings'):
+        EmbeddingCache().clear()
+        click.echo("Embedding cache cleared.")
+    if which in (None, 'responses'):
+        ResponseCache().clear()
+        click.echo("Response cache cleared.")
+
+@cli.group()
+def index():
+    """Build and query memory-mapped vector indexes of embedding collections."""
+    pass
+
+@index.command(name="build")
+@click.argument('collection')
+@click.argument('path', type=click.Path(file_okay=False))
+@click.option('--dtype', type=click.Choice(index_module.DTYPES), default='float32', show_default=True,
+              help='Storage type; int8 is 4x smaller at a small cost in precision')
+@click.option('--append', is_flag=True, help='Only add ids that are not in the index yet')
+@click.option('-d', '--database', type=click.Path(dir_okay=False), help='llm embeddings database to read')
+def index_build(collection, path, dtype, append, database):
+    """Export an embeddings collection into a vector index at PATH."""
+    try:
+        built, added = index_module.build_index(collection, path, dtype=dtype, append=append, database=database)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    click.echo(f"Added {added} vectors; {built.count} x {built.dimensions} {built.dtype} in {path}", err=True)
+
+@index.command(name="query")
+@click.argument('path', type=click.Path(exists=True, file_okay=False))
+@click.argument('text')
+@click.option('-n', '--number', default=10, show_default=True, help='Number of results to return')
+@click.option('--threads', default=4, show_default=True, help='Threads used to scan large indexes')
+def index_query(path, text, number, threads):
+    """Find the ids in the index at PATH most similar to TEXT."""
+    import llm
+    vector_index = index_module.VectorIndex(path)
+    model = llm.get_embedding_model(vector_index.meta["model"])
+    for row_id, score in vector_index.query(model.embed(text), n=number, threads=threads):
+        click.echo(json.dumps({"id": row_id, "score": score}))
+
+@cli.command()
+@click.option('--since', default='24h', show_default=True, help='Only requests in this window, e.g. 15m, 24h, 7d')
+@click.option('--by', 'bucket', type=click.Choice(sorted(telemetry.BUCKETS)), help='Also break down by time window')
+@click.option('--clear', is_flag=True, help='Delete all recorded requests')
+def stats(since, bucket, clear):
+    """Show request counts, latency percentiles and token spend per endpoint."""
+    recorder = telemetry.UsageRecorder()
+    if clear:
+        recorder.clear()
+        click.echo("Usage statistics cleared.")
+        return
+    try:
+        window = telemetry.parse_duration(since)
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint='--since')
+    click.echo(json.dumps(recorder.stats(since=time.time() - window, bucket=bucket), indent=2))
+
+@cli.command(name="embed-file")
+@click.argument('input_path', metavar='INPUT', type=click.Path(exists=True, dir_okay=False))
+@click.argument('output', type=click.Path(dir_okay=False))
+@click.option('-m', '--model', 'model_id', default='jina-v3', show_default=True, help='Jina embedding model or alias')
+@click.option('--format', 'input_format', type=click.Choice(records.FORMATS), help='Input format (detected from the file name)')
+@click.option('--id-field', default='id', show_default=True, help='JSONL/CSV field holding the record id')
+@click.option('--text-field', default='text', show_default=True, help='JSONL/CSV field holding the text')
+@click.option('--dtype', type=click.Choice(index_module.DTYPES), default='float32', show_default=True,
+              help='Storage type; int8 stores normalised vectors scaled to [-127, 127]')
+@click.option('--batch-size', default=embed_file_module.DEFAULT_BATCH_SIZE, show_default=True,
+              help='Records per batch; progress is checkpointed after each one')
+def embed_file(input_path, output, model_id, input_format, id_field, text_field, dtype, batch_size):
+    """Embed every record of a JSONL, CSV or text file into a memory-mapped .npy at OUTPUT.
+
+    Row ids are written alongside, to OUTPUT with a .ids.jsonl suffix. Re-running an
+    interrupted command resumes after the last completed batch.
+    """
+    import llm
+    from .embeddings import JinaEmbeddings
+    model = llm.get_embedding_model(model_id)
+    if not isinstance(model, JinaEmbeddings):
+        raise click.BadParameter(f"{model_id} is not a Jina embedding model", param_hint='--model')
+
+    def progress(done, total):
+        click.echo(f"{done}/{total} records embedded", err=True)
+
+    try:
+        (rows, dimensions), embedded = embed_file_module.embed_file(
+            input_path, output, model, format=input_format, id_field=id_field, text_field=text_field,
+            dtype=dtype, batch_size=batch_size, progress=progress)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    click.echo(f"Embedded {embedded} records; {rows} x {dimensions} {dtype} in {output}, "
+               f"ids in {embed_file_module.ids_path(output)}", err=True)
@@ -0,0 +1,156 @@
+"""
+Thread-based fan-out helpers for issuing many Jina API requests at once.
+"""
+import time
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Hashable, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+def _check_workers(max_workers: int):
+    if max_workers < 1:
+        raise ValueError("max_workers must be at least 1")
+
+def run_concurrently(func: Callable[[T], R], items: Iterable[T], max_workers: int) -> List[R]:
+    """
+    Applies ``func`` to every item using up to ``max_workers`` threads.
+
+    Results are returned in input order. The first exception raised by any
+    call is re-raised once the running calls have finished.
+    """
+    _check_workers(max_workers)
+    items = list(items)
+    if max_workers <= 1 or len(items) <= 1:
+        return [func(item) for item in items]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+        return list(executor.map(func, items))
+
+def iter_by_key(
+    func: Callable[[T], R],
+    items: Iterable[T],
+    key: Callable[[T], Hashable],
+    max_workers: int,
+    per_key: int = 1,
+    min_interval: float = 0.0,
+) -> Iterator[Tuple[T, Optional[R], Optional[Exception]]]:
+    """
+    Applies ``func`` concurrently while limiting how hard each key is hit.
+
+    At most ``max_workers`` calls run in total, at most ``per_key`` of them for
+    the same key, and calls for one key start at least ``min_interval``
+    seconds apart. Keys are served round-robin so one large group cannot
+    starve the rest. Yields ``(item, result, error)`` as calls complete;
+    failures are reported rather than raised.
+    """
+    _check_workers(max_workers)
+    if per_key < 1:
+        raise ValueError("per_key must be at least 1")
+    pending = OrderedDict()
+    for item in items:
+        pending.setdefault(key(item), deque()).append(item)
+    active = Counter()
+    last_start = {}
+    futures = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while pending or futures:
+            now = time.monotonic()
+            next_ready = None
+            progress = True
+            while progress and len(futures) < max_workers:
+                progress = False
+                for group in list(pending):
+                    if len(futures) >= max_workers:
+                        break
+                    if active[group] >= per_key:
+                        continue
+                    ready_at = last_start.get(group, now - min_interval) + min_interval
+                    if ready_at > now:
+                        next_ready = ready_at if next_ready is None else min(next_ready, ready_at)
+                        continue
+                    queue = pending[group]
+                    item = queue.popleft()
+                    if queue:
+                        pending.move_to_end(group)
+                    else:
+                        del pending[group]
+                    active[group] += 1
+                    last_start[group] = now
+                    futures[executor.submit(func, item)] = (group, item)
+                    progress = True
+
+            timeout = None if next_ready is None else max(0.0, next_ready - time.monotonic())
+            if not futures:
+                time.sleep(timeout or 0.0)
+                continue
+            done, _ = wait(futures, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                group, item = futures.pop(future)
+                active[group] -= 1
+                try:
+                    yield item, future.result(), None
+                except Exception as e:
+                    yield item, None, e
+
+def iter_completed(func: Callable[[T], R], items: Iterable[T], max_workers: int) -> Iterator[Tuple[T, R]]:
+    """
+    Applies ``func`` concurrently and yields ``(item, result)`` as calls finish.
+
+    ``items`` is consumed lazily, keeping at most ``max_workers`` calls in
+    flight. The first exception raised by any call propagates to the consumer.
+    """
+    _check_workers(max_workers)
+    if max_workers <= 1:
+        for item in items:
+            yield item, func(item)
+        return
+    iterator = iter(items)
+    futures = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        try:
+            while True:
+                for item in iterator:
+                    futures[executor.submit(func, item)] = item
+                    if len(futures) >= max_workers:
+                        break
+                if not futures:
+                    break
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield futures.pop(future), future.result()
+        finally:
+            for future in futures:
+                future.cancel()
+
+def iter_ordered(func: Callable[[T], R], items: Iterable[T], max_workers: int) -> Iterator[Tuple[T, R]]:
+    """
+    Applies ``func`` concurrently and yields ``(item, result)`` in input order.
+
+    ``items`` is consumed lazily: at most ``max_workers`` calls are submitted
+    ahead of the consumer, so arbitrarily long streams use bounded memory.
+    The first exception raised by any call propagates to the consumer.
+    """
+    _check_workers(max_workers)
+    if max_workers <= 1:
+        for item in items:
+            yield item, func(item)
+        return
+    iterator = iter(items)
+    queue = deque()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        try:
+            for item in iterator:
+                queue.append((item, executor.submit(func, item)))
+                if len(queue) >= max_workers:
+                    break
+            while queue:
+                item, future = queue.popleft()
+                result = future.result()
+                for next_item in iterator:
+                    queue.append((next_item, executor.submit(func, next_item)))
+                    break
+                yield item, result
+        finally:
+            for _, future in queue:
+                future.cancel()
@@ -1,26 +1,91 @@
 """
 Jina AI DeepSearch API implementation.
 """
-from typing import Dict, Any, List, Optional
-from .client import JinaClient
+import json
+from typing import Dict, Any, AsyncIterator, Iterator, List, Optional
+from .client import get_client
+from .async_client import get_async_client
+from .exceptions import JinaAPIError
+from .sse import aiter_sse_data, iter_sse_data
 
-def deepsearch(
-    query: str,
-    history: Optional[List[Dict[str, str]]] = None,
-    **kwargs
-) -> Dict[str, Any]:
-    """Perform a comprehensive investigation using Jina AI DeepSearch API."""
-    client = JinaClient()
-    
+DEEPSEARCH_URL = "https://deepsearch.jina.ai/v1/chat/completions"
+
+def _data(query: str, history: Optional[List[Dict[str, str]]], options: Dict[str, Any],
+          stream: bool = False) -> Dict[str, Any]:
     messages = list(history) if history else []
     messages.append({"role": "user", "content": query})
     
     data = {
         "messages": messages,
-        "stream": False,  # Use blocking mode for simplicity
+        "stream": stream,
     }
-    data.update(kwargs) # Add any other API params
-    
-    response = client.post("https://deepsearch.jina.ai/v1/chat/completions", data=data)
+    data.update(options) # Add any other API params
+    return data
+
+def _events(payload: str) -> List[Dict[str, Any]]:
+    """Turns one streamed chunk into reasoning, answer, URL and usage events."""
+    try:
+        chunk = json.loads(payload)
+    except ValueError:
+        raise JinaAPIError(f"Invalid JSON in DeepSearch stream: {payload[:200]}")
+    events = []
+    for choice in chunk.get("choices") or []:
+        delta = choice.get("delta") or {}
+        content = delta.get("content")
+        if content:
+            kind = "reasoning" if delta.get("type") == "think" else "answer"
+            events.append({"type": kind, "content": content})
+    for key in ("visitedURLs", "readURLs"):
+        if chunk.get(key):
+            events.append({"type": "urls", "source": key, "urls": chunk[key]})
+    if chunk.get("usage"):
+        events.append({"type": "usage", "usage": chunk["usage"]})
+    return events
+
+def deepsearch(
+    query: str,
+    history: Optional[List[Dict[str, str]]] = None,
+    **kwargs
+) -> Dict[str, Any]:
+    """Perform a comprehensive investigation using Jina AI DeepSearch API."""
+    client = get_client()
+    response = client.post(DEEPSEARCH_URL, data=_data(query, history, kwargs))
     return response
 
+def stream_deepsearch(
+    query: str,
+    history: Optional[List[Dict[str, str]]] = None,
+    **kwargs
+) -> Iterator[Dict[str, Any]]:
+    """
+    Streams a DeepSearch investigation as it happens.
+
+    Yields event dicts with a ``type`` of ``reasoning`` or ``answer`` (with a
+    ``content`` delta), ``urls`` (visited or read URLs) or ``usage``.
+    """
+    client = get_client()
+    lines = client.post_stream(DEEPSEARCH_URL, data=_data(query, history, kwargs, stream=True))
+    for payload in iter_sse_data(lines):
+        for event in _events(payload):
+            yield event
+
+async def adeepsearch(
+    query: str,
+    history: Optional[List[Dict[str, str]]] = None,
+    **kwargs
+) -> Dict[str, Any]:
+    """Awaitable variant of deepsearch()."""
+    client = get_async_client()
+    return await client.post(DEEPSEARCH_URL, data=_data(query, history, kwargs))
+
+async def astream_deepsearch(
+    query: str,
+    history: Optional[List[Dict[str, str]]] = None,
+    **kwargs
+) -> AsyncIterator[Dict[str, Any]]:
+    """Async generator variant of stream_deepsearch()."""
+    client = get_async_client()
+    lines = client.post_stream(DEEPSEARCH_URL, data=_data(query, history, kwargs, stream=True))
+    async for payload in aiter_sse_data(lines):
+        for event in _events(payload):
+            yield event
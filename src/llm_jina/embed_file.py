@@ -0,0 +1,130 @@
+"""
+Bulk embedding of JSONL, CSV or text files into memory-mapped ``.npy`` files.
+
+The output is a standard ``.npy`` matrix, pre-allocated with one row per
+input record, so ``numpy.load(path, mmap_mode="r")`` maps it without
+copying. Row ids go to a JSON-lines sidecar in the same order. Progress is
+checkpointed after every batch, and an interrupted run resumes after the
+last batch that reached disk.
+"""
+import itertools
+import json
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Optional, Tuple, Union
+from . import records
+from .index import DTYPES, INT8_SCALE
+
+if TYPE_CHECKING:
+    from .embeddings import JinaEmbeddings
+
+# Records per batch handed to JinaEmbeddings, which splits it into
+# concurrent requests; also the unit of checkpointing.
+DEFAULT_BATCH_SIZE = 1024
+
+def _numpy():
+    try:
+        import numpy as np
+    except ImportError:
+        raise ImportError("embed-file requires numpy: pip install 'llm-jina[numpy]'")
+    return np
+
+def ids_path(output: Union[str, Path]) -> Path:
+    """The id sidecar of an output matrix, e.g. ``vectors.ids.jsonl`` for ``vectors.npy``."""
+    return Path(output).with_suffix(".ids.jsonl")
+
+def checkpoint_path(output: Union[str, Path]) -> Path:
+    """The checkpoint kept next to an output matrix while it is being written."""
+    return Path(output).with_suffix(".checkpoint")
+
+def count_records(path: Union[str, Path], **options) -> int:
+    """Counts the records of an input file, streaming it once."""
+    with open(path, newline="") as f:
+        return sum(1 for _ in records.iter_records(f, **options))
+
+def _truncate_lines(path: Path, lines: int):
+    """Drops everything after the first ``lines`` lines, e.g. ids written for an unfinished batch."""
+    with open(path, "r+b") as f:
+        for _ in range(lines):
+            if not f.readline():
+                raise ValueError(f"{path} has fewer ids than its checkpoint records")
+        f.truncate()
+
+
+def embed_file(
+    path: Union[str, Path],
+    output: Union[str, Path],
+    model: "JinaEmbeddings",
+    format: Optional[str] = None,
+    id_field: str = "id",
+    text_field: str = "text",
+    dtype: str = "float32",
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    progress: Optional[Callable[[int, int], None]] = None,
+) -> Tuple[Tuple[int, int], int]:
+    """
+    Embeds every record of a JSONL, CSV or text file into the ``.npy`` file ``output``.
+
+    The input is read twice, as a stream: once to size the matrix and once
+    to embed it ``batch_size`` records at a time. int8 rows hold the
+    L2-normalised vector scaled to [-127, 127], as in ``VectorIndex``.
+    ``progress`` is called with ``(rows done, total rows)`` after each batch.
+    Returns the matrix shape and the number of rows embedded by this call.
+    """
+    np = _numpy()
+    from numpy.lib.format import open_memmap
+    if dtype not in DTYPES:
+        raise ValueError(f"dtype must be one of {', '.join(DTYPES)}")
+    if batch_size < 1:
+        raise ValueError("batch_size must be at least 1")
+    output = Path(output)
+    options = {"format": format or records.detect_format(str(path)), "id_field": id_field, "text_field": text_field}
+    total = count_records(path, **options)
+    if not total:
+        raise ValueError(f"No records in {path}")
+
+    checkpoint = records.Checkpoint(checkpoint_path(output), params={
+        "input": str(Path(path).resolve()), "records": total, "model": model.model_id,
+        "dtype": dtype, "batch_size": batch_size, **options,
+    })
+    done = min(checkpoint.watermark * batch_size, total)
+    matrix = None
+    if done:
+        if not output.exists():
+            raise ValueError(f"{checkpoint.path} records progress but {output} is missing")
+        matrix = open_memmap(str(output), mode="r+")
+        if matrix.shape[0] != total or matrix.dtype != np.dtype(dtype):
+            raise ValueError(f"{output} does not match {checkpoint.path}")
+        _truncate_lines(ids_path(output), done)
+
+    embedded = 0
+    with open(path, newline="") as f, open(ids_path(output), "ab" if done else "wb") as ids_file:
+        rows = itertools.islice(records.iter_records(f, **options), done, None)
+        for batch_number in itertools.count(checkpoint.watermark):
+            batch = list(itertools.islice(rows, batch_size))
+            if not batch:
+                break
+            vectors = model.embed_matrix([text for _, text in batch])
+            if matrix is None:
+                # Allocated once the first batch reveals the dimensions.
+                matrix = open_memmap(str(output), mode="w+", dtype=dtype, shape=(total, vectors.shape[1]))
+            if vectors.shape != (len(batch), matrix.shape[1]):
+                raise ValueError(f"Expected {matrix.shape[1]}-dimensional embeddings, got {vectors.shape[1]}")
+            if dtype == "int8":
+                norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+                norms[norms == 0] = 1.0
+                vectors = np.clip(np.rint(vectors / norms * INT8_SCALE), -127, 127)
+            matrix[done:done + len(batch)] = vectors
+            # Vectors, then ids, reach disk before the batch is marked done.
+            matrix.flush()
+            ids_file.write(b"".join(json.dumps(row_id).encode("utf-8") + b"\n" for row_id, _ in batch))
+            ids_file.flush()
+            checkpoint.mark(batch_number)
+            done += len(batch)
+            embedded += len(batch)
+            if progress is not None:
+                progress(done, total)
+
+    shape = matrix.shape
+    del matrix
+    checkpoint.path.unlink()
+    return shape, embedded
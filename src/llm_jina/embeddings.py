@@ -1,9 +1,28 @@
 """
 Jina AI Embeddings API implementation and LLM plugin integration.
 """
+import array
+import asyncio
 import llm
-from typing import List
-from .client import JinaClient
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+from .batching import plan_batches
+from .cache import EmbeddingCache, get_embedding_cache
+from .concurrency import run_concurrently
+from .images import MODEL_RESOLUTIONS
+from .vectors import EMBEDDING_TYPES, decode_embedding
+
+# This module is imported whenever llm loads its plugins, so the HTTP stacks
+# (requests, httpx) are only imported once a Jina model actually embeds.
+if TYPE_CHECKING:
+    from .client import JinaClient
+
+EMBEDDINGS_URL = "https://api.jina.ai/v1/embeddings"
+
+# Per-request limits used to split large batches, and how many of the
+# resulting sub-batches are sent at once.
+DEFAULT_MAX_BATCH_ITEMS = 256
+DEFAULT_MAX_BATCH_TOKENS = 64000
+DEFAULT_PARALLELISM = 4
 
 @llm.hookimpl
 def register_embedding_models(register):
@@ -11,29 +30,227 @@ def register_embedding_models(register):
     register(JinaEmbeddings("jina-embeddings-v2-base-en"), aliases=("jina-v2",))
     register(JinaEmbeddings("jina-embeddings-v3"), aliases=("jina-v3",))
     register(JinaEmbeddings("jina-embeddings-v4"), aliases=("jina-v4",))
-    register(JinaEmbeddings("jina-clip-v1"), aliases=("jina-clip",))
+    register(JinaEmbeddings("jina-clip-v1", image_size=MODEL_RESOLUTIONS["jina-clip-v1"]), aliases=("jina-clip",))
+    register(JinaEmbeddings("jina-clip-v2", image_size=MODEL_RESOLUTIONS["jina-clip-v2"]))
+
+    # Matryoshka-truncated variants: the API returns shorter vectors, so stored
+    # blobs shrink and `llm similar` scans fewer bytes per row.
+    for model_name, short, dimensions in (
+        ("jina-embeddings-v3", "jina-v3", 256),
+        ("jina-embeddings-v3", "jina-v3", 512),
+        ("jina-embeddings-v4", "jina-v4", 256),
+        ("jina-embeddings-v4", "jina-v4", 512),
+    ):
+        register(
+            JinaEmbeddings(f"{model_name}-{dimensions}", model_name=model_name,
+                           options={"dimensions": dimensions}),
+            aliases=(f"{short}-{dimensions}",),
+        )
+
+    # Binary-quantized variants: vectors travel bit-packed and are expanded to
+    # +1/-1, so cosine similarity ranks like Hamming distance.
+    register(
+        JinaEmbeddings("jina-embeddings-v3-binary", model_name="jina-embeddings-v3", embedding_type="ubinary"),
+        aliases=("jina-v3-binary",),
+    )
+    register(
+        JinaEmbeddings("jina-embeddings-v3-256-binary", model_name="jina-embeddings-v3",
+                       options={"dimensions": 256}, embedding_type="ubinary"),
+        aliases=("jina-v3-256-binary",),
+    )
 
 class JinaEmbeddings(llm.EmbeddingModel):
-    """Jina AI embedding model."""
+    """Jina AI embedding model.
+
+    Batches are split into sub-requests of at most ``max_batch_items`` items
+    and roughly ``max_batch_tokens`` tokens, and up to ``parallelism`` of
+    them are sent concurrently. Items already in the embedding cache are not
+    sent at all. ``options`` are extra request fields such as ``task`` or
+    ``dimensions``, and ``model_name`` is the API model when it differs from
+    the llm ``model_id``.
+
+    Vectors are requested as ``embedding_type="base64"`` by default and decoded
+    straight into float32 buffers instead of being parsed as JSON floats.
+
+    Models with an ``image_size`` (the CLIP models) also accept binary items
+    from ``llm embed --binary``; images are downsized to that resolution and
+    encoded in a process pool before upload.
+    """
 
-    def __init__(self, model_id: str):
+    # Let `llm embed-multi` hand over large batches; they are split here.
+    batch_size = 1024
+
+    def __init__(
+        self,
+        model_id: str,
+        client: Optional["JinaClient"] = None,
+        max_batch_items: int = DEFAULT_MAX_BATCH_ITEMS,
+        max_batch_tokens: int = DEFAULT_MAX_BATCH_TOKENS,
+        parallelism: int = DEFAULT_PARALLELISM,
+        options: Optional[Dict[str, Any]] = None,
+        cache: Optional[EmbeddingCache] = None,
+        embedding_type: str = "base64",
+        model_name: Optional[str] = None,
+        image_size: Optional[int] = None,
+    ):
+        if embedding_type not in EMBEDDING_TYPES:
+            raise ValueError(f"embedding_type must be one of {', '.join(EMBEDDING_TYPES)}")
         self.model_id = model_id
-        self._client = None
+        self.model_name = model_name or model_id
+        self.embedding_type = embedding_type
+        self._client = client
+        self.options = dict(options or {})
+        self._cache = cache
+        self.max_batch_items = max_batch_items
+        self.max_batch_tokens = max_batch_tokens
+        self.parallelism = parallelism
+        self.image_size = image_size
+        self.supports_binary = image_size is not None
 
     @property
-    def client(self) -> JinaClient:
-        if self._client is None:
-            self._client = JinaClient()
-        return self._client
+    def client(self) -> "JinaClient":
+        if self._client is not None:
+            return self._client
+        from .client import get_client
+        return get_client()
 
-    def embed_batch(self, texts: List[str]) -> List[List[float]]:
-        """Embed a batch of texts."""
-        response = self.client.post(
-            "https://api.jina.ai/v1/embeddings",
-            data={"input": texts, "model": self.model_id}
-        )
+    @property
+    def cache(self) -> Optional[EmbeddingCache]:
+        if self._cache is not None:
+            return self._cache
+        return get_embedding_cache()
+
+    def _parse(self, response: Dict[str, Any]) -> List[array.array]:
         if "data" not in response or not isinstance(response["data"], list):
             raise ValueError("Invalid response format from Jina API")
         
         embeddings = sorted(response["data"], key=lambda e: e["index"])
-        return [result["embedding"] for result in embeddings]
+        dimensions = self.options.get("dimensions")
+        return [decode_embedding(result["embedding"], self.embedding_type, dimensions) for result in embeddings]
+
+    def _plan(self, texts: List[str]) -> List[List[str]]:
+        batches = plan_batches(texts, self.max_batch_items, self.max_batch_tokens)
+        return [[texts[i] for i in batch] for batch in batches]
+
+    def _prepare(self, items: List[Any]) -> List[Any]:
+        """Turns binary items into image inputs; mixed batches use the object form for text."""
+        if not any(isinstance(item, (bytes, bytearray)) for item in items):
+            return items
+        from .images import iter_encoded, shared_executor
+        # Called per planned sub-batch, so each encoding job is bounded by
+        # max_batch_items; the shared pool is started once per process.
+        images = [item for item in items if isinstance(item, (bytes, bytearray))]
+        encoded = iter(image for batch in iter_encoded(images, max_size=self.image_size, batch_size=len(images),
+                                                       executor=shared_executor())
+                       for image in batch)
+        return [{"image": next(encoded)} if isinstance(item, (bytes, bytearray)) else {"text": item}
+                for item in items]
+
+    def _data(self, texts: List[str]) -> Dict[str, Any]:
+        data = {"input": texts, "model": self.model_name}
+        if self.embedding_type != "float":
+            data["embedding_type"] = self.embedding_type
+        data.update(self.options)
+        return data
+
+    def _cache_options(self) -> Dict[str, Any]:
+        # float and base64 carry identical vectors, so they share cache entries.
+        options = dict(self.options)
+        if self.image_size is not None:
+            # Images are embedded after downsizing, so the size is part of the key.
+            options["image_size"] = self.image_size
+        if self.embedding_type in ("binary", "ubinary"):
+            options["embedding_type"] = "binary"
+        return options
+
+    def _embed_one(self, texts: List[str]) -> List[array.array]:
+        from .codec import STREAM_MIN_ITEMS
+        texts = self._prepare(texts)
+        if len(texts) < STREAM_MIN_ITEMS:
+            response = self.client.post(EMBEDDINGS_URL, data=self._data(texts))
+            return self._parse(response)
+        # Decoded item by item: each encoded embedding is released as soon as
+        # its vector is built, instead of holding the whole response tree.
+        dimensions = self.options.get("dimensions")
+        rows = [None] * len(texts)
+        for result in self.client.post_iter(EMBEDDINGS_URL, data=self._data(texts)):
+            index = result.get("index") if isinstance(result, dict) else None
+            if not isinstance(index, int) or not 0 <= index < len(rows):
+                raise ValueError("Invalid response format from Jina API")
+            rows[index] = decode_embedding(result["embedding"], self.embedding_type, dimensions)
+        if any(row is None for row in rows):
+            raise ValueError("Invalid response format from Jina API")
+        return rows
+
+    def _embed_uncached(self, texts: List[str]) -> List[array.array]:
+        results = run_concurrently(self._embed_one, self._plan(texts), self.parallelism)
+        return [embedding for batch in results for embedding in batch]
+
+    def _embed_rows(self, texts: List[str]) -> List[array.array]:
+        # Duplicates are embedded once and fanned back out to every position.
+        unique = list(dict.fromkeys(texts))
+        if len(unique) < len(texts):
+            rows = dict(zip(unique, self._embed_unique(unique)))
+            return [rows[text] for text in texts]
+        return self._embed_unique(texts)
+
+    def _embed_unique(self, texts: List[str]) -> List[array.array]:
+        if not texts:
+            return []
+        cache = self.cache
+        if cache is None:
+            return self._embed_uncached(texts)
+
+        options = self._cache_options()
+        keys = [cache.key(self.model_name, options, text) for text in texts]
+        found = cache.get_many(keys)
+        missing = [i for i, key in enumerate(keys) if key not in found]
+        if missing:
+            fresh = self._embed_uncached([texts[i] for i in missing])
+            new_entries = {keys[i]: embedding for i, embedding in zip(missing, fresh)}
+            cache.put_many(new_entries)
+            found.update(new_entries)
+        return [found[key] for key in keys]
+
+    def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        """Embed a batch of texts."""
+        return [row.tolist() for row in self._embed_rows(list(texts))]
+
+    def embed_array(self, texts: List[str]) -> array.array:
+        """
+        Embeds texts into one contiguous float32 buffer.
+
+        Rows are laid out back to back in input order, so the buffer holds
+        ``len(texts) * dimensions`` values and can be wrapped without copying
+        (e.g. by ``numpy.frombuffer`` or ``memoryview``).
+        """
+        flat = array.array("f")
+        for row in self._embed_rows(list(texts)):
+            flat.extend(row)
+        return flat
+
+    def embed_matrix(self, texts: List[str]):
+        """Embeds texts into a ``(len(texts), dimensions)`` float32 NumPy array."""
+        try:
+            import numpy as np
+        except ImportError:
+            raise ImportError("embed_matrix() requires numpy: pip install 'llm-jina[numpy]'")
+        texts = list(texts)
+        flat = self.embed_array(texts)
+        matrix = np.frombuffer(flat, dtype=np.float32)
+        return matrix.reshape(len(texts), -1) if texts else matrix.reshape(0, 0)
+
+    async def _aembed_one(self, texts: List[str]) -> List[array.array]:
+        from .async_client import get_async_client
+        response = await get_async_client().post(EMBEDDINGS_URL, data=self._data(self._prepare(texts)))
+        return self._parse(response)
+
+    async def aembed_batch(self, texts: List[str]) -> List[List[float]]:
+        """Awaitable variant of embed_batch()."""
+        texts = list(texts)
+        if not texts:
+            return []
+        unique = list(dict.fromkeys(texts))
+        results = await asyncio.gather(*[self._aembed_one(batch) for batch in self._plan(unique)])
+        rows = dict(zip(unique, (embedding for batch in results for embedding in batch)))
+        return [rows[text].tolist() for text in texts]
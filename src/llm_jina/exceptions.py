@@ -4,7 +4,10 @@ Custom exceptions for the llm-jina library.
 
 class JinaAPIError(Exception):
     """Custom exception for Jina AI API errors."""
-    pass
+
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
 
 class APIError(Exception):
     """Generic API Error for compatibility."""
@@ -0,0 +1,177 @@
+"""
+Image preparation for the Jina classifier and CLIP embedding models.
+
+Images are read, optionally downsized and base64-encoded in worker processes
+and handed out in bounded batches, so a large folder is never held in memory
+at once and the CPU-bound encoding runs in parallel with the uploads.
+"""
+import base64
+import io
+import os
+import threading
+import warnings
+from collections import deque
+from itertools import islice
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, Iterator, List, Optional, Union
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
+# Input resolution of the CLIP models; larger images are scaled down by the
+# API anyway, so sending them full size only costs bandwidth.
+MODEL_RESOLUTIONS = {
+    "jina-clip-v1": 224,
+    "jina-clip-v2": 512,
+}
+DEFAULT_BATCH_SIZE = 32
+# Encoded batches prepared ahead of the one being uploaded.
+PREFETCH_BATCHES = 2
+
+ImageSource = Union[str, Path, bytes]
+
+_executor = None
+_executor_lock = threading.Lock()
+_warned_no_pillow = False
+
+def is_url(source: ImageSource) -> bool:
+    return isinstance(source, str) and source.startswith(("http://", "https://"))
+
+def _warn_without_pillow():
+    """Warns, once per process, that images will not be downsized."""
+    global _warned_no_pillow
+    if _warned_no_pillow:
+        return
+    try:
+        import PIL  # noqa: F401
+    except ImportError:
+        _warned_no_pillow = True
+        warnings.warn("Pillow is not installed, so images are sent full size: pip install 'llm-jina[images]'",
+                      stacklevel=3)
+
+def downsize(data: bytes, max_size: int) -> bytes:
+    """
+    Shrinks an image so neither side exceeds ``max_size`` pixels.
+
+    Returns the original bytes when Pillow is not installed, the image is
+    already small enough or cannot be decoded, or re-encoding would not
+    make it smaller.
+    """
+    try:
+        from PIL import Image
+    except ImportError:
+        return data
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            if max(image.size) <= max_size:
+                return data
+            image.thumbnail((max_size, max_size))
+            out = io.BytesIO()
+            if image.mode in ("RGBA", "LA", "P"):
+                image.save(out, format="PNG", optimize=True)
+            else:
+                image.convert("RGB").save(out, format="JPEG", quality=90)
+    except (OSError, ValueError):
+        return data
+    resized = out.getvalue()
+    return resized if len(resized) < len(data) else data
+
+def encode_image(source: ImageSource, max_size: Optional[int] = None) -> str:
+    """Returns an image as the API expects it: a URL unchanged, otherwise base64."""
+    if is_url(source):
+        return source
+    if isinstance(source, (bytes, bytearray)):
+        data = bytes(source)
+    else:
+        with open(source, "rb") as f:
+            data = f.read()
+    if max_size:
+        data = downsize(data, max_size)
+    return base64.b64encode(data).decode("ascii")
+
+def _encode_batch(args) -> List[str]:
+    sources, max_size = args
+    return [encode_image(source, max_size) for source in sources]
+
+def _batches(sources: Iterable[ImageSource], batch_size: int) -> Iterator[List[ImageSource]]:
+    iterator = iter(sources)
+    while True:
+        batch = list(islice(iterator, batch_size))
+        if not batch:
+            return
+        yield batch
+
+def _process_pool(max_workers: int) -> "Executor":
+    """
+    A process pool whose workers are not forked from the calling process,
+    which may have threads holding locks (HTTP connection pools, SQLite) that
+    a forked child would inherit in a locked state.
+    """
+    # Imported here: it pulls in multiprocessing, which plugin loading should not pay for.
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context(method))
+
+def shared_executor() -> "Executor":
+    """
+    The process pool shared by repeated small encoding jobs, such as the
+    sub-batches of an embedding call, so each does not pay pool start-up.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = _process_pool(os.cpu_count() or 1)
+        return _executor
+
+def iter_encoded(
+    sources: Iterable[ImageSource],
+    max_size: Optional[int] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    max_workers: Optional[int] = None,
+    executor: Optional["Executor"] = None,
+) -> Iterator[List[str]]:
+    """
+    Encodes images in a process pool and yields them in input-ordered batches.
+
+    At most ``PREFETCH_BATCHES`` batches beyond the one being consumed are
+    encoded ahead, which bounds memory regardless of how many images there
+    are. With ``max_workers=1`` everything is encoded in-process. The pool is
+    started for the call unless an ``executor`` (see shared_executor()) is given.
+    """
+    if max_size:
+        # Checked here rather than in downsize(), which runs in the workers.
+        _warn_without_pillow()
+    batches = _batches(sources, batch_size)
+    max_workers = min(max_workers or os.cpu_count() or 1, batch_size)
+    if max_workers <= 1:
+        for batch in batches:
+            yield _encode_batch((batch, max_size))
+        return
+
+    if executor is not None:
+        for encoded in _iter_pooled(executor, batches, max_size, max_workers):
+            yield encoded
+        return
+    with _process_pool(max_workers) as executor:
+        for encoded in _iter_pooled(executor, batches, max_size, max_workers):
+            yield encoded
+
+def _iter_pooled(executor: "Executor", batches: Iterator[List[ImageSource]], max_size: Optional[int],
+                 max_workers: int) -> Iterator[List[str]]:
+    pending = deque()
+
+    def submit(batch):
+        # Split a batch across the workers so one batch already uses the whole pool.
+        step = max(1, -(-len(batch) // max_workers))
+        pending.append([executor.submit(_encode_batch, (batch[i:i + step], max_size))
+                        for i in range(0, len(batch), step)])
+
+    for batch in islice(batches, PREFETCH_BATCHES + 1):
+        submit(batch)
+    while pending:
+        futures = pending.popleft()
+        encoded = [item for future in futures for item in future.result()]
+        for batch in islice(batches, 1):
+            submit(batch)
+        yield encoded
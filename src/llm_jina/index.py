@@ -0,0 +1,256 @@
+"""
+Memory-mapped local vector index for collections embedded with Jina models.
+
+An index is a directory holding a raw row-major matrix (``vectors.bin``), the
+row ids (``ids.jsonl`` plus a ``ids.offsets`` table of byte offsets so a
+query only decodes the ids it returns) and ``meta.json``. Rows are
+L2-normalised when written, so a dot product is the cosine similarity.
+"""
+import json
+import sqlite3
+from pathlib import Path
+from typing import Iterator, List, Optional, Sequence, Tuple, Union
+from .concurrency import run_concurrently
+from .utils import atomic_write, embeddings_db_path
+
+DTYPES = ("float32", "int8")
+VECTORS_FILE = "vectors.bin"
+IDS_FILE = "ids.jsonl"
+OFFSETS_FILE = "ids.offsets"
+META_FILE = "meta.json"
+# int8 rows store the normalised vector scaled to [-127, 127].
+INT8_SCALE = 127.0
+# Rows scored per task; large enough to amortise the BLAS call, small enough
+# that an int8 chunk converted to float32 stays well inside the CPU cache.
+DEFAULT_CHUNK_ROWS = 65536
+DEFAULT_BUILD_BATCH = 10000
+
+def _numpy():
+    try:
+        import numpy as np
+    except ImportError:
+        raise ImportError("The vector index requires numpy: pip install 'llm-jina[numpy]'")
+    return np
+
+
+class VectorIndex:
+    """A directory-backed matrix of normalised embeddings searched by dot product."""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        meta_path = self.path / META_FILE
+        if not meta_path.exists():
+            raise FileNotFoundError(f"No vector index at {self.path}")
+        self.meta = json.loads(meta_path.read_text())
+
+    @classmethod
+    def create(cls, path: Union[str, Path], dimensions: int, dtype: str = "float32",
+               model: Optional[str] = None, collection: Optional[str] = None) -> "VectorIndex":
+        """Creates an empty index, replacing any index already at ``path``."""
+        if dtype not in DTYPES:
+            raise ValueError(f"dtype must be one of {', '.join(DTYPES)}")
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        for name in (VECTORS_FILE, IDS_FILE, OFFSETS_FILE):
+            (path / name).write_bytes(b"")
+        meta = {"dimensions": dimensions, "dtype": dtype, "count": 0, "ids_bytes": 0,
+                "model": model, "collection": collection}
+        _write_meta(path, meta)
+        return cls(path)
+
+    @property
+    def count(self) -> int:
+        return self.meta["count"]
+
+    @property
+    def dimensions(self) -> int:
+        return self.meta["dimensions"]
+
+    @property
+    def dtype(self) -> str:
+        return self.meta["dtype"]
+
+    def vectors(self):
+        """The stored rows as a read-only ``numpy.memmap`` of shape (count, dimensions)."""
+        np = _numpy()
+        if not self.count:
+            return np.zeros((0, self.dimensions), dtype=self.dtype)
+        return np.memmap(self.path / VECTORS_FILE, dtype=self.dtype, mode="r",
+                         shape=(self.count, self.dimensions))
+
+    def ids(self) -> List[str]:
+        """Every id in row order."""
+        with open(self.path / IDS_FILE, "rb") as f:
+            data = f.read(self.meta["ids_bytes"])
+        return [json.loads(line) for line in data.splitlines()]
+
+    def ids_at(self, rows: Sequence[int]) -> List[str]:
+        """The ids of the given rows, read via the offsets table."""
+        np = _numpy()
+        if not len(rows):
+            return []
+        offsets = np.memmap(self.path / OFFSETS_FILE, dtype="<u8", mode="r", shape=(self.count + 1,))
+        ids = []
+        with open(self.path / IDS_FILE, "rb") as f:
+            for row in rows:
+                start, end = int(offsets[row]), int(offsets[row + 1])
+                f.seek(start)
+                ids.append(json.loads(f.read(end - start)))
+        return ids
+
+    def append(self, ids: Sequence[str], vectors) -> int:
+        """Normalises and appends rows; returns the new row count.
+
+        Data past the recorded count (from an interrupted append) is
+        overwritten, so ``meta.json`` is only updated once the rows are on disk.
+        """
+        np = _numpy()
+        matrix = np.asarray(vectors, dtype=np.float32)
+        if matrix.ndim != 2 or matrix.shape[1] != self.dimensions:
+            raise ValueError(f"Expected vectors of {self.dimensions} dimensions")
+        if len(ids) != len(matrix):
+            raise ValueError("ids and vectors must have the same length")
+        if not len(ids):
+            return self.count
+
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        matrix = matrix / norms
+        if self.dtype == "int8":
+            matrix = np.clip(np.rint(matrix * INT8_SCALE), -127, 127).astype(np.int8)
+
+        row_bytes = self.dimensions * matrix.itemsize
+        with open(self.path / VECTORS_FILE, "r+b") as f:
+            f.seek(self.count * row_bytes)
+            f.write(np.ascontiguousarray(matrix).tobytes())
+            f.truncate()
+
+        encoded = [json.dumps(i).encode("utf-8") + b"\n" for i in ids]
+        offsets = np.cumsum([0] + [len(line) for line in encoded], dtype=np.uint64) + self.meta["ids_bytes"]
+        with open(self.path / IDS_FILE, "r+b") as f:
+            f.seek(self.meta["ids_bytes"])
+            f.write(b"".join(encoded))
+            f.truncate()
+        with open(self.path / OFFSETS_FILE, "r+b") as f:
+            # The table holds count + 1 entries: the end offset of the last id is
+            # the start offset of the next append.
+            f.seek(self.count * 8)
+            f.write(offsets.astype("<u8").tobytes())
+            f.truncate()
+
+        self.meta["count"] += len(ids)
+        self.meta["ids_bytes"] = int(offsets[-1])
+        _write_meta(self.path, self.meta)
+        return self.count
+
+    def query(self, vector: Sequence[float], n: int = 10, threads: int = 1,
+              chunk_rows: int = DEFAULT_CHUNK_ROWS) -> List[Tuple[str, float]]:
+        """Returns the ``n`` most similar ``(id, score)`` pairs, best first.
+
+        The matrix is scored in chunks of ``chunk_rows``; with ``threads`` > 1
+        the chunks run concurrently (numpy releases the GIL for the dot products).
+        """
+        np = _numpy()
+        if not self.count or n <= 0:
+            return []
+        q = np.asarray(vector, dtype=np.float32)
+        if q.shape != (self.dimensions,):
+            raise ValueError(f"Expected a query vector of {self.dimensions} dimensions")
+        norm = np.linalg.norm(q)
+        if norm:
+            q = q / norm
+        if self.dtype == "int8":
+            q = q / INT8_SCALE
+
+        matrix = self.vectors()
+        starts = range(0, self.count, chunk_rows)
+
+        def score(start):
+            chunk = np.asarray(matrix[start:start + chunk_rows], dtype=np.float32)
+            scores = chunk @ q
+            if len(scores) > n:
+                top = np.argpartition(-scores, n - 1)[:n]
+            else:
+                top = np.arange(len(scores))
+            return top + start, scores[top]
+
+        parts = run_concurrently(score, starts, max_workers=threads)
+        rows = np.concatenate([rows for rows, _ in parts])
+        scores = np.concatenate([scores for _, scores in parts])
+        order = np.argsort(-scores, kind="stable")[:n]
+        return list(zip(self.ids_at(rows[order].tolist()), scores[order].astype(float).tolist()))
+
+
+def _write_meta(path: Path, meta: dict):
+    atomic_write(path / META_FILE, json.dumps(meta, indent=2))
+
+
+def _collection_rows(db_path: Path, collection: str, batch_size: int) -> Tuple[str, Iterator[List[Tuple[str, bytes]]]]:
+    not_found = ValueError(f"Collection '{collection}' not found in {db_path}")
+    if not db_path.exists():
+        raise not_found
+    # Read-only, so a path that is not an llm database is never written to.
+    conn = sqlite3.connect(db_path.resolve().as_uri() + "?mode=ro", uri=True)
+    try:
+        row = conn.execute("select id, model from collections where name = ?", [collection]).fetchone()
+    except sqlite3.OperationalError:
+        # No collections table: nothing has been embedded into this database yet.
+        row = None
+    if row is None:
+        conn.close()
+        raise not_found
+    collection_id, model = row
+
+    def batches():
+        try:
+            cursor = conn.execute(
+                "select id, embedding from embeddings where collection_id = ? order by rowid",
+                [collection_id],
+            )
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield rows
+        finally:
+            conn.close()
+
+    return model, batches()
+
+
+def build_index(
+    collection: str,
+    path: Union[str, Path],
+    dtype: str = "float32",
+    append: bool = False,
+    database: Optional[Union[str, Path]] = None,
+    batch_size: int = DEFAULT_BUILD_BATCH,
+) -> Tuple[VectorIndex, int]:
+    """
+    Exports an llm embeddings collection into a vector index.
+
+    With ``append`` an existing index is extended with the ids it does not
+    have yet; otherwise the index is rebuilt. Returns the index and the number
+    of rows added.
+    """
+    np = _numpy()
+    model, batches = _collection_rows(Path(database or embeddings_db_path()), collection, batch_size)
+    path = Path(path)
+    index = VectorIndex(path) if append and (path / META_FILE).exists() else None
+    if index is not None and index.meta.get("collection") not in (None, collection):
+        raise ValueError(f"{path} indexes collection '{index.meta['collection']}', not '{collection}'")
+    known = set(index.ids()) if index is not None else set()
+
+    added = 0
+    for rows in batches:
+        rows = [(row_id, blob) for row_id, blob in rows if row_id not in known]
+        if not rows:
+            continue
+        matrix = np.stack([np.frombuffer(blob, dtype="<f4") for _, blob in rows])
+        if index is None:
+            index = VectorIndex.create(path, matrix.shape[1], dtype=dtype, model=model, collection=collection)
+        index.append([row_id for row_id, _ in rows], matrix)
+        added += len(rows)
+    if index is None:
+        raise ValueError(f"Collection '{collection}' has no embeddings")
+    return index, added
@@ -1,7 +1,21 @@
 import httpx
 import click
-import os
+import json
+import threading
 import time
+from typing import Dict, Optional, Tuple
+from .utils import atomic_write, user_dir
+
+METAPROMPT_URL = "https://docs.jina.ai"
+CACHE_FILE = "jina-metaprompt.md"
+# Validators (ETag, Last-Modified) and the time the cached copy was last confirmed.
+META_FILE = "jina-metaprompt.json"
+MAX_AGE = 86400  # seconds in a day
+
+# Library callers often ask for the metaprompt repeatedly; once loaded it is
+# served from memory until MAX_AGE passes, without touching the disk.
+_memo = None  # (content, checked_at)
+_memo_lock = threading.Lock()
 
 def fetch_metaprompt() -> str:
     """
@@ -10,46 +24,98 @@ def fetch_metaprompt() -> str:
     Returns:
         str: The metaprompt content, or None if the fetch fails.
     """
-    url = "https://docs.jina.ai"
     try:
-        with httpx.Client(timeout=10) as client:
-            response = client.get(url)
-            response.raise_for_status()
-            return response.text
-    except (httpx.RequestError, httpx.TimeoutException) as e:
-        click.echo(f"Error fetching metaprompt: {str(e)}")
+        _, content, _ = _get({})
+        return content
+    except httpx.HTTPError as e:
+        click.echo(f"Error fetching metaprompt: {str(e)}", err=True)
         return None
 
-def jina_metaprompt() -> str:
+def _get(headers: Dict[str, str]) -> Tuple[int, Optional[str], Dict[str, str]]:
+    """GETs the metaprompt, returning (status, body or None on 304, validators)."""
+    with httpx.Client(timeout=10) as client:
+        response = client.get(METAPROMPT_URL, headers=headers)
+        if response.status_code == 304:
+            return 304, None, {}
+        response.raise_for_status()
+        validators = {}
+        for header in ("ETag", "Last-Modified"):
+            value = response.headers.get(header)
+            if value:
+                validators[header] = value
+        return response.status_code, response.text, validators
+
+def _read_cache() -> Tuple[Optional[str], Dict[str, object]]:
+    directory = user_dir()
+    try:
+        content = (directory / CACHE_FILE).read_text(encoding="utf-8")
+    except (OSError, UnicodeDecodeError):
+        return None, {}
+    try:
+        meta = json.loads((directory / META_FILE).read_text())
+    except (OSError, ValueError):
+        meta = {}
+    return content, meta
+
+def _write_cache(content: Optional[str], meta: Dict[str, object]):
+    directory = user_dir()
+    try:
+        if content is not None:
+            atomic_write(directory / CACHE_FILE, content)
+        atomic_write(directory / META_FILE, json.dumps(meta))
+    except OSError as e:
+        click.echo(f"Warning: Failed to update {directory / CACHE_FILE}: {str(e)}", err=True)
+
+def _remember(content: str, checked_at: float) -> str:
+    global _memo
+    with _memo_lock:
+        _memo = (content, checked_at)
+    return content
+
+def jina_metaprompt(max_age: float = MAX_AGE) -> str:
     """
     Retrieves the Jina metaprompt, either from a local cache or by fetching it remotely.
 
+    The cache lives in the llm user directory. Once it is older than
+    ``max_age`` seconds it is revalidated with ETag/Last-Modified, so an
+    unchanged document is not downloaded again; if the revalidation fails,
+    the stale copy is served.
+
     Returns:
         str: The Jina metaprompt content.
 
     Raises:
         click.ClickException: If the metaprompt cannot be retrieved.
     """
-    cache_file = "jina-metaprompt.md"
-    one_day = 86400  # seconds in a day
-    need_fetch = True
-    if os.path.exists(cache_file):
-        last_mod = os.path.getmtime(cache_file)
-        if time.time() - last_mod < one_day:
-            need_fetch = False
-    if need_fetch:
-        metaprompt_content = fetch_metaprompt()
-        if metaprompt_content is not None:
-            try:
-                with open(cache_file, "w") as file:
-                    file.write(metaprompt_content)
-            except IOError as e:
-                click.echo(f"Warning: Failed to update {cache_file}: {str(e)}")
-            return metaprompt_content
-        else:
-            raise click.ClickException("Failed to fetch metaprompt from remote URL.")
+    now = time.time()
+    memo = _memo
+    if memo is not None and now - memo[1] < max_age:
+        return memo[0]
+
+    cached, meta = _read_cache()
+    checked_at = meta.get("checked_at", 0)
+    if cached is not None and now - checked_at < max_age:
+        return _remember(cached, checked_at)
+
+    headers = {}
+    if cached is not None:
+        if meta.get("ETag"):
+            headers["If-None-Match"] = meta["ETag"]
+        if meta.get("Last-Modified"):
+            headers["If-Modified-Since"] = meta["Last-Modified"]
     try:
-        with open(cache_file, "r") as file:
-            return file.read()
-    except FileNotFoundError:
-        raise click.ClickException(f"{cache_file} not found")
+        status, content, validators = _get(headers)
+    except httpx.HTTPError as e:
+        if cached is None:
+            raise click.ClickException(f"Failed to fetch metaprompt from remote URL: {str(e)}")
+        click.echo(f"Warning: serving cached metaprompt, refresh failed: {str(e)}", err=True)
+        # Keep serving it for another max_age rather than retrying on every call.
+        return _remember(cached, now)
+
+    if status == 304 and cached is not None:
+        meta["checked_at"] = now
+        _write_cache(None, meta)
+        return _remember(cached, now)
+    validators["checked_at"] = now
+    _write_cache(content, validators)
+    return _remember(content, now)
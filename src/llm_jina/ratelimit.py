@@ -0,0 +1,147 @@
+"""
+Client-side rate limiting and retry policy for Jina API requests.
+"""
+import email.utils
+import random
+import threading
+import time
+from typing import Callable, Dict, NamedTuple, Optional
+from urllib.parse import urlsplit
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+class RateLimit(NamedTuple):
+    """Requests-per-minute and tokens-per-minute budget for one endpoint."""
+    rpm: Optional[int] = None
+    tpm: Optional[int] = None
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at ``rate_per_minute``.
+
+    ``reserve`` never blocks: it takes the tokens immediately, letting the
+    balance go negative, and returns how long the caller must wait before
+    sending. Concurrent callers therefore queue up behind each other fairly.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self.clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float = 1) -> float:
+        """Takes ``amount`` tokens and returns the seconds to wait before using them."""
+        with self._lock:
+            now = self.clock()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # A request bigger than the whole bucket could never be satisfied.
+            self._tokens -= min(amount, self.capacity)
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+
+def endpoint_key(url: str) -> str:
+    """Identifies an endpoint by host and path, e.g. ``api.jina.ai/v1/embeddings``."""
+    parts = urlsplit(url)
+    return parts.netloc + (parts.path.rstrip("/") or "")
+
+
+class RateLimiter:
+    """Per-endpoint request and token buckets plus shared server back-off.
+
+    When any thread sees a 429 with ``Retry-After``, every other thread
+    sending to the same endpoint waits out the same pause.
+    """
+
+    def __init__(self, limits: Optional[Dict[str, RateLimit]] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.limits = dict(limits or {})
+        self.clock = clock
+        self._buckets = {}
+        self._paused_until = {}
+        self._lock = threading.Lock()
+
+    def _endpoint_buckets(self, endpoint: str):
+        with self._lock:
+            buckets = self._buckets.get(endpoint)
+            if buckets is None:
+                limit = self.limits.get(endpoint, RateLimit())
+                buckets = (
+                    TokenBucket(limit.rpm, clock=self.clock) if limit.rpm else None,
+                    TokenBucket(limit.tpm, clock=self.clock) if limit.tpm else None,
+                )
+                self._buckets[endpoint] = buckets
+            return buckets
+
+    def reserve(self, url: str, tokens: int = 0) -> float:
+        """Reserves one request and ``tokens`` tokens; returns the seconds to wait."""
+        endpoint = endpoint_key(url)
+        requests_bucket, tokens_bucket = self._endpoint_buckets(endpoint)
+        wait = 0.0
+        if requests_bucket is not None:
+            wait = max(wait, requests_bucket.reserve(1))
+        if tokens_bucket is not None and tokens:
+            wait = max(wait, tokens_bucket.reserve(tokens))
+        with self._lock:
+            paused_until = self._paused_until.get(endpoint, 0.0)
+        return max(wait, paused_until - self.clock())
+
+    def pause(self, url: str, seconds: float):
+        """Holds back every request to the endpoint for ``seconds``."""
+        endpoint = endpoint_key(url)
+        with self._lock:
+            until = self.clock() + seconds
+            if until > self._paused_until.get(endpoint, 0.0):
+                self._paused_until[endpoint] = until
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parses a ``Retry-After`` header given as seconds or an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when is None:
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+class RetryPolicy:
+    """Jittered exponential back-off for rate-limited and transient failures."""
+
+    def __init__(self, max_retries: int = 3, backoff: float = 0.5, max_backoff: float = 30.0,
+                 max_retry_after: float = 120.0, retry_statuses=RETRY_STATUSES):
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.max_retry_after = max_retry_after
+        self.retry_statuses = frozenset(retry_statuses)
+
+    def should_retry(self, attempt: int, status_code: Optional[int] = None) -> bool:
+        """Whether to retry after ``attempt`` failed tries; ``None`` means a connection error."""
+        if attempt >= self.max_retries:
+            return False
+        return status_code is None or status_code in self.retry_statuses
+
+    def delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """Seconds to sleep before the next try, honouring ``Retry-After`` when given."""
+        server_delay = parse_retry_after(retry_after)
+        if server_delay is not None:
+            return min(server_delay, self.max_retry_after)
+        # "Full jitter": spreads out retries from many threads hitting the same limit.
+        return random.uniform(0, min(self.max_backoff, self.backoff * (2 ** attempt)))
+
+
+NO_RETRY = RetryPolicy(max_retries=0)
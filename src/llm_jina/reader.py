@@ -1,23 +1,110 @@
 """
 Jina AI Reader API implementation.
 """
-from typing import Dict, Any, Optional
-from .client import JinaClient
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit, urlunsplit
+from .client import get_client
+from .async_client import get_async_client
+from .concurrency import iter_by_key
+from .utils import option_headers
 
-def read(url: str, return_format: str = "markdown", **kwargs) -> Dict[str, Any]:
-    """Read and parse content from a URL using Jina AI Reader API."""
-    client = JinaClient()
+READER_URL = "https://r.jina.ai/"
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+def _headers(return_format: str, options: Dict[str, Any]) -> Dict[str, str]:
     headers = {"X-Return-Format": return_format}
-    
     # Forward any other kwargs as headers, converting bools to "true"
-    for key, value in kwargs.items():
-        if value is not None:
-            header_key = f"X-{key.replace('_', '-')}"
-            if isinstance(value, bool):
-                headers[header_key] = "true"
-            else:
-                headers[header_key] = str(value)
-                
-    response = client.post("https://r.jina.ai/", data={"url": url}, headers=headers)
+    headers.update(option_headers(options))
+    return headers
+
+def read(url: str, return_format: str = "markdown", **kwargs) -> Dict[str, Any]:
+    """Read and parse content from a URL using Jina AI Reader API."""
+    client = get_client()
+    response = client.post(READER_URL, data={"url": url}, headers=_headers(return_format, kwargs))
     return response
 
+async def aread(url: str, return_format: str = "markdown", **kwargs) -> Dict[str, Any]:
+    """Awaitable variant of read()."""
+    client = get_async_client()
+    return await client.post(READER_URL, data={"url": url}, headers=_headers(return_format, kwargs))
+
+def normalize_url(url: str) -> str:
+    """
+    Canonicalises a URL: adds a missing scheme, lowercases the host, drops fragments and default ports.
+
+    Raises ValueError for a malformed URL, such as a non-numeric port.
+    """
+    url = url.strip()
+    if "://" not in url:
+        url = "https://" + url
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if ":" in host:
+        # IPv6 literals keep their brackets.
+        host = f"[{host}]"
+    netloc = host
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        netloc = f"{host}:{parts.port}"
+    if parts.username:
+        auth = parts.username + (f":{parts.password}" if parts.password else "")
+        netloc = f"{auth}@{netloc}"
+    return urlunsplit((scheme, netloc, parts.path or "/", parts.query, ""))
+
+def normalize_urls(urls: Iterable[str], invalid: Optional[List[Tuple[str, str]]] = None) -> List[str]:
+    """
+    Normalises URLs and removes duplicates, blank lines and ``#`` comments, keeping order.
+
+    Malformed URLs raise ValueError, unless an ``invalid`` list is given, in
+    which case they are appended to it as ``(url, error)`` and skipped.
+    """
+    seen = {}
+    for url in urls:
+        url = url.strip()
+        if url and not url.startswith("#"):
+            try:
+                seen.setdefault(normalize_url(url), None)
+            except ValueError as e:
+                if invalid is None:
+                    raise
+                invalid.append((url, str(e)))
+    return list(seen)
+
+def read_many(
+    urls: Iterable[str],
+    return_format: str = "markdown",
+    max_workers: int = 8,
+    per_domain: int = 2,
+    domain_delay: float = 0.0,
+    **kwargs
+) -> Iterator[Dict[str, Any]]:
+    """
+    Reads many URLs concurrently, yielding one record per URL as it finishes.
+
+    URLs are normalised and deduplicated first. At most ``max_workers`` reads
+    run at once, at most ``per_domain`` against the same host, with requests to
+    one host started at least ``domain_delay`` seconds apart. Each record is
+    ``{"url", "ok": True, "data"}`` or ``{"url", "ok": False, "error",
+    "status_code"}``; a failed URL never aborts the run.
+    """
+    def read_one(url):
+        return read(url, return_format=return_format, **kwargs)
+
+    invalid = []
+    valid = normalize_urls(urls, invalid=invalid)
+    for url, error in invalid:
+        yield {"url": url, "ok": False, "error": f"Invalid URL: {error}", "status_code": None}
+    for url, result, error in iter_by_key(
+        read_one,
+        valid,
+        key=lambda url: urlsplit(url).hostname,
+        max_workers=max_workers,
+        per_key=per_domain,
+        min_interval=domain_delay,
+    ):
+        if error is None:
+            yield {"url": url, "ok": True, "data": result}
+        else:
+            yield {"url": url, "ok": False, "error": str(error),
+                   "status_code": getattr(error, "status_code", None)}
@@ -0,0 +1,102 @@
+"""
+Streaming readers for bulk inputs and checkpoints for resumable bulk jobs.
+"""
+import csv
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Set, TextIO, Tuple, Union
+from .utils import atomic_write
+
+FORMATS = ("jsonl", "csv", "txt")
+
+def detect_format(name: Optional[str]) -> str:
+    """Guesses an input format from a file name, defaulting to one text per line."""
+    suffix = Path(name or "").suffix.lower()
+    if suffix in (".jsonl", ".ndjson", ".json"):
+        return "jsonl"
+    if suffix in (".csv", ".tsv"):
+        return "csv"
+    return "txt"
+
+def iter_records(
+    file: TextIO,
+    format: Optional[str] = None,
+    id_field: str = "id",
+    text_field: str = "text",
+) -> Iterator[Tuple[str, Any]]:
+    """
+    Yields ``(id, value)`` pairs from a JSONL, CSV or plain-text stream.
+
+    JSONL and CSV rows take their id and value from ``id_field`` and
+    ``text_field``; rows without an id, and plain-text lines, are identified
+    by their 0-based row number. Blank lines are skipped.
+    """
+    format = format or detect_format(getattr(file, "name", None))
+    if format not in FORMATS:
+        raise ValueError(f"format must be one of {', '.join(FORMATS)}")
+    if format == "csv":
+        dialect = "excel-tab" if str(getattr(file, "name", "")).lower().endswith(".tsv") else "excel"
+        rows = csv.DictReader(file, dialect=dialect)
+        for number, row in enumerate(rows):
+            if text_field not in row:
+                raise ValueError(f"CSV row {number} has no '{text_field}' column")
+            yield str(row.get(id_field) or number), row[text_field]
+        return
+    number = 0
+    for line in file:
+        line = line.rstrip("\r\n")
+        if not line.strip():
+            continue
+        if format == "txt":
+            yield str(number), line
+        else:
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                raise ValueError(f"Invalid JSON on row {number}: {e}")
+            if not isinstance(row, dict) or text_field not in row:
+                raise ValueError(f"JSONL row {number} has no '{text_field}' field")
+            row_id = row.get(id_field)
+            yield str(number if row_id is None else row_id), row[text_field]
+        number += 1
+
+
+class Checkpoint:
+    """
+    Records which numbered units of a bulk job (e.g. shards) have completed.
+
+    The state is rewritten atomically after every ``mark`` so a crashed job
+    can be resumed with the same checkpoint file. ``params`` describes how the
+    units were formed; resuming with different params is refused because the
+    unit numbers would no longer line up.
+    """
+
+    def __init__(self, path: Union[str, Path], params: Optional[Dict[str, Any]] = None):
+        self.path = Path(path)
+        self.params = params or {}
+        # Units below ``watermark`` are all complete; ``extra`` holds the ones
+        # above it that finished out of order.
+        self.watermark = 0
+        self.extra: Set[int] = set()
+        if self.path.exists():
+            state = json.loads(self.path.read_text())
+            if state.get("params", {}) != json.loads(json.dumps(self.params)):
+                raise ValueError(f"Checkpoint {self.path} was written with different settings: {state.get('params')}")
+            self.watermark = state.get("watermark", 0)
+            self.extra = set(state.get("extra", []))
+
+    def __contains__(self, unit: int) -> bool:
+        return unit < self.watermark or unit in self.extra
+
+    @property
+    def completed(self) -> int:
+        return self.watermark + len(self.extra)
+
+    def mark(self, unit: int):
+        """Records ``unit`` as complete and persists the checkpoint."""
+        self.extra.add(unit)
+        while self.watermark in self.extra:
+            self.extra.remove(self.watermark)
+            self.watermark += 1
+        state = {"params": self.params, "watermark": self.watermark, "extra": sorted(self.extra)}
+        atomic_write(self.path, json.dumps(state))
@@ -1,29 +1,180 @@
 """
 Jina AI Reranker API implementation.
 """
+import heapq
+import time
 from typing import Dict, Any, List, Optional
-from .client import JinaClient
+from .client import get_client
+from .async_client import get_async_client
+from .batching import plan_batches
+from .codec import STREAM_MIN_ITEMS
+from .concurrency import iter_completed
 
-def rerank(
-    query: str,
-    documents: List[str],
-    model: str = "jina-reranker-v2-base-multilingual",
-    top_n: Optional[int] = None,
-    return_documents: bool = True
-) -> Dict[str, Any]:
-    """Rerank documents based on their relevance to a query."""
-    client = JinaClient()
-    
+RERANK_URL = "https://api.jina.ai/v1/rerank"
+
+# Documents and estimated tokens per request when sharding large candidate sets.
+DEFAULT_SHARD_SIZE = 512
+DEFAULT_SHARD_TOKENS = 200000
+
+# Cheap first-stage model for cascade reranking, and how many of its top
+# candidates are passed on to the expensive model.
+DEFAULT_CASCADE_MODEL = "jina-reranker-v1-turbo-en"
+DEFAULT_SURVIVORS = 100
+
+def _data(query: str, documents: List[str], model: str, top_n: Optional[int], return_documents: bool) -> Dict[str, Any]:
     data = {
         "model": model,
         "query": query,
         "documents": documents,
         "return_documents": return_documents
     }
-    
+
     if top_n is not None:
         data["top_n"] = top_n
-    
-    response = client.post("https://api.jina.ai/v1/rerank", data=data)
+    return data
+
+def rerank(
+    query: str,
+    documents: List[str],
+    model: str = "jina-reranker-v2-base-multilingual",
+    top_n: Optional[int] = None,
+    return_documents: bool = True
+) -> Dict[str, Any]:
+    """Rerank documents based on their relevance to a query."""
+    client = get_client()
+    data = _data(query, documents, model, top_n, return_documents)
+    if len(documents) < STREAM_MIN_ITEMS:
+        return client.post(RERANK_URL, data=data)
+    # Large result sets are decoded as they arrive rather than after the
+    # whole body has been buffered.
+    response = {}
+    response["results"] = list(client.post_iter(RERANK_URL, data=data, key="results", envelope=response))
     return response
 
+async def arerank(
+    query: str,
+    documents: List[str],
+    model: str = "jina-reranker-v2-base-multilingual",
+    top_n: Optional[int] = None,
+    return_documents: bool = True
+) -> Dict[str, Any]:
+    """Awaitable variant of rerank()."""
+    client = get_async_client()
+    data = _data(query, documents, model, top_n, return_documents)
+    return await client.post(RERANK_URL, data=data)
+
+def rerank_sharded(
+    query: str,
+    documents: List[str],
+    model: str = "jina-reranker-v2-base-multilingual",
+    top_n: Optional[int] = None,
+    return_documents: bool = True,
+    shard_size: int = DEFAULT_SHARD_SIZE,
+    shard_tokens: int = DEFAULT_SHARD_TOKENS,
+    max_workers: int = 4,
+) -> Dict[str, Any]:
+    """
+    Reranks any number of documents by scoring API-sized shards concurrently.
+
+    Each shard returns at most ``top_n`` scores, which are merged through a
+    bounded heap into a global ranking. The response has the same shape as
+    rerank(): ``index`` refers to the position in ``documents`` and
+    ``usage.total_tokens`` is summed over all shards.
+    """
+    shards = plan_batches(documents, shard_size, shard_tokens)
+
+    def score(indices):
+        return rerank(query, [documents[i] for i in indices], model=model,
+                      top_n=top_n, return_documents=False)
+
+    # Min-heap of (score, -index): the weakest result sits on top and is the
+    # one pushed out; on equal scores the earlier document is kept.
+    heap = []
+    total_tokens = 0
+    for indices, response in iter_completed(score, shards, max_workers):
+        total_tokens += (response.get("usage") or {}).get("total_tokens", 0)
+        for result in response.get("results", []):
+            entry = (result["relevance_score"], -indices[result["index"]])
+            if top_n is None or len(heap) < top_n:
+                heapq.heappush(heap, entry)
+            elif entry > heap[0]:
+                heapq.heapreplace(heap, entry)
+
+    results = []
+    for relevance_score, negative_index in sorted(heap, reverse=True):
+        index = -negative_index
+        result = {"index": index, "relevance_score": relevance_score}
+        if return_documents:
+            document = documents[index]
+            result["document"] = {"text": document} if isinstance(document, str) else document
+        results.append(result)
+    return {"model": model, "usage": {"total_tokens": total_tokens}, "results": results}
+
+def cascade_rerank(
+    query: str,
+    documents: List[str],
+    model: str = "jina-reranker-v2-base-multilingual",
+    first_model: str = DEFAULT_CASCADE_MODEL,
+    survivors: int = DEFAULT_SURVIVORS,
+    top_n: Optional[int] = None,
+    return_documents: bool = True,
+    shard_size: int = DEFAULT_SHARD_SIZE,
+    max_workers: int = 4,
+) -> Dict[str, Any]:
+    """
+    Reranks in two stages: ``first_model`` scores every document and only its
+    top ``survivors`` are rescored by ``model``.
+
+    Results are ranked by the second-stage score and carry each stage's
+    score in ``stage_scores`` under ``"first"`` and ``"second"``. ``stages``
+    reports each stage's model, document count, wall-clock seconds and tokens,
+    for tuning ``survivors`` against latency. With no more than ``survivors``
+    documents the first stage would keep them all, so it is skipped.
+    """
+    stages = []
+    survivor_indices = list(range(len(documents)))
+    first_scores = {}
+
+    if len(documents) > survivors:
+        started = time.perf_counter()
+        first = rerank_sharded(query, documents, model=first_model, top_n=survivors,
+                               return_documents=False, shard_size=shard_size, max_workers=max_workers)
+        stages.append({
+            "model": first_model,
+            "documents": len(documents),
+            "seconds": round(time.perf_counter() - started, 3),
+            "total_tokens": first["usage"]["total_tokens"],
+        })
+        survivor_indices = [result["index"] for result in first["results"]]
+        first_scores = {result["index"]: result["relevance_score"] for result in first["results"]}
+
+    started = time.perf_counter()
+    second = rerank_sharded(query, [documents[i] for i in survivor_indices], model=model, top_n=top_n,
+                            return_documents=False, shard_size=shard_size, max_workers=max_workers)
+    stages.append({
+        "model": model,
+        "documents": len(survivor_indices),
+        "seconds": round(time.perf_counter() - started, 3),
+        "total_tokens": second["usage"]["total_tokens"],
+    })
+
+    results = []
+    for result in second["results"]:
+        index = survivor_indices[result["index"]]
+        merged = {
+            "index": index,
+            "relevance_score": result["relevance_score"],
+            "stage_scores": {"second": result["relevance_score"]},
+        }
+        if index in first_scores:
+            merged["stage_scores"]["first"] = first_scores[index]
+        if return_documents:
+            document = documents[index]
+            merged["document"] = {"text": document} if isinstance(document, str) else document
+        results.append(merged)
+    return {
+        "model": model,
+        "usage": {"total_tokens": sum(stage["total_tokens"] for stage in stages)},
+        "results": results,
+        "stages": stages,
+    }
@@ -2,25 +2,25 @@
 Jina AI Search API implementation.
 """
 from typing import Dict, Any, Optional
-from .client import JinaClient
+from .client import get_client
+from .async_client import get_async_client
+from .utils import option_headers
 
-def search(query: str, num_results: Optional[int] = None, **kwargs) -> Dict[str, Any]:
-    """Search the web using Jina AI Search API."""
-    client = JinaClient()
-    headers = {}
-    
-    for key, value in kwargs.items():
-        if value is not None:
-            header_key = f"X-{key.replace('_', '-')}"
-            if isinstance(value, bool):
-                headers[header_key] = "true"
-            else:
-                headers[header_key] = str(value)
+SEARCH_URL = "https://s.jina.ai/"
 
+def _data(query: str, num_results: Optional[int]) -> Dict[str, Any]:
     data = {"q": query}
     if num_results:
         data["num"] = num_results
-    
-    response = client.post("https://s.jina.ai/", data=data, headers=headers)
+    return data
+
+def search(query: str, num_results: Optional[int] = None, **kwargs) -> Dict[str, Any]:
+    """Search the web using Jina AI Search API."""
+    client = get_client()
+    response = client.post(SEARCH_URL, data=_data(query, num_results), headers=option_headers(kwargs))
     return response
 
+async def asearch(query: str, num_results: Optional[int] = None, **kwargs) -> Dict[str, Any]:
+    """Awaitable variant of search()."""
+    client = get_async_client()
+    return await client.post(SEARCH_URL, data=_data(query, num_results), headers=option_headers(kwargs))
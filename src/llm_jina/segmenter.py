@@ -1,15 +1,107 @@
 """
 Jina AI Segmenter API implementation.
 """
-from typing import Dict, Any, Optional
-from .client import JinaClient
+from typing import Dict, Any, Iterator, List, Optional, TextIO, Tuple
+from .client import get_client
+from .async_client import get_async_client
+from .concurrency import iter_ordered
+
+SEGMENT_URL = "https://segment.jina.ai/"
+
+# Characters per request when streaming a large document, and how much each
+# window overlaps the next so chunk boundaries near a window edge are seen
+# with context on both sides.
+DEFAULT_WINDOW_SIZE = 50000
+DEFAULT_OVERLAP = 2000
 
 def segment(content: str, **kwargs) -> Dict[str, Any]:
     """Segment text using Jina AI Segmenter API."""
-    client = JinaClient()
+    client = get_client()
     data = {"content": content}
     data.update(kwargs)
     
-    response = client.post("https://segment.jina.ai/", data=data)
+    response = client.post(SEGMENT_URL, data=data)
     return response
 
+async def asegment(content: str, **kwargs) -> Dict[str, Any]:
+    """Awaitable variant of segment()."""
+    client = get_async_client()
+    data = {"content": content}
+    data.update(kwargs)
+    return await client.post(SEGMENT_URL, data=data)
+
+def iter_windows(file: TextIO, window_size: int = DEFAULT_WINDOW_SIZE,
+                 overlap: int = DEFAULT_OVERLAP) -> Iterator[Tuple[int, str]]:
+    """Reads ``file`` incrementally as overlapping ``(offset, text)`` windows."""
+    if not 0 <= overlap < window_size:
+        raise ValueError("overlap must be at least 0 and smaller than window_size")
+    offset = 0
+    buffer = file.read(window_size)
+    while buffer:
+        yield offset, buffer
+        more = file.read(window_size - overlap)
+        if not more:
+            break
+        offset += len(buffer) - overlap
+        buffer = buffer[-overlap:] + more if overlap else more
+
+def _chunk_spans(offset: int, text: str, result: Dict[str, Any]) -> List[Tuple[int, int]]:
+    """Global ``(start, end)`` spans of the chunks the API returned for a window."""
+    positions = result.get("chunk_positions")
+    if positions:
+        return [(offset + start, offset + end) for start, end in positions]
+    # Without positions, locate each chunk after the previous one.
+    spans = []
+    cursor = 0
+    for chunk in result.get("chunks") or []:
+        start = text.find(chunk, cursor)
+        if start < 0:
+            continue
+        cursor = start + len(chunk)
+        spans.append((offset + start, offset + cursor))
+    return spans
+
+def segment_stream(
+    file: TextIO,
+    window_size: int = DEFAULT_WINDOW_SIZE,
+    overlap: int = DEFAULT_OVERLAP,
+    max_workers: int = 4,
+    **kwargs,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Segments an arbitrarily large text stream into chunks with global offsets.
+
+    The stream is read in overlapping windows that are segmented concurrently
+    (at most ``max_workers`` windows are held in memory). Consecutive windows
+    are stitched at the first chunk boundary the later window found past the
+    middle of their overlap, so chunks cut short by a window edge are dropped
+    in favour of the neighbour's view. Yields ``{"chunk", "start", "end"}``.
+    """
+    if "return_chunks" in kwargs:
+        raise ValueError("segment_stream always requests chunks; do not pass return_chunks")
+
+    def fetch(window):
+        offset, text = window
+        return _chunk_spans(offset, text, segment(text, return_chunks=True, **kwargs))
+
+    windows = iter_ordered(fetch, iter_windows(file, window_size, overlap), max_workers)
+    previous = None
+    cut = 0
+    for (offset, text), spans in windows:
+        if previous is not None:
+            prev_offset, prev_text, prev_spans = previous
+            prev_end = prev_offset + len(prev_text)
+            middle = offset + overlap // 2
+            next_cut = next((start for start, _ in spans if middle <= start <= prev_end), prev_end)
+            yield from _emit(prev_offset, prev_text, prev_spans, cut, next_cut)
+            cut = next_cut
+        previous = (offset, text, spans)
+    if previous is not None:
+        prev_offset, prev_text, prev_spans = previous
+        yield from _emit(prev_offset, prev_text, prev_spans, cut, prev_offset + len(prev_text))
+
+def _emit(offset: int, text: str, spans: List[Tuple[int, int]], low: int, high: int) -> Iterator[Dict[str, Any]]:
+    for start, end in spans:
+        start, end = max(start, low), min(end, high)
+        if start < end:
+            yield {"chunk": text[start - offset:end - offset], "start": start, "end": end}
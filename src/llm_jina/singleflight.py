@@ -0,0 +1,84 @@
+"""
+Coalescing of concurrent identical requests into one in-flight call.
+"""
+import asyncio
+import copy
+import threading
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+
+R = TypeVar("R")
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Runs at most one call per key at a time across threads.
+
+    While a call for a key is in flight, further callers with the same key
+    wait for it and receive its result (or exception) instead of starting
+    their own. Followers get a deep copy, so callers may mutate what they
+    are given. Nothing is remembered once the call completes.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, func: Callable[[], R]) -> R:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return copy.deepcopy(call.result)
+        try:
+            call.result = func()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+
+class AsyncSingleFlight:
+    """Asyncio counterpart of SingleFlight for tasks on one event loop."""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[R]]) -> R:
+        future = self._calls.get(key)
+        if future is not None:
+            # shield: a cancelled follower must not cancel the leader's call.
+            return copy.deepcopy(await asyncio.shield(future))
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        try:
+            result = await func()
+        except BaseException as e:
+            if isinstance(e, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(e)
+                # Mark retrieved so an exception nobody else awaited is not logged.
+                future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._calls[key]
@@ -0,0 +1,62 @@
+"""
+Incremental parsing of server-sent event (SSE) streams.
+"""
+from typing import AsyncIterator, Iterable, Iterator, List, Optional
+
+DONE = "[DONE]"
+
+class _EventBuffer:
+    """Accumulates ``data:`` lines until a blank line completes an event."""
+
+    def __init__(self):
+        self.lines: List[str] = []
+
+    def feed(self, line: str) -> Optional[str]:
+        line = line.rstrip("\r")
+        if not line:
+            if not self.lines:
+                return None
+            data = "\n".join(self.lines)
+            self.lines = []
+            return data
+        if line.startswith(":"):
+            return None  # comment / keep-alive
+        field, _, value = line.partition(":")
+        if field == "data":
+            self.lines.append(value[1:] if value.startswith(" ") else value)
+        return None
+
+    def flush(self) -> Optional[str]:
+        if not self.lines:
+            return None
+        data = "\n".join(self.lines)
+        self.lines = []
+        return data
+
+def iter_sse_data(lines: Iterable[str]) -> Iterator[str]:
+    """Yields the data payload of each event in an SSE line stream, stopping at ``[DONE]``."""
+    buffer = _EventBuffer()
+    for line in lines:
+        data = buffer.feed(line)
+        if data is None:
+            continue
+        if data == DONE:
+            return
+        yield data
+    data = buffer.flush()
+    if data is not None and data != DONE:
+        yield data
+
+async def aiter_sse_data(lines: AsyncIterator[str]) -> AsyncIterator[str]:
+    """Async variant of iter_sse_data()."""
+    buffer = _EventBuffer()
+    async for line in lines:
+        data = buffer.feed(line)
+        if data is None:
+            continue
+        if data == DONE:
+            return
+        yield data
+    data = buffer.flush()
+    if data is not None and data != DONE:
+        yield data
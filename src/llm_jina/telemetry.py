@@ -0,0 +1,226 @@
+"""
+Per-request usage and latency telemetry stored in a SQLite database.
+
+Requests are recorded into an in-memory queue and written in batches by a
+background thread, so the request path never waits on disk I/O.
+"""
+import atexit
+import json
+import math
+import re
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from .cache import cache_enabled
+from .ratelimit import endpoint_key
+from .utils import connect_db, usage_db_path
+
+DEFAULT_FLUSH_INTERVAL = 1.0
+DEFAULT_RETENTION_DAYS = 30
+# Upper bound on queued rows; beyond it the oldest are dropped rather than
+# letting a stuck writer grow memory without limit.
+MAX_PENDING = 100000
+
+BUCKETS = {"minute": 60, "hour": 3600, "day": 86400}
+
+def usage_tokens(response: Any) -> Optional[int]:
+    """Extracts the billed token count from a Jina JSON response, if present."""
+    if not isinstance(response, dict):
+        return None
+    usage = response.get("usage")
+    if isinstance(usage, dict):
+        for key in ("total_tokens", "tokens"):
+            if isinstance(usage.get(key), int):
+                return usage[key]
+    meta = response.get("meta")
+    if isinstance(meta, dict) and isinstance(meta.get("usage"), dict):
+        return usage_tokens(meta)
+    return None
+
+class StreamUsage:
+    """
+    Tallies a streamed (SSE) response for telemetry: the bytes received, and
+    the billed tokens reported in its last ``data:`` event.
+    """
+
+    def __init__(self):
+        self.bytes_in = 0
+        self._last_data = None
+
+    def feed(self, line: str):
+        self.bytes_in += len(line.encode("utf-8")) + 1
+        if line.startswith("data:") and line[5:].strip() != "[DONE]":
+            self._last_data = line[5:]
+
+    @property
+    def tokens(self) -> Optional[int]:
+        if self._last_data is None:
+            return None
+        try:
+            return usage_tokens(json.loads(self._last_data))
+        except ValueError:
+            return None
+
+def parse_duration(value: str) -> float:
+    """Parses durations such as ``90``, ``15m``, ``24h`` or ``7d`` into seconds."""
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([smhd]?)\s*", value or "")
+    if not match:
+        raise ValueError(f"Invalid duration: {value!r} (use e.g. 15m, 24h, 7d)")
+    number, unit = match.groups()
+    return float(number) * {"": 1, "s": 1, "m": 60, "h": 3600, "d": 86400}[unit]
+
+def percentile(sorted_values: Sequence[float], fraction: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted sequence."""
+    if not sorted_values:
+        return None
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(fraction * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+class UsageRecorder:
+    """Records one row per API request: endpoint, model, status, bytes, tokens and latency.
+
+    ``record`` only appends to a queue. A daemon thread writes queued rows
+    every ``flush_interval`` seconds in a single transaction; rows older than
+    ``retention_days`` are pruned when the database is opened.
+    """
+
+    def __init__(self, path: Optional[Path] = None, flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+                 retention_days: float = DEFAULT_RETENTION_DAYS):
+        self.path = Path(path) if path else usage_db_path()
+        self.flush_interval = flush_interval
+        self.retention_days = retention_days
+        self._pending = deque(maxlen=MAX_PENDING)
+        self._lock = threading.Lock()
+        self._conn = None
+        self._thread = None
+        self._stop = threading.Event()
+
+    def _connection(self):
+        if self._conn is None:
+            self._conn = connect_db(self.path)
+            self._conn.executescript("""
+                create table if not exists requests (
+                    ts real not null,
+                    endpoint text not null,
+                    model text,
+                    status integer,
+                    bytes_out integer,
+                    bytes_in integer,
+                    tokens integer,
+                    latency_ms real
+                );
+                create index if not exists requests_ts on requests (ts);
+            """)
+            if self.retention_days:
+                self._conn.execute("delete from requests where ts < ?",
+                                   (time.time() - self.retention_days * 86400,))
+        return self._conn
+
+    def record(self, url: str, model: Optional[str], status: Optional[int], bytes_out: Optional[int],
+               bytes_in: Optional[int], tokens: Optional[int], latency: float):
+        """Queues a request for writing; ``latency`` is in seconds."""
+        self._pending.append((time.time(), endpoint_key(url), model, status, bytes_out, bytes_in,
+                              tokens, round(latency * 1000, 3)))
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="jina-telemetry", daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def flush(self):
+        """Writes every queued row now."""
+        rows = []
+        while True:
+            try:
+                rows.append(self._pending.popleft())
+            except IndexError:
+                break
+        if not rows:
+            return
+        with self._lock:
+            conn = self._connection()
+            conn.execute("begin")
+            conn.executemany("insert into requests values (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            conn.execute("commit")
+
+    def rows(self, since: Optional[float] = None) -> List[Tuple]:
+        self.flush()
+        with self._lock:
+            return self._connection().execute(
+                "select ts, endpoint, model, status, bytes_out, bytes_in, tokens, latency_ms "
+                "from requests where ts >= ? order by ts",
+                (since or 0,),
+            ).fetchall()
+
+    def stats(self, since: Optional[float] = None, bucket: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Summarises recorded requests per endpoint, and per time bucket if given.
+
+        Each summary has request and error counts, throughput over the
+        observed span, p50/p95/p99 latency in milliseconds, tokens and bytes.
+        """
+        width = BUCKETS[bucket] if bucket else None
+        groups = {}
+        for ts, endpoint, model, status, bytes_out, bytes_in, tokens, latency in self.rows(since):
+            start = ts - ts % width if width else None
+            groups.setdefault((start, endpoint), []).append((ts, status, bytes_out, bytes_in, tokens, latency))
+
+        summaries = []
+        for (start, endpoint), rows in sorted(groups.items(), key=lambda item: (item[0][0] or 0, item[0][1])):
+            latencies = sorted(row[5] for row in rows if row[5] is not None)
+            span = rows[-1][0] - rows[0][0]
+            summary = {"endpoint": endpoint}
+            if width:
+                summary["window_start"] = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(start))
+            summary.update({
+                "requests": len(rows),
+                "errors": sum(1 for row in rows if row[1] is None or row[1] >= 400),
+                "requests_per_second": round(len(rows) / span, 3) if span > 0 else None,
+                "p50_ms": percentile(latencies, 0.50),
+                "p95_ms": percentile(latencies, 0.95),
+                "p99_ms": percentile(latencies, 0.99),
+                "tokens": sum(row[4] or 0 for row in rows),
+                "bytes_out": sum(row[2] or 0 for row in rows),
+                "bytes_in": sum(row[3] or 0 for row in rows),
+            })
+            summaries.append(summary)
+        return summaries
+
+    def clear(self):
+        """Deletes every recorded request."""
+        self._pending.clear()
+        with self._lock:
+            self._connection().execute("delete from requests")
+
+    def close(self):
+        """Stops the writer thread after writing what is still queued."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.flush()
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+_recorder = None
+_recorder_lock = threading.Lock()
+
+def get_recorder() -> Optional[UsageRecorder]:
+    """Returns the shared recorder, or None if LLM_JINA_TELEMETRY=0."""
+    global _recorder
+    if not cache_enabled("LLM_JINA_TELEMETRY"):
+        return None
+    with _recorder_lock:
+        if _recorder is None:
+            _recorder = UsageRecorder()
+            atexit.register(_recorder.close)
+        return _recorder
@@ -0,0 +1,262 @@
+"""
+Per-phase latency tracing of Jina API requests.
+
+Both clients time each HTTP request phase by phase:
+
+- ``queue``: waiting on client-side rate limits or the async client's
+  concurrency limit
+- ``connect``: DNS lookup and TCP handshake, for new connections only
+- ``tls``: the TLS handshake
+- ``wait``: sending the request and waiting for the response headers
+- ``retry``: back-off between attempts
+- ``download``: reading the response body
+- ``decode``: parsing the JSON
+
+Each finished request is handed to the active Tracer as a RequestTrace.
+With no tracer installed the clients skip all of this, so tracing costs one
+attribute lookup per request when it is off.
+"""
+import contextlib
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TypeVar
+from .ratelimit import endpoint_key
+
+T = TypeVar("T")
+
+PHASES = ("queue", "connect", "tls", "wait", "retry", "download", "decode")
+
+# httpcore trace events that mark connection setup on httpx transports.
+_HTTPCORE_PHASES = {
+    "connection.connect_tcp": "connect",
+    "connection.start_tls": "tls",
+}
+
+class RequestTrace:
+    """Timings and sizes of one API request, including any retries."""
+
+    def __init__(self, url: str, model: Optional[str] = None):
+        self.url = url
+        self.endpoint = endpoint_key(url)
+        self.model = model
+        self.status: Optional[int] = None
+        self.bytes_out: Optional[int] = None
+        self.bytes_in: Optional[int] = None
+        self.attempts = 0
+        self.error: Optional[str] = None
+        self.phases: Dict[str, float] = {}
+        self.started = time.time()
+        self.duration: Optional[float] = None
+        self._start = time.perf_counter()
+        self._marks: Dict[str, float] = {}
+
+    def add(self, phase: str, seconds: float):
+        """Adds ``seconds`` to a phase; phases repeat across retries."""
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - started)
+
+    def connection_time(self) -> float:
+        return self.phases.get("connect", 0.0) + self.phases.get("tls", 0.0)
+
+    def httpcore_event(self, name: str, info: Dict[str, Any]):
+        """httpcore ``trace`` extension callback recording connection setup."""
+        prefix, _, state = name.rpartition(".")
+        phase = _HTTPCORE_PHASES.get(prefix)
+        if phase is None:
+            return
+        if state == "started":
+            self._marks[phase] = time.perf_counter()
+        elif phase in self._marks:
+            self.add(phase, time.perf_counter() - self._marks.pop(phase))
+
+    async def ahttpcore_event(self, name: str, info: Dict[str, Any]):
+        """Async form of httpcore_event, for httpx.AsyncClient."""
+        self.httpcore_event(name, info)
+
+    def finish(self, status: Optional[int] = None, bytes_out: Optional[int] = None,
+               bytes_in: Optional[int] = None, error: Optional[BaseException] = None):
+        self.duration = time.perf_counter() - self._start
+        self.status = status
+        self.bytes_out = bytes_out
+        self.bytes_in = bytes_in
+        if error is not None:
+            self.error = str(error)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "endpoint": self.endpoint,
+            "model": self.model,
+            "status": self.status,
+            "attempts": self.attempts,
+            "bytes_out": self.bytes_out,
+            "bytes_in": self.bytes_in,
+            "total_ms": _ms(self.duration),
+            "phases_ms": {phase: _ms(self.phases[phase]) for phase in PHASES if phase in self.phases},
+            "error": self.error,
+        }
+
+
+def _ms(seconds: Optional[float]) -> Optional[float]:
+    return round(seconds * 1000, 3) if seconds is not None else None
+
+
+class Tracer:
+    """Receives a RequestTrace for every finished API request.
+
+    Subclass and override ``record``. It is called on the thread (or event
+    loop) that made the request, so it should return quickly.
+    """
+
+    def record(self, trace: RequestTrace):
+        raise NotImplementedError
+
+
+class TimingCollector(Tracer):
+    """Keeps every trace in memory and summarises them per endpoint."""
+
+    def __init__(self):
+        self.traces: List[RequestTrace] = []
+        self._lock = threading.Lock()
+
+    def record(self, trace: RequestTrace):
+        with self._lock:
+            self.traces.append(trace)
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """Mean time per phase, p50/p99 of the total and bytes, per endpoint."""
+        from .telemetry import percentile
+
+        with self._lock:
+            traces = list(self.traces)
+        groups: Dict[str, List[RequestTrace]] = {}
+        for trace in traces:
+            groups.setdefault(trace.endpoint, []).append(trace)
+        summaries = []
+        for endpoint, group in sorted(groups.items()):
+            totals = sorted(trace.duration or 0.0 for trace in group)
+            phases = {}
+            for phase in PHASES:
+                spent = [trace.phases[phase] for trace in group if phase in trace.phases]
+                if spent:
+                    phases[phase] = _ms(sum(spent) / len(group))
+            summaries.append({
+                "endpoint": endpoint,
+                "requests": len(group),
+                "errors": sum(1 for trace in group if trace.error is not None),
+                "mean_phases_ms": phases,
+                "p50_ms": _ms(percentile(totals, 0.50)),
+                "p99_ms": _ms(percentile(totals, 0.99)),
+                "bytes_out": sum(trace.bytes_out or 0 for trace in group),
+                "bytes_in": sum(trace.bytes_in or 0 for trace in group),
+            })
+        return summaries
+
+    def format(self) -> str:
+        """Renders the summary as a table, one row per endpoint."""
+        header = ["endpoint", "requests", *PHASES, "p50", "p99", "sent", "received"]
+        rows = [header]
+        for summary in self.summary():
+            phases = summary["mean_phases_ms"]
+            rows.append([summary["endpoint"], str(summary["requests"])]
+                        + [f"{phases[phase]:.1f}" if phase in phases else "-" for phase in PHASES]
+                        + [f"{summary['p50_ms']:.1f}", f"{summary['p99_ms']:.1f}",
+                           str(summary["bytes_out"]), str(summary["bytes_in"])])
+        if len(rows) == 1:
+            return "No API requests were made."
+        widths = [max(len(row[i]) for row in rows) for i in range(len(header))]
+        lines = ["  ".join(cell.ljust(widths[0]) if i == 0 else cell.rjust(widths[i])
+                           for i, cell in enumerate(row)) for row in rows]
+        lines.append("Phase columns are mean milliseconds per request; p50/p99 are total request times.")
+        return "\n".join(lines)
+
+
+class OpenTelemetryTracer(Tracer):
+    """Exports each request as an OpenTelemetry client span with one child span per phase.
+
+    Phase spans are laid end to end in the order of PHASES, which matches
+    the order they happen in except when a request was retried. Spans go to
+    the globally configured tracer provider unless one is given.
+    """
+
+    def __init__(self, tracer_provider: Any = None):
+        try:
+            from opentelemetry import trace
+        except ImportError:
+            raise ImportError(
+                "OpenTelemetry tracing requires opentelemetry-api: pip install 'llm-jina[otel]'"
+            )
+        self._trace = trace
+        self._tracer = trace.get_tracer("llm_jina", tracer_provider=tracer_provider)
+
+    def record(self, trace: RequestTrace):
+        otel = self._trace
+        start = int(trace.started * 1e9)
+        end = start + int((trace.duration or 0.0) * 1e9)
+        attributes = {"http.request.method": "POST", "url.full": trace.url, "jina.attempts": trace.attempts}
+        for name, value in (("jina.model", trace.model), ("http.response.status_code", trace.status),
+                            ("http.request.body.size", trace.bytes_out),
+                            ("http.response.body.size", trace.bytes_in)):
+            if value is not None:
+                attributes[name] = value
+        span = self._tracer.start_span(f"POST {trace.endpoint}", kind=otel.SpanKind.CLIENT,
+                                       start_time=start, attributes=attributes)
+        if trace.error is not None:
+            span.set_status(otel.Status(otel.StatusCode.ERROR, trace.error))
+        context = otel.set_span_in_context(span)
+        offset = start
+        for phase in PHASES:
+            if phase in trace.phases:
+                duration = int(trace.phases[phase] * 1e9)
+                child = self._tracer.start_span(phase, context=context, start_time=offset)
+                child.end(end_time=offset + duration)
+                offset += duration
+        span.end(end_time=end)
+
+
+_tracer: Optional[Tracer] = None
+_local = threading.local()
+
+def get_tracer() -> Optional[Tracer]:
+    """Returns the tracer installed with set_tracer, if any."""
+    return _tracer
+
+def set_tracer(tracer: Optional[Tracer]) -> Optional[Tracer]:
+    """Installs the process-wide tracer (None turns tracing off); returns the previous one."""
+    global _tracer
+    previous = _tracer
+    _tracer = tracer
+    return previous
+
+def current() -> Optional[RequestTrace]:
+    """The trace of the request in progress on this thread, for connection-level hooks."""
+    return getattr(_local, "trace", None)
+
+def timed(iterable: Iterable[T], trace: RequestTrace, phase: str) -> Iterator[T]:
+    """Yields from ``iterable``, adding only the time spent waiting on it to ``phase``."""
+    iterator = iter(iterable)
+    while True:
+        started = time.perf_counter()
+        try:
+            item = next(iterator)
+        except StopIteration:
+            return
+        finally:
+            trace.add(phase, time.perf_counter() - started)
+        yield item
+
+@contextlib.contextmanager
+def activate(trace: RequestTrace) -> Iterator[RequestTrace]:
+    """Makes ``trace`` the current trace on this thread for the duration of the block."""
+    previous = current()
+    _local.trace = trace
+    try:
+        yield trace
+    finally:
+        _local.trace = previous
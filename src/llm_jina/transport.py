@@ -0,0 +1,127 @@
+"""
+httpx transport for JinaClient, with optional HTTP/2.
+
+HttpxSession stands in for the parts of requests.Session that JinaClient
+uses, so retries, caching, telemetry and tracing work the same on either
+transport. httpx errors are re-raised as the matching requests exceptions.
+"""
+import contextlib
+from typing import Dict, Iterator, Optional
+import httpx
+import requests
+from requests.structures import CaseInsensitiveDict
+from . import tracing
+
+@contextlib.contextmanager
+def _translated() -> Iterator[None]:
+    """Re-raises httpx errors as the requests exceptions JinaClient handles."""
+    try:
+        yield
+    except httpx.TimeoutException as e:
+        raise requests.exceptions.Timeout(str(e))
+    except httpx.TransportError as e:
+        raise requests.exceptions.ConnectionError(str(e))
+    except httpx.HTTPError as e:
+        raise requests.exceptions.RequestException(str(e))
+
+
+class _SentRequest:
+    __slots__ = ("body",)
+
+    def __init__(self, body: bytes):
+        self.body = body
+
+
+class HttpxResponse:
+    """The subset of requests.Response that JinaClient reads, over an httpx response."""
+
+    def __init__(self, response: httpx.Response):
+        self._response = response
+        self.status_code = response.status_code
+        self.reason = response.reason_phrase
+        self.url = str(response.url)
+        self.headers = response.headers
+        self.request = _SentRequest(response.request.content)
+        self.encoding = None
+        self.http_version = response.http_version
+
+    @property
+    def content(self) -> bytes:
+        with _translated():
+            return self._response.read()
+
+    @property
+    def text(self) -> str:
+        self.content
+        return self._response.text
+
+    @property
+    def wire_bytes(self) -> int:
+        """Response body bytes received before decompression."""
+        return self._response.num_bytes_downloaded
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            kind = "Client" if self.status_code < 500 else "Server"
+            raise requests.exceptions.HTTPError(
+                f"{self.status_code} {kind} Error: {self.reason} for url: {self.url}", response=self)
+
+    def iter_content(self, chunk_size: Optional[int] = None) -> Iterator[bytes]:
+        with _translated():
+            for chunk in self._response.iter_bytes(chunk_size):
+                yield chunk
+
+    def iter_lines(self, decode_unicode: bool = True) -> Iterator[str]:
+        with _translated():
+            for line in self._response.iter_lines():
+                yield line
+
+    def close(self):
+        self._response.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class HttpxSession:
+    """
+    requests.Session stand-in backed by one thread-safe httpx.Client.
+
+    With ``http2``, concurrent requests to a host are multiplexed over a
+    single connection instead of each holding its own. Responses are
+    decompressed according to their Content-Encoding; httpx advertises
+    gzip and deflate, plus brotli and zstd when those packages are installed.
+    """
+
+    def __init__(self, http2: bool = False, max_connections: int = 100, timeout: Optional[float] = None):
+        try:
+            self.client = httpx.Client(
+                http2=http2,
+                limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+                timeout=timeout,
+            )
+        except ImportError:
+            raise ImportError("HTTP/2 requires the h2 package: pip install 'llm-jina[http2]'")
+        self.http2 = http2
+        self.headers = CaseInsensitiveDict()
+
+    def post(self, url: str, data: Optional[bytes] = None, headers: Optional[Dict[str, str]] = None,
+             stream: bool = False) -> HttpxResponse:
+        extensions = {}
+        trace = tracing.current()
+        if trace is not None:
+            extensions["trace"] = trace.httpcore_event
+        request = self.client.build_request("POST", url, content=data, headers=dict(headers or self.headers),
+                                            extensions=extensions)
+        with _translated():
+            response = HttpxResponse(self.client.send(request, stream=True))
+        if not stream:
+            with response:
+                response.content
+        return response
+
+    def close(self):
+        self.client.close()
@@ -2,6 +2,8 @@
 import click
 import os
 import pathlib
+import sqlite3
+import tempfile
 
 def user_dir():
     """
@@ -25,4 +27,86 @@ def logs_db_path():
     Returns:
         pathlib.Path: The path to the logs database.
     """
-    return user_dir() / "logs.db"
\ No newline at end of file
+    return user_dir() / "logs.db"
+
+def option_headers(options):
+    """
+    Converts keyword options into Jina ``X-`` request headers.
+
+    ``with_links=True`` becomes ``X-With-Links: true``; ``None`` values are skipped.
+
+    Args:
+        options (dict): Keyword options passed to an endpoint function.
+
+    Returns:
+        dict: The corresponding request headers.
+    """
+    headers = {}
+    for key, value in options.items():
+        if value is not None:
+            header_key = f"X-{key.replace('_', '-')}"
+            if isinstance(value, bool):
+                headers[header_key] = "true"
+            else:
+                headers[header_key] = str(value)
+    return headers
+
+def embeddings_db_path():
+    """
+    Returns the path to llm's embeddings database.
+
+    Returns:
+        pathlib.Path: The path to the embeddings database.
+    """
+    return user_dir() / "embeddings.db"
+
+def atomic_write(path, content):
+    """
+    Replaces a file's content atomically.
+
+    The content is written to a uniquely named temporary file in the same
+    directory and moved over ``path``, so readers (and concurrent writers)
+    only ever see a complete old or new version.
+
+    Args:
+        path (pathlib.Path): The file to write.
+        content (str or bytes): The new content; text is encoded as UTF-8.
+    """
+    path = pathlib.Path(path)
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    fd, tmp = tempfile.mkstemp(dir=str(path.parent), prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+        os.replace(tmp, str(path))
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+def usage_db_path():
+    """
+    Returns the path to the Jina request telemetry database.
+
+    Returns:
+        pathlib.Path: The path to the usage database, next to llm's logs.db.
+    """
+    return user_dir() / "jina-usage.db"
+
+def connect_db(path):
+    """
+    Opens a SQLite database shared by threads and by concurrent CLI processes.
+
+    WAL lets concurrent processes read while one writes; the timeout makes
+    writers wait for the lock instead of failing with "database is locked".
+
+    Returns:
+        sqlite3.Connection: An autocommit connection usable from any thread.
+    """
+    conn = sqlite3.connect(str(path), timeout=30, isolation_level=None, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
@@ -0,0 +1,45 @@
+"""
+Decoding of the compact embedding encodings returned by the Jina API.
+"""
+import array
+import base64
+import sys
+from typing import List, Optional, Union
+
+# Values accepted by the API's ``embedding_type`` request field.
+EMBEDDING_TYPES = ("float", "base64", "binary", "ubinary")
+
+def decode_base64(data: str) -> array.array:
+    """Decodes a base64 string of little-endian float32 values."""
+    vector = array.array("f")
+    vector.frombytes(base64.b64decode(data))
+    if sys.byteorder == "big":
+        vector.byteswap()
+    return vector
+
+def unpack_bits(packed: List[int], dimensions: Optional[int] = None) -> array.array:
+    """
+    Expands a bit-packed binary embedding to a +1/-1 float vector.
+
+    Each byte holds eight dimensions, most significant bit first. Both the
+    signed ("binary") and unsigned ("ubinary") packings are accepted. Dot
+    products of the expanded vectors rank results like Hamming distance.
+    """
+    bits = bytes(value & 0xFF for value in packed)
+    vector = array.array("f", (
+        1.0 if byte & (0x80 >> bit) else -1.0
+        for byte in bits
+        for bit in range(8)
+    ))
+    if dimensions is not None:
+        del vector[dimensions:]
+    return vector
+
+def decode_embedding(value: Union[str, List[float], List[int]], embedding_type: str,
+                     dimensions: Optional[int] = None) -> array.array:
+    """Decodes one embedding from the API into a float32 array."""
+    if isinstance(value, str):
+        return decode_base64(value)
+    if embedding_type in ("binary", "ubinary"):
+        return unpack_bits(value, dimensions)
+    return array.array("f", value)
@@ -1,10 +1,33 @@
+import io
+import json
 import pytest
 import os
+import requests
 from unittest.mock import patch
 
 
 @pytest.fixture(autouse=True)
-def mock_env_setup():
+def mock_env_setup(tmp_path):
     """Set up test environment with mock API key for all tests"""
-    with patch.dict(os.environ, {"JINA_API_KEY": "test-jina-api-key-for-testing"}):
+    with patch.dict(os.environ, {
+        "JINA_API_KEY": "test-jina-api-key-for-testing",
+        "LLM_USER_PATH": str(tmp_path / "llm"),
+        "LLM_JINA_EMBEDDING_CACHE": "0",
+        "LLM_JINA_HTTP_CACHE": "0",
+        "LLM_JINA_TELEMETRY": "0",
+    }):
         yield
+
+
+@pytest.fixture
+def make_response():
+    """Factory for a requests.Response carrying a JSON body and its request"""
+    def make(status, body):
+        response = requests.Response()
+        response.status_code = status
+        response._content = json.dumps(body).encode()
+        response.raw = io.BytesIO(response._content)
+        response.request = requests.Request("POST", "https://api.jina.ai/v1/rerank",
+                                            data=b'{"model": "m"}').prepare()
+        return response
+    return make
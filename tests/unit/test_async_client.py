@@ -0,0 +1,160 @@
+import asyncio
+import json
+import pytest
+import httpx
+from llm_jina.async_client import AsyncJinaClient, get_async_client, set_async_client, close_async_clients
+from llm_jina.exceptions import JinaAPIError
+from llm_jina.ratelimit import NO_RETRY
+from llm_jina import reader, rerank, classifier
+from llm_jina.embeddings import JinaEmbeddings
+
+
+def make_client(handler, **kwargs):
+    """Create an AsyncJinaClient whose transport is served by handler"""
+    client = AsyncJinaClient(**kwargs)
+    client.http = httpx.AsyncClient(transport=httpx.MockTransport(handler), headers=client.http.headers)
+    return client
+
+
+def run_with_client(handler, coro_factory, **kwargs):
+    """Run a coroutine with a mocked shared async client installed"""
+    async def main():
+        set_async_client(make_client(handler, **kwargs))
+        try:
+            return await coro_factory()
+        finally:
+            await close_async_clients()
+    return asyncio.run(main())
+
+
+def test_async_post_success():
+    """Successful requests return the decoded JSON body"""
+    def handler(request):
+        assert request.headers["Authorization"] == "Bearer test-jina-api-key-for-testing"
+        return httpx.Response(200, json={"ok": True})
+
+    async def main():
+        async with make_client(handler) as client:
+            return await client.post("https://api.jina.ai/v1/test", data={"a": 1})
+
+    assert asyncio.run(main()) == {"ok": True}
+
+
+def test_async_post_http_error():
+    """HTTP errors are raised as JinaAPIError"""
+    def handler(request):
+        return httpx.Response(500, text="boom")
+
+    async def main():
+        async with make_client(handler, retry=NO_RETRY) as client:
+            await client.post("https://api.jina.ai/v1/test", data={})
+
+    with pytest.raises(JinaAPIError):
+        asyncio.run(main())
+
+
+def test_async_post_invalid_json():
+    """Non-JSON bodies are raised as JinaAPIError"""
+    def handler(request):
+        return httpx.Response(200, text="not json")
+
+    async def main():
+        async with make_client(handler) as client:
+            await client.post("https://api.jina.ai/v1/test", data={})
+
+    with pytest.raises(JinaAPIError) as excinfo:
+        asyncio.run(main())
+    assert "Invalid JSON response" in str(excinfo.value)
+
+
+def test_async_bounded_concurrency():
+    """No more than max_concurrency requests are in flight at once"""
+    state = {"active": 0, "peak": 0}
+
+    async def slow(request):
+        state["active"] += 1
+        state["peak"] = max(state["peak"], state["active"])
+        await asyncio.sleep(0.01)
+        state["active"] -= 1
+        return httpx.Response(200, json={})
+
+    async def main():
+        async with make_client(slow, max_concurrency=3) as client:
+            await asyncio.gather(*[client.post("https://api.jina.ai/v1/test", data={"i": i}) for i in range(12)])
+
+    asyncio.run(main())
+    assert state["peak"] == 3
+
+
+def test_get_async_client_shared_per_loop():
+    """The shared async client is reused within one event loop"""
+    async def main():
+        try:
+            return get_async_client() is get_async_client()
+        finally:
+            await close_async_clients()
+
+    assert asyncio.run(main())
+
+
+def test_aread_sends_headers():
+    """aread posts the URL with reader option headers"""
+    def handler(request):
+        assert request.headers["X-Return-Format"] == "text"
+        assert request.headers["X-with-links"] == "true"
+        assert json.loads(request.content) == {"url": "https://example.com"}
+        return httpx.Response(200, json={"data": {"content": "hi"}})
+
+    result = run_with_client(handler, lambda: reader.aread("https://example.com", return_format="text", with_links=True))
+    assert result == {"data": {"content": "hi"}}
+
+
+def test_arerank_and_aclassify_payloads():
+    """Async endpoint variants build the same payloads as the sync ones"""
+    def handler(request):
+        body = json.loads(request.content)
+        if request.url.path == "/v1/rerank":
+            assert body["top_n"] == 1
+        else:
+            assert body["model"] == "jina-embeddings-v3"
+        return httpx.Response(200, json=body)
+
+    async def both():
+        return await asyncio.gather(
+            rerank.arerank("q", ["a", "b"], top_n=1),
+            classifier.aclassify(["text"], ["x", "y"]),
+        )
+
+    reranked, classified = run_with_client(handler, both)
+    assert reranked["documents"] == ["a", "b"]
+    assert classified["labels"] == ["x", "y"]
+
+
+def test_aembed_batch_orders_by_index():
+    """aembed_batch returns embeddings in input order"""
+    def handler(request):
+        return httpx.Response(200, json={"data": [
+            {"index": 1, "embedding": [0.25]},
+            {"index": 0, "embedding": [0.5]},
+        ]})
+
+    model = JinaEmbeddings("jina-embeddings-v3")
+    assert run_with_client(handler, lambda: model.aembed_batch(["a", "b"])) == [[0.5], [0.25]]
+
+
+def test_async_identical_posts_coalesced():
+    """Concurrent identical requests from tasks share one HTTP call"""
+    calls = []
+
+    async def handler(request):
+        calls.append(json.loads(request.content))
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, json={"ok": True})
+
+    async def main():
+        async with make_client(handler) as client:
+            same = [client.post("https://api.jina.ai/v1/test", data={"a": 1}) for _ in range(4)]
+            return await asyncio.gather(*same, client.post("https://api.jina.ai/v1/test", data={"a": 2}))
+
+    assert asyncio.run(main()) == [{"ok": True}] * 5
+    assert len(calls) == 2
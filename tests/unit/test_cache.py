@@ -0,0 +1,170 @@
+import pytest
+import time
+from unittest.mock import MagicMock, patch
+from click.testing import CliRunner
+from llm_jina.cache import EmbeddingCache, ResponseCache, CachePolicy, FRESH, STALE
+from llm_jina.client import JinaClient
+from llm_jina.commands import cli
+from llm_jina.embeddings import JinaEmbeddings
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """An embedding cache in a temporary directory"""
+    c = EmbeddingCache(path=tmp_path / "cache.db", max_entries=3)
+    yield c
+    c.close()
+
+
+def echo_client():
+    """Client double that embeds each text as [len(text)]"""
+    client = MagicMock()
+    client.post.side_effect = lambda url, data, headers=None: {
+        "data": [{"index": i, "embedding": [float(len(t))]} for i, t in enumerate(data["input"])]
+    }
+    return client
+
+
+def test_key_depends_on_model_options_and_text():
+    """Keys differ when any component differs"""
+    base = EmbeddingCache.key("m", {"task": "a"}, "text")
+    assert base == EmbeddingCache.key("m", {"task": "a"}, "text")
+    assert base != EmbeddingCache.key("m2", {"task": "a"}, "text")
+    assert base != EmbeddingCache.key("m", {"task": "b"}, "text")
+    assert base != EmbeddingCache.key("m", {"task": "a"}, "other")
+    assert EmbeddingCache.key("m", {}, "x") != EmbeddingCache.key("m", {}, b"x")
+
+
+def test_put_and_get_many(cache):
+    """Stored vectors are returned and counted as hits"""
+    cache.put_many({"a": [0.5, 1.0]})
+    found = cache.get_many(["a", "b"])
+    assert list(found) == ["a"]
+    assert found["a"].tolist() == [0.5, 1.0]
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+    assert (stats["total_hits"], stats["total_misses"]) == (1, 1)
+
+
+def test_lru_eviction(cache):
+    """The least recently used entries are evicted beyond max_entries"""
+    for key, value in (("a", 1.0), ("b", 2.0), ("c", 3.0)):
+        cache.put_many({key: [value]})
+    cache.get_many(["a"])
+    cache.put_many({"d": [4.0]})
+    assert set(cache.get_many(["a", "b", "c", "d"])) == {"a", "c", "d"}
+
+
+def test_counters_shared_across_connections(tmp_path):
+    """Totals persist in the database for other processes to read"""
+    path = tmp_path / "shared.db"
+    first = EmbeddingCache(path=path)
+    first.put_many({"a": [1.0]})
+    first.get_many(["a"])
+    second = EmbeddingCache(path=path)
+    assert second.get_many(["a"])["a"].tolist() == [1.0]
+    assert second.stats()["total_hits"] == 2
+    assert second.stats()["hits"] == 1
+
+
+def test_embed_batch_sends_only_misses(cache):
+    """Cached texts are served locally; only misses reach the API"""
+    client = echo_client()
+    model = JinaEmbeddings("jina-embeddings-v3", client=client, cache=cache)
+    assert model.embed_batch(["a", "bb"]) == [[1.0], [2.0]]
+    assert model.embed_batch(["bb", "ccc", "a"]) == [[2.0], [3.0], [1.0]]
+    assert client.post.call_args_list[1].kwargs["data"]["input"] == ["ccc"]
+
+
+def test_embed_batch_options_partition_cache(cache):
+    """Different request options do not share cache entries"""
+    client = echo_client()
+    JinaEmbeddings("jina-embeddings-v3", client=client, cache=cache).embed_batch(["a"])
+    JinaEmbeddings("jina-embeddings-v3", client=client, cache=cache,
+                   options={"task": "retrieval.query"}).embed_batch(["a"])
+    assert client.post.call_count == 2
+
+
+def test_cache_cli_stats_and_clear(tmp_path):
+    """The cache commands report stats and clear entries"""
+    runner = CliRunner()
+    result = runner.invoke(cli, ["cache", "stats"])
+    assert result.exit_code == 0
+    assert '"entries": 0' in result.output
+    result = runner.invoke(cli, ["cache", "clear"])
+    assert result.exit_code == 0
+    assert "Embedding cache cleared" in result.output
+    assert "Response cache cleared" in result.output
+
+
+@pytest.fixture
+def responses(tmp_path):
+    """A response cache with short policies for testing"""
+    c = ResponseCache(path=tmp_path / "http.db", policies={
+        "r.jina.ai": CachePolicy(ttl=60, stale_while_revalidate=60),
+        "api.jina.ai/v1/rerank": CachePolicy(ttl=60),
+    })
+    yield c
+    c.close()
+
+
+def test_response_cache_policy_lookup(responses):
+    """Policies match by endpoint path first, then host"""
+    assert responses.policy("https://r.jina.ai/") is not None
+    assert responses.policy("https://api.jina.ai/v1/rerank").ttl == 60
+    assert responses.policy("https://api.jina.ai/v1/embeddings") is None
+
+
+def test_response_cache_key_uses_option_headers():
+    """Option headers change the key; credentials do not"""
+    base = ResponseCache.key("u", {"url": "x"}, {"X-Return-Format": "markdown", "Authorization": "a"})
+    assert base == ResponseCache.key("u", {"url": "x"}, {"x-return-format": "markdown", "Authorization": "b"})
+    assert base != ResponseCache.key("u", {"url": "x"}, {"X-Return-Format": "text"})
+
+
+def test_response_cache_fresh_stale_expired(responses):
+    """Entries are fresh, then stale, then gone"""
+    policy = CachePolicy(ttl=10, stale_while_revalidate=10)
+    now = time.time()
+    responses.put("k", "https://r.jina.ai/", {"a": 1}, policy)
+    assert responses.get("k") == ({"a": 1}, FRESH)
+    with patch("llm_jina.cache.time.time", return_value=now + 15):
+        assert responses.get("k") == ({"a": 1}, STALE)
+    with patch("llm_jina.cache.time.time", return_value=now + 25):
+        assert responses.get("k") == (None, None)
+
+
+def test_response_cache_size_bound(tmp_path):
+    """Least recently used responses are evicted past max_bytes"""
+    c = ResponseCache(path=tmp_path / "small.db", max_bytes=200)
+    policy = CachePolicy(ttl=60)
+    for i in range(10):
+        c.put(f"k{i}", "u", {"payload": "%d" % i * 50}, policy)
+    assert c.stats()["bytes"] <= 200
+    assert c.get("k9")[0] is not None
+    assert c.get("k0") == (None, None)
+
+
+def test_client_serves_cached_responses(responses):
+    """Identical reader requests hit the network once"""
+    client = JinaClient(response_cache=responses)
+    client._fetch = MagicMock(return_value={"data": "page"})
+    for _ in range(3):
+        assert client.post("https://r.jina.ai/", {"url": "x"}, {"X-Return-Format": "markdown"}) == {"data": "page"}
+    assert client._fetch.call_count == 1
+    client.post("https://api.jina.ai/v1/embeddings", {"input": ["x"]})
+    client.post("https://api.jina.ai/v1/embeddings", {"input": ["x"]})
+    assert client._fetch.call_count == 3
+
+
+def test_client_revalidates_stale_in_background(responses):
+    """Stale entries are returned immediately and refreshed"""
+    client = JinaClient(response_cache=responses)
+    client._fetch = MagicMock(side_effect=[{"v": 1}, {"v": 2}])
+    now = time.time()
+    assert client.post("https://r.jina.ai/", {"url": "x"}) == {"v": 1}
+    with patch("llm_jina.cache.time.time", return_value=now + 90):
+        with patch("llm_jina.client.threading.Thread") as thread:
+            assert client.post("https://r.jina.ai/", {"url": "x"}) == {"v": 1}
+            thread.call_args.kwargs["target"]()
+    assert client.post("https://r.jina.ai/", {"url": "x"}) == {"v": 2}
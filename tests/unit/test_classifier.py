@@ -0,0 +1,121 @@
+import io
+import json
+import pytest
+from unittest.mock import patch
+from click.testing import CliRunner
+from llm_jina import classifier
+from llm_jina.commands import cli
+from llm_jina.records import Checkpoint, iter_records
+
+
+def fake_classify(calls=None, fail_on=None):
+    """classify() double labelling inputs by length, in reversed data order"""
+    def classify(inputs, labels, model=None):
+        if calls is not None:
+            calls.append(list(inputs))
+        if fail_on is not None and fail_on in inputs:
+            raise RuntimeError("boom")
+        data = [{"index": i, "prediction": "long" if len(t) > 3 else "short", "score": 0.9}
+                for i, t in enumerate(inputs)]
+        return {"data": list(reversed(data))}
+    return classify
+
+
+def test_iter_records_formats():
+    """JSONL, CSV and text inputs yield (id, text) pairs"""
+    jsonl = io.StringIO('{"id": "a", "text": "hi"}\n\n{"text": "there"}\n')
+    assert list(iter_records(jsonl, format="jsonl")) == [("a", "hi"), ("1", "there")]
+    csv_file = io.StringIO("ticket,body\nT1,hello\nT2,world\n")
+    assert list(iter_records(csv_file, format="csv", id_field="ticket", text_field="body")) == [("T1", "hello"), ("T2", "world")]
+    assert list(iter_records(io.StringIO("x\ny\n"), format="txt")) == [("0", "x"), ("1", "y")]
+
+
+def test_iter_records_missing_field():
+    """Rows without the text field are rejected"""
+    with pytest.raises(ValueError):
+        list(iter_records(io.StringIO('{"body": "x"}\n'), format="jsonl"))
+
+
+def test_classify_bulk_shards_in_order():
+    """Shards run concurrently but rows come back in input order"""
+    records = [(str(i), "x" * (i % 6)) for i in range(10)]
+    calls = []
+    with patch.object(classifier, "classify", side_effect=fake_classify(calls)):
+        rows = list(classifier.classify_bulk(iter(records), ["short", "long"], shard_size=3, max_workers=3))
+    assert [r["id"] for r in rows] == [str(i) for i in range(10)]
+    assert rows[5] == {"id": "5", "label": "long", "score": 0.9}
+    assert sorted(len(c) for c in calls) == [1, 3, 3, 3]
+
+
+def test_classify_bulk_unordered_returns_every_row():
+    """Unordered mode yields the same rows"""
+    records = [(str(i), "abcd") for i in range(7)]
+    with patch.object(classifier, "classify", side_effect=fake_classify()):
+        rows = list(classifier.classify_bulk(records, ["a"], shard_size=2, ordered=False))
+    assert sorted(r["id"] for r in rows) == sorted(str(i) for i in range(7))
+
+
+def test_classify_bulk_resumes_from_checkpoint(tmp_path):
+    """Shards completed before a crash are skipped on the next run"""
+    records = [(str(i), str(i)) for i in range(6)]
+    path = tmp_path / "progress.json"
+    seen = []
+    with patch.object(classifier, "classify", side_effect=fake_classify(fail_on="4")):
+        with pytest.raises(RuntimeError):
+            for row in classifier.classify_bulk(records, ["a"], shard_size=2, max_workers=1,
+                                                checkpoint=Checkpoint(path, {"shard_size": 2})):
+                seen.append(row["id"])
+    assert seen == ["0", "1", "2", "3"]
+
+    calls = []
+    with patch.object(classifier, "classify", side_effect=fake_classify(calls)):
+        rows = list(classifier.classify_bulk(records, ["a"], shard_size=2,
+                                             checkpoint=Checkpoint(path, {"shard_size": 2})))
+    assert calls == [["4", "5"]]
+    assert [r["id"] for r in rows] == ["4", "5"]
+
+
+def test_checkpoint_rejects_changed_settings(tmp_path):
+    """A checkpoint cannot be reused with a different shard layout"""
+    checkpoint = Checkpoint(tmp_path / "c.json", {"shard_size": 2})
+    checkpoint.mark(1)
+    assert 1 in checkpoint and 0 not in checkpoint
+    with pytest.raises(ValueError):
+        Checkpoint(tmp_path / "c.json", {"shard_size": 4})
+
+
+def test_classify_cli_from_file(tmp_path):
+    """classify --from-file writes one JSON row per record"""
+    source = tmp_path / "tickets.jsonl"
+    source.write_text("".join(json.dumps({"id": f"t{i}", "text": "x" * i}) + "\n" for i in range(5)))
+    output = tmp_path / "out.jsonl"
+    with patch.object(classifier, "classify", side_effect=fake_classify()):
+        result = CliRunner().invoke(cli, ["classify", "--labels", "short,long", "--from-file", str(source),
+                                          "--shard-size", "2", "--checkpoint", str(tmp_path / "c.json"),
+                                          "-o", str(output)])
+    assert result.exit_code == 0, result.output
+    rows = [json.loads(line) for line in output.read_text().splitlines()]
+    assert [(r["id"], r["label"]) for r in rows] == [("t0", "short"), ("t1", "short"), ("t2", "short"),
+                                                      ("t3", "short"), ("t4", "long")]
+
+
+def test_classify_cli_checkpoint_tied_to_input(tmp_path):
+    """Resuming a checkpoint with another input file or field mapping is refused"""
+    first, second = tmp_path / "a.jsonl", tmp_path / "b.jsonl"
+    for source in (first, second):
+        source.write_text("".join(json.dumps({"id": f"t{i}", "text": "x" * i}) + "\n" for i in range(5)))
+    args = ["classify", "--labels", "short,long", "--shard-size", "2", "--checkpoint", str(tmp_path / "c.json"),
+            "-o", str(tmp_path / "out.jsonl")]
+    with patch.object(classifier, "classify", side_effect=fake_classify()):
+        assert CliRunner().invoke(cli, args + ["--from-file", str(first)]).exit_code == 0
+        assert CliRunner().invoke(cli, args + ["--from-file", str(second)]).exit_code != 0
+        assert CliRunner().invoke(cli, args + ["--from-file", str(first), "--text-field", "body"]).exit_code != 0
+
+
+def test_classify_cli_rejects_image_from_file(tmp_path):
+    """--from-file classifies text records only"""
+    source = tmp_path / "in.txt"
+    source.write_text("a.png\n")
+    result = CliRunner().invoke(cli, ["classify", "--labels", "cat,dog", "--image", "--from-file", str(source)])
+    assert result.exit_code == 2
+    assert "--image" in result.output
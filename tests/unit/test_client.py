@@ -0,0 +1,123 @@
+import pytest
+import threading
+from unittest.mock import patch, MagicMock
+from llm_jina import client as client_module
+from llm_jina.client import JinaClient, get_client, set_client, close_clients
+from llm_jina.exceptions import JinaAPIError
+
+
+@pytest.fixture(autouse=True)
+def clean_registry():
+    """Ensure every test starts and ends with an empty client registry"""
+    close_clients()
+    yield
+    close_clients()
+
+
+def test_get_client_is_shared():
+    """Repeated lookups return the same pooled client"""
+    assert get_client() is get_client()
+
+
+def test_get_client_thread_safe():
+    """Concurrent first use still creates exactly one client"""
+    seen = []
+    barrier = threading.Barrier(8)
+
+    def worker():
+        barrier.wait()
+        seen.append(get_client())
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len({id(c) for c in seen}) == 1
+
+
+def test_get_client_per_api_key():
+    """Different API keys get different clients"""
+    assert get_client("key-a") is not get_client("key-b")
+
+
+def test_get_client_missing_key():
+    """A missing API key raises JinaAPIError"""
+    with patch.dict("os.environ", {}, clear=True):
+        with pytest.raises(JinaAPIError):
+            get_client()
+
+
+def test_set_client_injects_and_returns_previous():
+    """An injected client is returned by get_client"""
+    original = get_client()
+    injected = JinaClient()
+    assert set_client(injected) is original
+    assert get_client() is injected
+
+
+def test_close_clients_closes_sessions():
+    """close_clients closes pooled sessions and empties the registry"""
+    shared = get_client()
+    with patch.object(shared.session, "close") as mock_close:
+        close_clients()
+        mock_close.assert_called_once_with()
+    assert get_client() is not shared
+
+
+def test_pool_sizes_per_host():
+    """Each Jina host gets an adapter with its configured pool size"""
+    c = JinaClient(pool_sizes={"r.jina.ai": 3})
+    assert c.session.get_adapter("https://r.jina.ai/")._pool_maxsize == 3
+    assert c.session.get_adapter("https://api.jina.ai/v1/embeddings")._pool_maxsize == \
+        client_module.DEFAULT_POOL_SIZES["api.jina.ai"]
+
+
+def test_endpoint_modules_use_shared_client():
+    """Endpoint modules go through the shared client"""
+    from llm_jina import rerank
+    injected = MagicMock(api_key="test-jina-api-key-for-testing")
+    injected.post.return_value = {"results": []}
+    set_client(injected)
+    assert rerank.rerank("q", ["a"]) == {"results": []}
+    injected.post.assert_called_once()
+
+
+def test_concurrent_identical_posts_share_one_call():
+    """Identical in-flight requests are coalesced; different ones are not"""
+    c = JinaClient()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def fetch(url, data, headers):
+        calls.append(data)
+        started.set()
+        release.wait(5)
+        return {"data": data}
+
+    results = []
+    with patch.object(c, "_fetch", side_effect=fetch):
+        threads = [threading.Thread(target=lambda: results.append(c.post("https://api.jina.ai/v1/rerank", {"q": 1})))
+                   for _ in range(5)]
+        threads[0].start()
+        started.wait(5)
+        for t in threads[1:]:
+            t.start()
+        other = threading.Thread(target=lambda: c.post("https://api.jina.ai/v1/rerank", {"q": 2}))
+        other.start()
+        release.set()
+        for t in threads + [other]:
+            t.join()
+    assert results == [{"data": {"q": 1}}] * 5
+    assert len({id(r) for r in results}) == 5
+    assert sorted(d["q"] for d in calls) == [1, 2]
+
+
+def test_uncoalesced_uncached_post_skips_request_key():
+    """Without coalescing or a cache policy, no request key is computed"""
+    c = JinaClient(coalesce=False)
+    with patch.object(c, "_fetch", return_value={"ok": True}), \
+            patch.object(client_module, "request_key") as request_key:
+        assert c.post("https://api.jina.ai/v1/embeddings", {"input": ["a"]}) == {"ok": True}
+    request_key.assert_not_called()
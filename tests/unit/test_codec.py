@@ -0,0 +1,162 @@
+import io
+import json
+import pytest
+import requests
+from unittest.mock import MagicMock, patch
+from llm_jina import codec
+from llm_jina import rerank as rerank_module
+from llm_jina.client import JinaClient
+from llm_jina.embeddings import JinaEmbeddings
+from llm_jina.exceptions import JinaAPIError
+from llm_jina.ratelimit import NO_RETRY
+
+
+def chunked(data, size):
+    """Splits bytes into fixed-size chunks, cutting through tokens and UTF-8 sequences"""
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+DOCUMENT = {
+    "model": "jina-embeddings-v3",
+    "data": [{"index": i, "embedding": [i * 0.5, -1e-3, 12345], "text": 'héllo "wörld" \\', "tags": [[], {}]}
+             for i in range(5)],
+    "usage": {"total_tokens": 42},
+}
+
+
+def test_dumps_is_compact_utf8():
+    """Request bodies are compact UTF-8 with or without orjson"""
+    expected = '{"a":[1,2],"b":"é"}'.encode("utf-8")
+    assert codec.dumps({"a": [1, 2], "b": "é"}) == expected
+    with patch.object(codec, "orjson", None):
+        assert codec.dumps({"a": [1, 2], "b": "é"}) == expected
+        assert codec.loads(expected) == {"a": [1, 2], "b": "é"}
+
+
+@pytest.mark.parametrize("size", [1, 3, 7, 64, 100000])
+def test_iter_items_across_chunk_boundaries(size):
+    """Items and envelope decode identically however the body is split"""
+    body = json.dumps(DOCUMENT, ensure_ascii=False).encode("utf-8")
+    envelope = {}
+    items = list(codec.iter_items(chunked(body, size), "data", envelope))
+    assert items == DOCUMENT["data"]
+    assert envelope == {"model": "jina-embeddings-v3", "usage": {"total_tokens": 42}}
+
+
+def test_iter_items_numbers_split_at_chunk_end():
+    """A number cut by a chunk boundary is not decoded early"""
+    items = list(codec.iter_items([b'{"results": [12', b'34, 5', b'6]}'], "results"))
+    assert items == [1234, 56]
+
+
+def test_iter_items_missing_or_non_array_key():
+    """Without the array there are no items and the field lands in the envelope"""
+    envelope = {}
+    assert list(codec.iter_items([b'{"data": {"content": "x"}}'], "data", envelope)) == []
+    assert envelope == {"data": {"content": "x"}}
+    assert list(codec.iter_items([b' { } '], "data")) == []
+    assert list(codec.iter_items([b'{"data": []}'], "data")) == []
+
+
+@pytest.mark.parametrize("body", [b'[1, 2]', b'{"data": [1, 2', b'{"data": [1 2]}', b'{"a" 1}', b''])
+def test_iter_items_malformed(body):
+    """Malformed or truncated documents raise ValueError"""
+    with pytest.raises(ValueError):
+        list(codec.iter_items([body], "data"))
+
+
+def test_iter_items_escapes_split_across_chunks():
+    """Escaped quotes and backslashes do not end a string, wherever the chunks split"""
+    body = b'{"data": ["a\\\\", "b\\"c", "\\\\\\""], "n": 1}'
+    expected = json.loads(body)["data"]
+    for size in range(1, 8):
+        assert list(codec.iter_items(chunked(body, size))) == expected
+
+
+def test_iter_items_large_item():
+    """An item spanning many chunks decodes in one piece"""
+    body = json.dumps({"data": [{"embedding": "x" * 300000, "vector": [0.5] * 20000}]}).encode()
+    item, = codec.iter_items(chunked(body, 4096))
+    assert len(item["embedding"]) == 300000 and len(item["vector"]) == 20000
+
+
+def streamed_response(body, length=None):
+    response = requests.Response()
+    response.status_code = 200
+    response.raw = io.BytesIO(body)
+    if length is not None:
+        response.headers["Content-Length"] = str(length)
+    response.request = requests.Request("POST", "https://api.jina.ai/v1/embeddings", data=b"{}").prepare()
+    return response
+
+
+def test_post_iter_streams_items_and_envelope():
+    """post_iter yields decoded items and fills the envelope from a streamed body"""
+    client = JinaClient(retry=NO_RETRY)
+    body = json.dumps(DOCUMENT).encode()
+    with patch.object(client.session, "post", return_value=streamed_response(body)) as post:
+        envelope = {}
+        items = list(client.post_iter("https://api.jina.ai/v1/embeddings", {"model": "m"}, envelope=envelope))
+    assert items == DOCUMENT["data"]
+    assert envelope["usage"] == {"total_tokens": 42}
+    assert post.call_args.kwargs["stream"] is True
+
+
+def test_post_iter_decodes_small_bodies_whole():
+    """Bodies under STREAM_MIN_BYTES are decoded in one step, with the same results"""
+    client = JinaClient(retry=NO_RETRY)
+    body = json.dumps(DOCUMENT).encode()
+    with patch.object(client.session, "post", return_value=streamed_response(body, len(body))), \
+            patch.object(codec, "iter_items") as iter_items:
+        envelope = {}
+        items = list(client.post_iter("https://api.jina.ai/v1/embeddings", {"model": "m"}, envelope=envelope))
+    assert items == DOCUMENT["data"]
+    assert envelope == {"model": "jina-embeddings-v3", "usage": {"total_tokens": 42}}
+    iter_items.assert_not_called()
+
+
+def test_post_iter_invalid_json():
+    """A malformed streamed body raises JinaAPIError"""
+    client = JinaClient(retry=NO_RETRY)
+    for length in (None, 12):
+        with patch.object(client.session, "post", return_value=streamed_response(b'{"data": [1,', length)):
+            with pytest.raises(JinaAPIError):
+                list(client.post_iter("https://api.jina.ai/v1/embeddings", {"model": "m"}))
+
+
+def test_large_embedding_batches_are_streamed():
+    """Batches of STREAM_MIN_ITEMS or more are decoded through post_iter, in input order"""
+    client = MagicMock()
+    count = codec.STREAM_MIN_ITEMS
+
+    def post_iter(url, data):
+        return ({"index": i, "embedding": [float(i)]} for i in reversed(range(len(data["input"]))))
+
+    client.post_iter.side_effect = post_iter
+    model = JinaEmbeddings("jina-embeddings-v3", client=client, embedding_type="float", max_batch_items=count)
+    texts = [f"text {i}" for i in range(count)]
+    assert model.embed_batch(texts) == [[float(i)] for i in range(count)]
+    client.post.assert_not_called()
+
+
+def test_large_embedding_batch_missing_rows():
+    """A streamed response missing rows is rejected"""
+    client = MagicMock()
+    client.post_iter.return_value = iter([{"index": 0, "embedding": [1.0]}])
+    model = JinaEmbeddings("jina-embeddings-v3", client=client, embedding_type="float")
+    with pytest.raises(ValueError):
+        model.embed_batch([f"text {i}" for i in range(codec.STREAM_MIN_ITEMS)])
+
+
+def test_large_rerank_is_streamed():
+    """Reranking many documents decodes results incrementally into the usual shape"""
+    client = MagicMock()
+
+    def post_iter(url, data, key, envelope):
+        envelope["usage"] = {"total_tokens": 7}
+        return iter([{"index": 1, "relevance_score": 0.9}])
+
+    client.post_iter.side_effect = post_iter
+    with patch.object(rerank_module, "get_client", return_value=client):
+        result = rerank_module.rerank("q", ["doc"] * codec.STREAM_MIN_ITEMS, top_n=1)
+    assert result == {"usage": {"total_tokens": 7}, "results": [{"index": 1, "relevance_score": 0.9}]}
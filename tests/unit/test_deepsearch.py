@@ -0,0 +1,95 @@
+import asyncio
+import io
+import json
+import pytest
+import httpx
+import requests
+from unittest.mock import MagicMock
+from click.testing import CliRunner
+from llm_jina import deepsearch
+from llm_jina.async_client import AsyncJinaClient, set_async_client, close_async_clients
+from llm_jina.client import JinaClient, set_client, close_clients
+from llm_jina.commands import cli
+from llm_jina.sse import iter_sse_data
+
+
+def sse(*chunks):
+    """Render chunks as SSE lines, ending with [DONE]"""
+    lines = []
+    for chunk in chunks:
+        lines.extend([f"data: {json.dumps(chunk)}", ""])
+    lines.extend(["data: [DONE]", ""])
+    return lines
+
+
+CHUNKS = [
+    {"choices": [{"delta": {"type": "think", "content": "Looking"}}]},
+    {"choices": [{"delta": {"type": "text", "content": "Answer "}}]},
+    {"choices": [{"delta": {"type": "text", "content": "done."}}],
+     "visitedURLs": ["https://a.example"], "usage": {"total_tokens": 5}},
+]
+
+
+@pytest.fixture
+def stream_client():
+    """Install a shared client whose post_stream replays CHUNKS"""
+    client = MagicMock(api_key="test-jina-api-key-for-testing")
+    client.post_stream.return_value = iter(sse(*CHUNKS))
+    set_client(client)
+    yield client
+    close_clients()
+
+
+def test_iter_sse_data_multiline_and_comments():
+    """Multi-line data is joined and comments are skipped"""
+    lines = [": keep-alive", "data: a", "data: b", "", "event: x", "data: c", "", "data: [DONE]", "", "data: z", ""]
+    assert list(iter_sse_data(lines)) == ["a\nb", "c"]
+
+
+def test_stream_deepsearch_events(stream_client):
+    """Deltas, URLs and usage are yielded as typed events"""
+    events = list(deepsearch.stream_deepsearch("why?"))
+    assert [e["type"] for e in events] == ["reasoning", "answer", "answer", "urls", "usage"]
+    assert events[3]["urls"] == ["https://a.example"]
+    data = stream_client.post_stream.call_args.kwargs["data"]
+    assert data["stream"] is True
+    assert data["messages"][-1] == {"role": "user", "content": "why?"}
+
+
+def test_deepsearch_cli_stream(stream_client):
+    """--stream prints the answer to stdout as it arrives"""
+    result = CliRunner().invoke(cli, ["deepsearch", "--stream", "why?"])
+    assert result.exit_code == 0
+    assert "Answer done." in result.output
+
+
+def test_client_post_stream_yields_lines():
+    """JinaClient.post_stream iterates the response body line by line"""
+    response = requests.Response()
+    response.status_code = 200
+    response.raw = io.BytesIO(b"data: 1\n\ndata: 2\n\n")
+    client = JinaClient()
+    client.session.post = MagicMock(return_value=response)
+    lines = [line for line in client.post_stream("https://deepsearch.jina.ai/x", {}) if line]
+    assert lines == ["data: 1", "data: 2"]
+    assert client.session.post.call_args.kwargs["stream"] is True
+
+
+def test_astream_deepsearch():
+    """The async generator yields the same events"""
+    body = "\n".join(sse(*CHUNKS)).encode()
+
+    def handler(request):
+        return httpx.Response(200, content=body, headers={"Content-Type": "text/event-stream"})
+
+    async def main():
+        client = AsyncJinaClient()
+        client.http = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        set_async_client(client)
+        try:
+            return [e async for e in deepsearch.astream_deepsearch("why?")]
+        finally:
+            await close_async_clients()
+
+    events = asyncio.run(main())
+    assert "".join(e["content"] for e in events if e["type"] == "answer") == "Answer done."
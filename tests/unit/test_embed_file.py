@@ -0,0 +1,122 @@
+import json
+import pytest
+from unittest.mock import MagicMock, patch
+from click.testing import CliRunner
+from llm_jina.commands import cli
+from llm_jina.embed_file import checkpoint_path, embed_file, ids_path
+from llm_jina.embeddings import JinaEmbeddings
+from llm_jina.exceptions import JinaAPIError
+
+np = pytest.importorskip("numpy")
+
+
+def vector(text):
+    """A deterministic 4-dimensional embedding per text"""
+    number = float(text.split()[-1])
+    return [number, 1.0, -number, 0.5]
+
+
+def fake_model(fail_after=None):
+    """A JinaEmbeddings whose client embeds locally, optionally failing after some requests"""
+    client = MagicMock()
+    calls = []
+
+    def post(url, data):
+        if fail_after is not None and len(calls) >= fail_after:
+            raise JinaAPIError("Service unavailable", status_code=503)
+        calls.append(data["input"])
+        return {"data": [{"index": i, "embedding": vector(text)} for i, text in enumerate(data["input"])]}
+
+    client.post.side_effect = post
+    model = JinaEmbeddings("jina-embeddings-v3", client=client, embedding_type="float", parallelism=1)
+    return model, calls
+
+
+def write_jsonl(path, count):
+    path.write_text("".join(json.dumps({"id": f"doc-{i}", "text": f"text {i}"}) + "\n" for i in range(count)))
+
+
+def test_embed_file_writes_npy_and_ids(tmp_path):
+    """Rows land in input order in a .npy that numpy maps without loading"""
+    write_jsonl(tmp_path / "in.jsonl", 10)
+    model, calls = fake_model()
+    shape, embedded = embed_file(tmp_path / "in.jsonl", tmp_path / "out.npy", model, batch_size=4)
+    assert shape == (10, 4) and embedded == 10
+    assert len(calls) == 3
+    matrix = np.load(tmp_path / "out.npy", mmap_mode="r")
+    assert isinstance(matrix, np.memmap) and matrix.dtype == np.float32
+    assert matrix[7].tolist() == vector("text 7")
+    ids = [json.loads(line) for line in ids_path(tmp_path / "out.npy").read_text().splitlines()]
+    assert ids == [f"doc-{i}" for i in range(10)]
+    assert not checkpoint_path(tmp_path / "out.npy").exists()
+
+
+def test_embed_file_resumes_after_last_batch(tmp_path):
+    """An interrupted run picks up after the last checkpointed batch"""
+    write_jsonl(tmp_path / "in.jsonl", 10)
+    output = tmp_path / "out.npy"
+    model, calls = fake_model(fail_after=2)
+    with pytest.raises(JinaAPIError):
+        embed_file(tmp_path / "in.jsonl", output, model, batch_size=4)
+    assert checkpoint_path(output).exists()
+    # Simulate a crash after ids were written but before the checkpoint was updated.
+    with open(ids_path(output), "a") as f:
+        f.write('"stale"\n')
+
+    model, calls = fake_model()
+    shape, embedded = embed_file(tmp_path / "in.jsonl", output, model, batch_size=4)
+    assert embedded == 2
+    assert calls == [["text 8", "text 9"]]
+    matrix = np.load(output)
+    assert matrix.tolist() == [vector(f"text {i}") for i in range(10)]
+    ids = [json.loads(line) for line in ids_path(output).read_text().splitlines()]
+    assert ids == [f"doc-{i}" for i in range(10)]
+
+
+def test_embed_file_refuses_changed_settings(tmp_path):
+    """Resuming with another batch size would misalign rows"""
+    write_jsonl(tmp_path / "in.jsonl", 10)
+    model, _ = fake_model(fail_after=1)
+    with pytest.raises(JinaAPIError):
+        embed_file(tmp_path / "in.jsonl", tmp_path / "out.npy", model, batch_size=4)
+    with pytest.raises(ValueError):
+        embed_file(tmp_path / "in.jsonl", tmp_path / "out.npy", fake_model()[0], batch_size=5)
+
+
+def test_embed_file_int8_and_text_input(tmp_path):
+    """int8 output stores normalised vectors scaled to [-127, 127]; text lines are numbered"""
+    (tmp_path / "in.txt").write_text("text 3\n\ntext 0\n")
+    model, _ = fake_model()
+    embed_file(tmp_path / "in.txt", tmp_path / "out.npy", model, dtype="int8")
+    matrix = np.load(tmp_path / "out.npy")
+    assert matrix.dtype == np.int8
+    expected = np.asarray(vector("text 3"), dtype=np.float32)
+    assert matrix[0].tolist() == np.rint(expected / np.linalg.norm(expected) * 127).tolist()
+    assert ids_path(tmp_path / "out.npy").read_text().splitlines() == ['"0"', '"1"']
+
+
+def test_embed_file_empty_input(tmp_path):
+    (tmp_path / "in.txt").write_text("\n")
+    with pytest.raises(ValueError):
+        embed_file(tmp_path / "in.txt", tmp_path / "out.npy", fake_model()[0])
+
+
+def test_embed_file_command(tmp_path):
+    """llm jina embed-file resolves the model and reports the matrix"""
+    (tmp_path / "in.csv").write_text("id,text\na,text 1\nb,text 2\n")
+    model, _ = fake_model()
+    with patch("llm.get_embedding_model", return_value=model):
+        result = CliRunner().invoke(
+            cli, ["embed-file", str(tmp_path / "in.csv"), str(tmp_path / "out.npy"), "--batch-size", "1"])
+    assert result.exit_code == 0, result.output
+    assert "2 x 4 float32" in result.output
+    assert np.load(tmp_path / "out.npy").shape == (2, 4)
+    assert ids_path(tmp_path / "out.npy").read_text() == '"a"\n"b"\n'
+
+
+def test_embed_file_command_rejects_other_models(tmp_path):
+    (tmp_path / "in.txt").write_text("text 1\n")
+    with patch("llm.get_embedding_model", return_value=object()):
+        result = CliRunner().invoke(cli, ["embed-file", str(tmp_path / "in.txt"), str(tmp_path / "out.npy")])
+    assert result.exit_code != 0
+    assert "not a Jina embedding model" in result.output
@@ -0,0 +1,169 @@
+import pytest
+import threading
+from unittest.mock import MagicMock
+from llm_jina.batching import plan_batches, estimate_tokens
+from llm_jina.embeddings import JinaEmbeddings
+
+
+class FakeClient:
+    """Client double that embeds each text as [len(text)] and reverses data order"""
+
+    def __init__(self):
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def post(self, url, data, headers=None):
+        with self.lock:
+            self.calls.append(list(data["input"]))
+        items = [{"index": i, "embedding": [float(len(t))]} for i, t in enumerate(data["input"])]
+        return {"data": list(reversed(items))}
+
+
+def test_plan_batches_item_limit():
+    """Batches never exceed max_items"""
+    assert plan_batches(["a"] * 5, max_items=2, max_tokens=1000) == [[0, 1], [2, 3], [4]]
+
+
+def test_plan_batches_token_limit():
+    """Batches are closed before exceeding max_tokens"""
+    texts = ["x" * 40, "x" * 40, "x" * 40]
+    per_item = estimate_tokens(texts[0])
+    assert plan_batches(texts, max_items=10, max_tokens=per_item * 2) == [[0, 1], [2]]
+
+
+def test_plan_batches_oversized_item_alone():
+    """An item larger than max_tokens gets its own batch"""
+    texts = ["a", "x" * 400, "b"]
+    assert plan_batches(texts, max_items=10, max_tokens=20) == [[0], [1], [2]]
+
+
+def test_embed_batch_splits_and_preserves_order():
+    """Sub-batches are dispatched separately and reassembled in input order"""
+    client = FakeClient()
+    model = JinaEmbeddings("jina-embeddings-v3", client=client, max_batch_items=2, parallelism=3)
+    texts = ["a", "bb", "ccc", "dddd", "eeeee"]
+    assert model.embed_batch(texts) == [[1.0], [2.0], [3.0], [4.0], [5.0]]
+    assert sorted(client.calls) == [["a", "bb"], ["ccc", "dddd"], ["eeeee"]]
+
+
+def test_embed_batch_accepts_iterators():
+    """llm may pass a generator of items"""
+    model = JinaEmbeddings("jina-embeddings-v3", client=FakeClient())
+    assert model.embed_batch(t for t in ["a", "bb"]) == [[1.0], [2.0]]
+
+
+def test_embed_batch_empty():
+    """An empty batch makes no request"""
+    client = MagicMock()
+    assert JinaEmbeddings("jina-embeddings-v3", client=client).embed_batch([]) == []
+    client.post.assert_not_called()
+
+
+def test_embed_batch_invalid_response():
+    """A response without data raises ValueError"""
+    client = MagicMock()
+    client.post.return_value = {"detail": "nope"}
+    with pytest.raises(ValueError):
+        JinaEmbeddings("jina-embeddings-v3", client=client).embed_batch(["a"])
+
+
+def b64(values):
+    """Encode floats the way the API does for embedding_type=base64"""
+    import array
+    import base64
+    return base64.b64encode(array.array("f", values).tobytes()).decode("ascii")
+
+
+def test_base64_transport_requested_and_decoded():
+    """embed_batch asks for base64 and decodes it to floats"""
+    client = MagicMock()
+    client.post.return_value = {"data": [{"index": 0, "embedding": b64([0.5, -1.0])}]}
+    model = JinaEmbeddings("jina-embeddings-v3", client=client)
+    assert model.embed_batch(["a"]) == [[0.5, -1.0]]
+    assert client.post.call_args.kwargs["data"]["embedding_type"] == "base64"
+
+
+def test_float_transport_omits_embedding_type():
+    """The float transport sends the original request shape"""
+    client = MagicMock()
+    client.post.return_value = {"data": [{"index": 0, "embedding": [0.25]}]}
+    model = JinaEmbeddings("jina-embeddings-v3", client=client, embedding_type="float")
+    assert model.embed_batch(["a"]) == [[0.25]]
+    assert "embedding_type" not in client.post.call_args.kwargs["data"]
+
+
+def test_binary_transport_unpacks_bits():
+    """Packed binary embeddings expand to +1/-1 vectors"""
+    client = MagicMock()
+    client.post.return_value = {"data": [{"index": 0, "embedding": [-96]}]}  # 0b10100000
+    model = JinaEmbeddings("jina-embeddings-v3", client=client, embedding_type="binary")
+    assert model.embed_batch(["a"]) == [[1.0, -1.0, 1.0, -1.0, -1.0, -1.0, -1.0, -1.0]]
+
+
+def test_invalid_embedding_type():
+    """Unknown embedding types are rejected up front"""
+    with pytest.raises(ValueError):
+        JinaEmbeddings("jina-embeddings-v3", embedding_type="int4")
+
+
+def test_embed_array_is_contiguous():
+    """embed_array returns one flat row-major float32 buffer"""
+    model = JinaEmbeddings("jina-embeddings-v3", client=FakeClient())
+    flat = model.embed_array(["a", "bb", "ccc"])
+    assert flat.typecode == "f"
+    assert flat.tolist() == [1.0, 2.0, 3.0]
+
+
+def test_embed_matrix_shape():
+    """embed_matrix wraps the buffer as an (n, d) matrix"""
+    np = pytest.importorskip("numpy")
+    client = MagicMock()
+    client.post.return_value = {"data": [
+        {"index": 0, "embedding": b64([1.0, 2.0])},
+        {"index": 1, "embedding": b64([3.0, 4.0])},
+    ]}
+    matrix = JinaEmbeddings("jina-embeddings-v3", client=client).embed_matrix(["a", "b"])
+    assert matrix.dtype == np.float32
+    assert matrix.shape == (2, 2)
+    assert matrix[1].tolist() == [3.0, 4.0]
+
+
+def registered_models():
+    """Collect the models passed to the register callback"""
+    from llm_jina.embeddings import register_embedding_models
+    models = {}
+
+    def register(model, aliases=()):
+        models[model.model_id] = (model, aliases)
+
+    register_embedding_models(register)
+    return models
+
+
+def test_reduced_dimension_models_registered():
+    """Matryoshka variants send the base model with reduced dimensions"""
+    model, aliases = registered_models()["jina-embeddings-v3-256"]
+    assert aliases == ("jina-v3-256",)
+    client = MagicMock()
+    client.post.return_value = {"data": [{"index": 0, "embedding": b64([1.0] * 256)}]}
+    model._client = client
+    assert len(model.embed_batch(["a"])[0]) == 256
+    data = client.post.call_args.kwargs["data"]
+    assert data["model"] == "jina-embeddings-v3"
+    assert data["dimensions"] == 256
+
+
+def test_binary_model_registered():
+    """Binary variants request bit-packed vectors from the base model"""
+    model, aliases = registered_models()["jina-embeddings-v3-binary"]
+    assert aliases == ("jina-v3-binary",)
+    assert model.model_name == "jina-embeddings-v3"
+    assert model.embedding_type == "ubinary"
+
+
+def test_embed_batch_sends_duplicates_once():
+    """Duplicate texts are embedded once and fanned back out"""
+    client = FakeClient()
+    model = JinaEmbeddings("jina-embeddings-v3", client=client)
+    assert model.embed_batch(["a", "bb", "a", "a", "bb"]) == [[1.0], [2.0], [1.0], [1.0], [2.0]]
+    assert client.calls == [["a", "bb"]]
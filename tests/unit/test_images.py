@@ -0,0 +1,103 @@
+import base64
+import pytest
+from unittest.mock import MagicMock, patch
+from llm_jina import classifier, images
+from llm_jina.embeddings import JinaEmbeddings
+
+
+def write_images(tmp_path, count):
+    paths = []
+    for i in range(count):
+        path = tmp_path / f"{i}.bin"
+        path.write_bytes(bytes([i]) * 10)
+        paths.append(str(path))
+    return paths
+
+
+def test_encode_image_sources(tmp_path):
+    """Files and bytes are base64-encoded; URLs pass through"""
+    path = write_images(tmp_path, 1)[0]
+    assert base64.b64decode(images.encode_image(path)) == bytes([0]) * 10
+    assert images.encode_image(b"abc") == "YWJj"
+    assert images.encode_image("https://example.com/cat.jpg") == "https://example.com/cat.jpg"
+
+
+@pytest.mark.parametrize("max_workers", [1, 3])
+def test_iter_encoded_batches_in_order(tmp_path, max_workers):
+    """Images come back in input order, in batches of batch_size"""
+    paths = write_images(tmp_path, 7)
+    batches = list(images.iter_encoded(paths, batch_size=3, max_workers=max_workers))
+    assert [len(b) for b in batches] == [3, 3, 1]
+    decoded = [base64.b64decode(item)[0] for batch in batches for item in batch]
+    assert decoded == list(range(7))
+
+
+def test_downsize_to_max_size():
+    """Large images are scaled down and re-encoded smaller"""
+    Image = pytest.importorskip("PIL.Image")
+    import io
+    buffer = io.BytesIO()
+    Image.effect_noise((1024, 768), 64).convert("RGB").save(buffer, format="PNG")
+    small = images.downsize(buffer.getvalue(), 256)
+    assert len(small) < len(buffer.getvalue())
+    assert max(Image.open(io.BytesIO(small)).size) == 256
+
+
+def test_classify_images_offsets_indices(tmp_path):
+    """Per-batch results are merged with global indices"""
+    def fake_classify(inputs, labels, model=None):
+        assert model == "jina-clip-v2"
+        assert all("image" in item for item in inputs)
+        return {"usage": {"total_tokens": len(inputs)},
+                "data": [{"index": i, "prediction": "cat"} for i in range(len(inputs))]}
+
+    with patch.object(classifier, "classify", side_effect=fake_classify):
+        result = classifier.classify_images(write_images(tmp_path, 5), ["cat"], batch_size=2, max_workers=1)
+    assert [item["index"] for item in result["data"]] == [0, 1, 2, 3, 4]
+    assert result["usage"]["total_tokens"] == 5
+
+
+def test_clip_embeddings_accept_binary():
+    """CLIP models send binary items as images and text as text objects"""
+    client = MagicMock()
+    client.post.return_value = {"data": [{"index": 0, "embedding": [0.5]}, {"index": 1, "embedding": [0.25]}]}
+    model = JinaEmbeddings("jina-clip-v1", client=client, embedding_type="float", image_size=224)
+    assert model.supports_binary
+    assert model.embed_batch([b"abc", "a cat"]) == [[0.5], [0.25]]
+    assert client.post.call_args.kwargs["data"]["input"] == [{"image": "YWJj"}, {"text": "a cat"}]
+    assert not JinaEmbeddings("jina-embeddings-v3").supports_binary
+
+
+def test_clip_embeddings_encode_per_sub_batch():
+    """Images are encoded per planned sub-batch, all on one shared pool"""
+    client = MagicMock()
+    client.post.side_effect = lambda url, data: {
+        "data": [{"index": i, "embedding": [1.0]} for i in range(len(data["input"]))]}
+    model = JinaEmbeddings("jina-clip-v1", client=client, embedding_type="float", image_size=224,
+                           max_batch_items=2, parallelism=1)
+    calls = []
+
+    def fake_iter_encoded(sources, max_size=None, batch_size=32, max_workers=None, executor=None):
+        calls.append((len(sources), batch_size, executor))
+        yield ["x"] * len(sources)
+
+    with patch.object(images, "iter_encoded", side_effect=fake_iter_encoded):
+        model.embed_batch([bytes([i]) for i in range(5)])
+    assert [(count, size) for count, size, _ in calls] == [(2, 2), (2, 2), (1, 1)]
+    assert len({id(executor) for _, _, executor in calls}) == 1
+    assert calls[0][2] is images.shared_executor()
+
+
+def test_iter_encoded_warns_without_pillow(tmp_path):
+    """Asking for downsizing without Pillow warns instead of silently sending originals"""
+    paths = write_images(tmp_path, 2)
+    with patch.dict("sys.modules", {"PIL": None, "PIL.Image": None}), \
+            patch.object(images, "_warned_no_pillow", False):
+        with pytest.warns(UserWarning, match="Pillow"):
+            batches = list(images.iter_encoded(paths, max_size=64, max_workers=1))
+    assert sum(len(batch) for batch in batches) == 2
+
+
+def test_process_pools_do_not_fork():
+    """Workers are never forked from a process that may be running request threads"""
+    assert images.shared_executor()._mp_context.get_start_method() != "fork"
@@ -0,0 +1,100 @@
+import json
+import sqlite3
+import pytest
+from unittest.mock import MagicMock, patch
+from click.testing import CliRunner
+from llm_jina.commands import cli
+from llm_jina.index import VectorIndex, build_index
+
+np = pytest.importorskip("numpy")
+
+
+def make_db(path, vectors, collection="docs", model="jina-embeddings-v3"):
+    """Write a minimal llm embeddings database"""
+    conn = sqlite3.connect(str(path))
+    conn.execute("create table if not exists collections (id integer primary key, name text, model text)")
+    conn.execute("create table if not exists embeddings (collection_id integer, id text, embedding blob)")
+    conn.execute("insert or ignore into collections (id, name, model) values (1, ?, ?)", [collection, model])
+    for row_id, vector in vectors.items():
+        conn.execute("insert into embeddings values (1, ?, ?)",
+                     [row_id, np.asarray(vector, dtype="<f4").tobytes()])
+    conn.commit()
+    conn.close()
+
+
+VECTORS = {"a": [1.0, 0.0, 0.0], "b": [0.0, 2.0, 0.0], "c": [0.7, 0.7, 0.0], "d": [0.0, 0.0, 3.0]}
+
+
+def test_build_and_query(tmp_path):
+    """Rows are normalised and ranked by cosine similarity"""
+    make_db(tmp_path / "e.db", VECTORS)
+    index, added = build_index("docs", tmp_path / "idx", database=tmp_path / "e.db")
+    assert added == 4
+    assert index.meta["model"] == "jina-embeddings-v3"
+    results = VectorIndex(tmp_path / "idx").query([1.0, 0.1, 0.0], n=2)
+    assert [row_id for row_id, _ in results] == ["a", "c"]
+    assert results[0][1] == pytest.approx(0.995, abs=1e-3)
+
+
+def test_threaded_chunks_match_single_scan(tmp_path):
+    """Chunked multi-threaded scans return the same top-k"""
+    rng = np.random.default_rng(0)
+    index = VectorIndex.create(tmp_path / "idx", 8)
+    index.append([str(i) for i in range(500)], rng.normal(size=(500, 8)))
+    q = rng.normal(size=8)
+    single = index.query(q, n=5)
+    threaded = index.query(q, n=5, threads=4, chunk_rows=37)
+    assert [row_id for row_id, _ in threaded] == [row_id for row_id, _ in single]
+    assert [score for _, score in threaded] == pytest.approx([score for _, score in single])
+
+
+def test_int8_index(tmp_path):
+    """int8 indexes are a quarter of the size and rank the same way"""
+    make_db(tmp_path / "e.db", VECTORS)
+    index, _ = build_index("docs", tmp_path / "idx", dtype="int8", database=tmp_path / "e.db")
+    assert (tmp_path / "idx" / "vectors.bin").stat().st_size == 4 * 3
+    assert [row_id for row_id, _ in index.query([0.0, 0.0, 1.0], n=1)] == ["d"]
+
+
+def test_append_only_adds_new_ids(tmp_path):
+    """--append skips ids already in the index"""
+    make_db(tmp_path / "e.db", {"a": VECTORS["a"]})
+    build_index("docs", tmp_path / "idx", database=tmp_path / "e.db")
+    make_db(tmp_path / "e.db", {"b": VECTORS["b"]})
+    index, added = build_index("docs", tmp_path / "idx", append=True, database=tmp_path / "e.db")
+    assert added == 1
+    assert index.ids() == ["a", "b"]
+    assert index.ids_at([1, 0]) == ["b", "a"]
+
+
+def test_index_cli(tmp_path):
+    """index build exports a collection and index query embeds the text"""
+    make_db(tmp_path / "e.db", VECTORS)
+    runner = CliRunner()
+    result = runner.invoke(cli, ["index", "build", "docs", str(tmp_path / "idx"), "-d", str(tmp_path / "e.db")])
+    assert result.exit_code == 0, result.output
+    model = MagicMock()
+    model.embed.return_value = [0.0, 1.0, 0.0]
+    with patch("llm.get_embedding_model", return_value=model):
+        result = runner.invoke(cli, ["index", "query", str(tmp_path / "idx"), "hello", "-n", "1"])
+    assert result.exit_code == 0, result.output
+    assert json.loads(result.output.strip().splitlines()[-1])["id"] == "b"
+    model.embed.assert_called_once_with("hello")
+
+
+def test_index_cli_unknown_collection(tmp_path):
+    """A missing collection is reported as a usage error"""
+    make_db(tmp_path / "e.db", VECTORS)
+    result = CliRunner().invoke(cli, ["index", "build", "nope", str(tmp_path / "idx"), "-d", str(tmp_path / "e.db")])
+    assert result.exit_code == 1
+    assert "not found" in result.output
+
+
+def test_index_cli_missing_or_empty_database(tmp_path):
+    """A database without collections is reported, and a missing one is not created"""
+    sqlite3.connect(str(tmp_path / "empty.db")).close()
+    for name in ("missing.db", "empty.db"):
+        result = CliRunner().invoke(cli, ["index", "build", "docs", str(tmp_path / "idx"), "-d", str(tmp_path / name)])
+        assert result.exit_code == 1
+        assert "not found" in result.output
+    assert not (tmp_path / "missing.db").exists()
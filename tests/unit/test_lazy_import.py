@@ -0,0 +1,26 @@
+import subprocess
+import sys
+import click
+from click.testing import CliRunner
+import llm_jina
+
+
+def test_plugin_load_does_not_import_http_stacks():
+    """Loading the plugin and registering models leaves requests and httpx unimported"""
+    code = (
+        "import sys, click, llm_jina\n"
+        "llm_jina.register_commands(click.Group())\n"
+        "llm_jina.register_embedding_models(lambda model, aliases=(): None)\n"
+        "print(' '.join(m for m in ('requests', 'httpx', 'llm_jina.commands') if m in sys.modules))\n"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.split() == []
+
+
+def test_lazy_command_runs_real_group():
+    """The registered stand-in dispatches to the real jina commands"""
+    root = click.Group()
+    llm_jina.register_commands(root)
+    result = CliRunner().invoke(root, ["jina", "rerank", "--help"])
+    assert result.exit_code == 0
+    assert "Rerank documents by relevance" in result.output
@@ -1,19 +1,29 @@
 import pytest
 import httpx
+import json
 import time
-from unittest.mock import patch, mock_open
-import os
-import builtins
+from unittest.mock import patch
+from llm_jina import metaprompt
 from llm_jina.metaprompt import jina_metaprompt, fetch_metaprompt
+from llm_jina.utils import user_dir
 import click
 
 
+@pytest.fixture(autouse=True)
+def reset_memo():
+    """Each test starts without an in-process copy"""
+    metaprompt._memo = None
+    yield
+    metaprompt._memo = None
+
+
 @pytest.fixture
 def mock_response():
     """Mock httpx response with test metaprompt content"""
     class MockResponse:
-        def __init__(self, status_code=200):
+        def __init__(self, status_code=200, headers=None):
             self.status_code = status_code
+            self.headers = headers or {"ETag": '"v1"'}
             self.text = "# Jina Metaprompt Test\nThis is test content for the metaprompt."
         
         def raise_for_status(self):
@@ -23,6 +33,11 @@ def mock_response():
     return MockResponse()
 
 
+def write_cache(content, checked_at, **validators):
+    (user_dir() / metaprompt.CACHE_FILE).write_text(content)
+    (user_dir() / metaprompt.META_FILE).write_text(json.dumps(dict(validators, checked_at=checked_at)))
+
+
 def test_fetch_metaprompt_success(mock_response):
     """Test successful fetching of the metaprompt"""
     with patch('httpx.Client') as mock_client:
@@ -41,38 +56,60 @@ def test_fetch_metaprompt_failure():
 
 
 def test_jina_metaprompt_from_cache():
-    """Test retrieving metaprompt from cache"""
+    """A fresh cache in the user directory is served without a request"""
     cache_content = "# Cached Metaprompt\nThis is from the cache."
-    
-    # Mock the file exists and was modified recently
-    with patch('os.path.exists', return_value=True), \
-         patch('os.path.getmtime', return_value=time.time() - 3600), \
-         patch('builtins.open', mock_open(read_data=cache_content)):
+    write_cache(cache_content, time.time() - 3600)
+    with patch('httpx.Client') as mock_client:
         result = jina_metaprompt()
-        assert result == cache_content
-        assert "Cached Metaprompt" in result
+    assert result == cache_content
+    mock_client.assert_not_called()
 
 
 def test_jina_metaprompt_fetch_and_cache(mock_response):
     """Test fetching metaprompt and caching it"""
-    # Mock the file doesn't exist or is outdated
-    with patch('os.path.exists', return_value=False), \
-         patch('httpx.Client') as mock_client, \
-         patch('builtins.open', mock_open()) as mock_file:
-        
+    with patch('httpx.Client') as mock_client:
         mock_client.return_value.__enter__.return_value.get.return_value = mock_response
         result = jina_metaprompt()
         
-        assert result == mock_response.text
-        mock_file.assert_called_with("jina-metaprompt.md", "w")
-        mock_file().write.assert_called_once_with(mock_response.text)
+    assert result == mock_response.text
+    assert (user_dir() / metaprompt.CACHE_FILE).read_text() == mock_response.text
+    assert json.loads((user_dir() / metaprompt.META_FILE).read_text())["ETag"] == '"v1"'
+
+
+def test_jina_metaprompt_memoized(mock_response):
+    """Repeated calls are served from memory"""
+    with patch('httpx.Client') as mock_client:
+        mock_client.return_value.__enter__.return_value.get.return_value = mock_response
+        jina_metaprompt()
+        (user_dir() / metaprompt.CACHE_FILE).unlink()
+        assert jina_metaprompt() == mock_response.text
+    assert mock_client.call_count == 1
+
+
+def test_jina_metaprompt_revalidates_with_etag(mock_response):
+    """A stale cache is revalidated and a 304 keeps the cached body"""
+    write_cache("cached body", time.time() - 2 * metaprompt.MAX_AGE, ETag='"v1"')
+    mock_response.status_code = 304
+    with patch('httpx.Client') as mock_client:
+        get = mock_client.return_value.__enter__.return_value.get
+        get.return_value = mock_response
+        assert jina_metaprompt() == "cached body"
+    assert get.call_args.kwargs["headers"] == {"If-None-Match": '"v1"'}
+    meta = json.loads((user_dir() / metaprompt.META_FILE).read_text())
+    assert time.time() - meta["checked_at"] < 60
+
+
+def test_jina_metaprompt_serves_stale_on_error():
+    """A failed refresh falls back to the stale cache"""
+    write_cache("stale body", time.time() - 2 * metaprompt.MAX_AGE)
+    with patch('httpx.Client') as mock_client:
+        mock_client.return_value.__enter__.return_value.get.side_effect = httpx.RequestError("Network error", request=None)
+        assert jina_metaprompt() == "stale body"
 
 
 def test_jina_metaprompt_error_handling():
     """Test error handling when metaprompt can't be fetched or found"""
-    # Mock both remote fetch and cache file access fail
-    with patch('os.path.exists', return_value=False), \
-         patch('httpx.Client') as mock_client:
+    with patch('httpx.Client') as mock_client:
         
         mock_client.return_value.__enter__.return_value.get.side_effect = httpx.RequestError("Network error", request=None)
         
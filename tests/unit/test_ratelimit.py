@@ -0,0 +1,148 @@
+import asyncio
+import io
+import pytest
+import httpx
+import requests
+from unittest.mock import MagicMock
+from llm_jina.client import JinaClient
+from llm_jina.async_client import AsyncJinaClient
+from llm_jina.exceptions import JinaAPIError
+from llm_jina.ratelimit import (
+    TokenBucket, RateLimiter, RateLimit, RetryPolicy, parse_retry_after, endpoint_key
+)
+
+
+class FakeClock:
+    """Manually advanced monotonic clock"""
+
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def response(status, headers=None):
+    """Build a requests.Response with the given status and a small JSON body"""
+    r = requests.Response()
+    r.status_code = status
+    r.raw = io.BytesIO(b'{"ok": true}')
+    r.headers.update(headers or {})
+    r.url = "https://api.jina.ai/v1/rerank"
+    return r
+
+
+@pytest.fixture
+def client():
+    """A JinaClient whose sleeps are recorded instead of performed"""
+    c = JinaClient(retry=RetryPolicy(max_retries=2, backoff=0.1))
+    c.sleep = MagicMock()
+    c.session.post = MagicMock()
+    return c
+
+
+def test_token_bucket_allows_burst_then_waits():
+    """A full bucket serves its capacity, then asks callers to wait"""
+    clock = FakeClock()
+    bucket = TokenBucket(60, clock=clock)
+    assert all(bucket.reserve() == 0 for _ in range(60))
+    assert bucket.reserve() == pytest.approx(1.0)
+    assert bucket.reserve() == pytest.approx(2.0)
+    clock.now += 10
+    assert bucket.reserve() == pytest.approx(0.0)
+
+
+def test_rate_limiter_tpm_budget():
+    """Token budgets are tracked per endpoint"""
+    clock = FakeClock()
+    limiter = RateLimiter({"api.jina.ai/v1/embeddings": RateLimit(tpm=600)}, clock=clock)
+    assert limiter.reserve("https://api.jina.ai/v1/embeddings", tokens=600) == 0
+    assert limiter.reserve("https://api.jina.ai/v1/embeddings", tokens=60) == pytest.approx(6.0)
+    assert limiter.reserve("https://api.jina.ai/v1/rerank", tokens=10000) == 0
+
+
+def test_rate_limiter_pause_is_shared():
+    """A pause applies to every caller of the endpoint"""
+    clock = FakeClock()
+    limiter = RateLimiter(clock=clock)
+    limiter.pause("https://api.jina.ai/v1/rerank", 5)
+    assert limiter.reserve("https://api.jina.ai/v1/rerank") == pytest.approx(5)
+    assert limiter.reserve("https://r.jina.ai/") == 0
+
+
+def test_endpoint_key():
+    """Endpoints are identified by host and path"""
+    assert endpoint_key("https://r.jina.ai/") == "r.jina.ai"
+    assert endpoint_key("https://api.jina.ai/v1/embeddings") == "api.jina.ai/v1/embeddings"
+
+
+def test_parse_retry_after():
+    """Retry-After accepts seconds and HTTP dates"""
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("garbage") is None
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+
+
+def test_retry_policy_backoff_is_bounded():
+    """Backoff is capped and only retryable statuses are retried"""
+    policy = RetryPolicy(backoff=1, max_backoff=4)
+    assert all(0 <= policy.delay(10) <= 4 for _ in range(50))
+    assert policy.delay(0, "7") == 7.0
+    assert not policy.should_retry(0, 400)
+    assert policy.should_retry(0, 503)
+    assert not policy.should_retry(3, 503)
+
+
+def test_post_retries_429_honouring_retry_after(client):
+    """429s are retried after the server-provided delay"""
+    client.session.post.side_effect = [response(429, headers={"Retry-After": "2"}), response(200)]
+    assert client.post("https://api.jina.ai/v1/rerank", data={}) == {"ok": True}
+    assert client.session.post.call_count == 2
+    assert client.sleep.call_args.args[0] == pytest.approx(2, abs=0.1)
+
+
+def test_post_retries_connection_errors(client):
+    """Connection errors are retried, then surfaced as JinaAPIError"""
+    client.session.post.side_effect = requests.exceptions.ConnectionError("reset")
+    with pytest.raises(JinaAPIError):
+        client.post("https://api.jina.ai/v1/rerank", data={})
+    assert client.session.post.call_count == 3
+
+
+def test_post_gives_up_with_status(client):
+    """Exhausted retries raise JinaAPIError carrying the status code"""
+    client.session.post.return_value = response(503)
+    with pytest.raises(JinaAPIError) as excinfo:
+        client.post("https://api.jina.ai/v1/rerank", data={})
+    assert excinfo.value.status_code == 503
+    assert client.session.post.call_count == 3
+
+
+def test_post_does_not_retry_client_errors(client):
+    """4xx errors other than 429 fail immediately"""
+    client.session.post.return_value = response(400)
+    with pytest.raises(JinaAPIError):
+        client.post("https://api.jina.ai/v1/rerank", data={})
+    assert client.session.post.call_count == 1
+
+
+def test_async_post_retries_5xx():
+    """The async client retries transient errors too"""
+    statuses = [502, 200]
+
+    def handler(request):
+        return httpx.Response(statuses.pop(0), json={"ok": True})
+
+    async def no_sleep(seconds):
+        pass
+
+    async def main():
+        client = AsyncJinaClient(retry=RetryPolicy(max_retries=1))
+        client.http = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        client.sleep = no_sleep
+        async with client:
+            return await client.post("https://api.jina.ai/v1/rerank", data={})
+
+    assert asyncio.run(main()) == {"ok": True}
+    assert statuses == []
@@ -0,0 +1,117 @@
+import json
+import threading
+import time
+import pytest
+from collections import Counter
+from unittest.mock import patch
+from click.testing import CliRunner
+from llm_jina import reader
+from llm_jina.commands import cli
+from llm_jina.concurrency import iter_by_key
+from llm_jina.exceptions import JinaAPIError
+
+
+def test_normalize_url():
+    """Scheme, host case, default ports and fragments are canonicalised"""
+    assert reader.normalize_url(" Example.COM ") == "https://example.com/"
+    assert reader.normalize_url("HTTPS://Example.com:443/a?b=1#frag") == "https://example.com/a?b=1"
+    assert reader.normalize_url("http://example.com:8080/x") == "http://example.com:8080/x"
+    assert reader.normalize_url("http://[::1]:8080/x") == "http://[::1]:8080/x"
+    assert reader.normalize_url("https://[2001:DB8::1]:443") == "https://[2001:db8::1]/"
+    with pytest.raises(ValueError):
+        reader.normalize_url("http://example.com:abc/")
+
+
+def test_normalize_urls_dedupes_in_order():
+    """Duplicates, blanks and comments are dropped; order is kept"""
+    urls = ["b.com", "", "# note", "https://a.com/", "B.com/#top", "a.com"]
+    assert reader.normalize_urls(urls) == ["https://b.com/", "https://a.com/"]
+
+
+def test_iter_by_key_limits_per_key():
+    """No key ever has more than per_key calls in flight"""
+    lock = threading.Lock()
+    active = Counter()
+    peak = Counter()
+
+    def work(item):
+        with lock:
+            active[item[0]] += 1
+            peak[item[0]] = max(peak[item[0]], active[item[0]])
+        time.sleep(0.01)
+        with lock:
+            active[item[0]] -= 1
+        return item
+
+    items = [("a", i) for i in range(6)] + [("b", i) for i in range(6)]
+    results = list(iter_by_key(work, items, key=lambda i: i[0], max_workers=4, per_key=2))
+    assert sorted(r for _, r, _ in results) == sorted(items)
+    assert peak["a"] <= 2 and peak["b"] <= 2
+
+
+def test_iter_by_key_min_interval():
+    """Calls for one key are spaced by min_interval"""
+    starts = []
+    list(iter_by_key(lambda i: starts.append(time.monotonic()), [1, 2, 3],
+                     key=lambda i: "k", max_workers=3, per_key=3, min_interval=0.05))
+    gaps = [b - a for a, b in zip(starts, starts[1:])]
+    assert all(gap >= 0.04 for gap in gaps)
+
+
+def test_iter_by_key_rejects_empty_limits():
+    """A zero limit could never start a call"""
+    with pytest.raises(ValueError):
+        list(iter_by_key(str, [1], key=str, max_workers=1, per_key=0))
+    with pytest.raises(ValueError):
+        list(iter_by_key(str, [1], key=str, max_workers=0))
+
+
+def test_read_many_records_failures():
+    """A failing URL is reported without aborting the run"""
+    def fake_read(url, return_format="markdown", **kwargs):
+        if "bad" in url:
+            raise JinaAPIError("nope", status_code=451)
+        return {"data": {"url": url}}
+
+    with patch.object(reader, "read", side_effect=fake_read):
+        records = {r["url"]: r for r in reader.read_many(["good.com", "bad.com", "good.com"])}
+    assert set(records) == {"https://good.com/", "https://bad.com/"}
+    assert records["https://good.com/"]["ok"] is True
+    assert records["https://bad.com/"] == {
+        "url": "https://bad.com/", "ok": False, "error": "nope", "status_code": 451
+    }
+
+
+def test_read_many_records_invalid_urls():
+    """A malformed URL becomes a failure record instead of aborting the run"""
+    with patch.object(reader, "read", return_value={"data": "x"}):
+        records = list(reader.read_many(["http://example.com:abc/", "good.com"]))
+    assert records[0]["url"] == "http://example.com:abc/"
+    assert records[0]["ok"] is False and records[0]["status_code"] is None
+    assert records[1] == {"url": "https://good.com/", "ok": True, "data": {"data": "x"}}
+
+
+def test_read_cli_from_file(tmp_path):
+    """read --from-file streams one JSON line per URL"""
+    url_file = tmp_path / "urls.txt"
+    url_file.write_text("a.com\nb.com\na.com\n")
+    with patch.object(reader, "read", return_value={"data": "x"}):
+        result = CliRunner().invoke(cli, ["read", "--from-file", str(url_file)])
+    assert result.exit_code == 0
+    rows = [json.loads(line) for line in result.output.splitlines() if line.startswith("{")]
+    assert sorted(r["url"] for r in rows) == ["https://a.com/", "https://b.com/"]
+    assert "0 failed" in result.output
+
+
+def test_read_cli_requires_url():
+    """read needs a URL or a file"""
+    result = CliRunner().invoke(cli, ["read"])
+    assert result.exit_code != 0
+
+
+def test_read_cli_rejects_zero_per_domain(tmp_path):
+    """--per-domain 0 is refused rather than hanging"""
+    url_file = tmp_path / "urls.txt"
+    url_file.write_text("a.com\n")
+    result = CliRunner().invoke(cli, ["read", "--from-file", str(url_file), "--per-domain", "0"])
+    assert result.exit_code == 2
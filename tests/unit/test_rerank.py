@@ -0,0 +1,102 @@
+import json
+import threading
+from unittest.mock import patch
+from click.testing import CliRunner
+from llm_jina import rerank as rerank_module
+from llm_jina.commands import cli
+
+
+def fake_rerank(calls=None):
+    """Reranker double scoring each document by its numeric value"""
+    lock = threading.Lock()
+
+    def rerank(query, documents, model="m", top_n=None, return_documents=True):
+        if calls is not None:
+            with lock:
+                calls.append(list(documents))
+        results = sorted(
+            ({"index": i, "relevance_score": float(doc)} for i, doc in enumerate(documents)),
+            key=lambda r: -r["relevance_score"],
+        )
+        return {"model": model, "usage": {"total_tokens": len(documents)},
+                "results": results[:top_n] if top_n else results}
+    return rerank
+
+
+def test_rerank_sharded_global_top_n():
+    """The global top_n is merged from all shards with original indices"""
+    documents = [str(v) for v in [5, 1, 9, 3, 7, 2, 8, 6, 4, 0]]
+    calls = []
+    with patch.object(rerank_module, "rerank", side_effect=fake_rerank(calls)):
+        result = rerank_module.rerank_sharded("q", documents, top_n=3, shard_size=3)
+    assert [r["index"] for r in result["results"]] == [2, 6, 4]
+    assert [r["document"]["text"] for r in result["results"]] == ["9", "8", "7"]
+    assert result["usage"]["total_tokens"] == 10
+    assert sorted(len(c) for c in calls) == [1, 3, 3, 3]
+
+
+def test_rerank_sharded_without_top_n_ranks_everything():
+    """Without top_n every document is ranked"""
+    documents = ["1", "3", "2", "3"]
+    with patch.object(rerank_module, "rerank", side_effect=fake_rerank()):
+        result = rerank_module.rerank_sharded("q", documents, shard_size=2, return_documents=False)
+    assert [r["index"] for r in result["results"]] == [1, 3, 2, 0]
+    assert "document" not in result["results"][0]
+
+
+def test_rerank_cli_shards_large_sets(tmp_path):
+    """The CLI shards document files larger than --shard-size"""
+    docs = tmp_path / "docs.txt"
+    docs.write_text("\n".join(str(i) for i in range(10)) + "\n")
+    with patch.object(rerank_module, "rerank", side_effect=fake_rerank()) as mock_rerank:
+        result = CliRunner().invoke(cli, ["rerank", "q", "--from-file", str(docs),
+                                          "--shard-size", "4", "--top-n", "2"])
+    assert result.exit_code == 0
+    assert [r["index"] for r in json.loads(result.output)["results"]] == [9, 8]
+    assert mock_rerank.call_count == 3
+
+
+def test_rerank_cli_requires_documents():
+    """Documents must be given somehow"""
+    result = CliRunner().invoke(cli, ["rerank", "q"])
+    assert result.exit_code != 0
+
+
+def test_cascade_rerank_passes_survivors_to_second_model():
+    """Only first-stage survivors reach the expensive model"""
+    documents = [str(v) for v in [5, 1, 9, 3, 7]]
+    calls = []
+    with patch.object(rerank_module, "rerank", side_effect=fake_rerank(calls)):
+        result = rerank_module.cascade_rerank("q", documents, model="big", first_model="small",
+                                              survivors=3, top_n=2)
+    assert calls[1] == ["9", "7", "5"]
+    assert [r["index"] for r in result["results"]] == [2, 4]
+    assert result["results"][0]["stage_scores"] == {"first": 9.0, "second": 9.0}
+    assert [s["model"] for s in result["stages"]] == ["small", "big"]
+    assert [s["documents"] for s in result["stages"]] == [5, 3]
+    assert result["usage"]["total_tokens"] == 8
+
+
+def test_cascade_rerank_same_model_and_few_documents():
+    """Stage scores stay apart when both stages use one model; too few documents skip stage one"""
+    calls = []
+    with patch.object(rerank_module, "rerank", side_effect=fake_rerank(calls)):
+        result = rerank_module.cascade_rerank("q", ["5", "1", "9"], model="m", first_model="m", survivors=2)
+    assert set(result["results"][0]["stage_scores"]) == {"first", "second"}
+
+    calls = []
+    with patch.object(rerank_module, "rerank", side_effect=fake_rerank(calls)):
+        result = rerank_module.cascade_rerank("q", ["5", "1", "9"], model="big", first_model="small", survivors=3)
+    assert calls == [["5", "1", "9"]]
+    assert [s["model"] for s in result["stages"]] == ["big"]
+    assert result["results"][0] == {"index": 2, "relevance_score": 9.0, "stage_scores": {"second": 9.0},
+                                    "document": {"text": "9"}}
+
+
+def test_rerank_cli_cascade_reports_stages():
+    """--cascade prints per-stage timings"""
+    with patch.object(rerank_module, "rerank", side_effect=fake_rerank()):
+        result = CliRunner().invoke(cli, ["rerank", "q", "1", "2", "3", "--cascade", "--survivors", "2"])
+    assert result.exit_code == 0
+    assert "jina-reranker-v1-turbo-en: 3 documents" in result.output
+    assert "jina-reranker-v2-base-multilingual: 2 documents" in result.output
@@ -0,0 +1,85 @@
+import io
+import json
+import re
+import time
+import pytest
+from unittest.mock import patch
+from click.testing import CliRunner
+from llm_jina import segmenter
+from llm_jina.commands import cli
+from llm_jina.concurrency import iter_ordered
+
+
+def sentence_spans(text):
+    """Split after every '. ' the way a sentence segmenter would"""
+    starts = [0] + [m.end() for m in re.finditer(r"\. ", text)]
+    ends = starts[1:] + [len(text)]
+    return [[s, e] for s, e in zip(starts, ends) if s < e]
+
+
+def fake_segment(content, return_chunks=False, **kwargs):
+    spans = sentence_spans(content)
+    return {"chunks": [content[s:e] for s, e in spans], "chunk_positions": spans}
+
+
+TEXT = "".join(f"Sentence number {i} has {'x' * (i % 7)} words. " for i in range(200))
+
+
+def test_iter_windows_overlap():
+    """Windows overlap by the requested amount and cover the whole stream"""
+    windows = list(segmenter.iter_windows(io.StringIO("abcdefghij"), window_size=4, overlap=1))
+    assert windows == [(0, "abcd"), (3, "defg"), (6, "ghij")]
+
+
+@pytest.mark.parametrize("window_size,overlap", [(300, 100), (500, 120), (10000, 100)])
+def test_segment_stream_stitches_windows(window_size, overlap):
+    """Stitched chunks match segmenting the whole text at once"""
+    with patch.object(segmenter, "segment", side_effect=fake_segment):
+        chunks = list(segmenter.segment_stream(io.StringIO(TEXT), window_size=window_size, overlap=overlap))
+    assert [(c["start"], c["end"]) for c in chunks] == [tuple(s) for s in sentence_spans(TEXT)]
+    assert all(TEXT[c["start"]:c["end"]] == c["chunk"] for c in chunks)
+
+
+def test_segment_stream_without_positions():
+    """Chunk offsets are recovered from the text when positions are missing"""
+    def no_positions(content, **kwargs):
+        return {"chunks": fake_segment(content)["chunks"]}
+
+    with patch.object(segmenter, "segment", side_effect=no_positions):
+        chunks = list(segmenter.segment_stream(io.StringIO(TEXT), window_size=400, overlap=100))
+    assert "".join(c["chunk"] for c in chunks) == TEXT
+
+
+def test_iter_ordered_is_ordered_and_lazy():
+    """Results come back in input order with bounded read-ahead"""
+    consumed = []
+
+    def items():
+        for i in range(10):
+            consumed.append(i)
+            yield i
+
+    def slow(i):
+        time.sleep(0.01 * (i % 3))
+        return i * 2
+
+    results = iter_ordered(slow, items(), max_workers=3)
+    assert next(results) == (0, 0)
+    assert len(consumed) <= 4
+    assert [r for _, r in results] == [i * 2 for i in range(1, 10)]
+
+
+def test_segment_cli_file_streams_jsonl(tmp_path):
+    """segment --file prints one chunk per line"""
+    path = tmp_path / "doc.txt"
+    path.write_text(TEXT[:2000])
+    with patch.object(segmenter, "segment", side_effect=fake_segment):
+        result = CliRunner().invoke(cli, ["segment", "--file", str(path), "--window-size", "500", "--overlap", "100"])
+    assert result.exit_code == 0, result.output
+    chunks = [json.loads(line) for line in result.output.splitlines()]
+    assert "".join(c["chunk"] for c in chunks) == TEXT[:2000]
+
+
+def test_segment_stream_rejects_return_chunks():
+    with pytest.raises(ValueError):
+        list(segmenter.segment_stream(io.StringIO("text"), return_chunks=False))
@@ -0,0 +1,121 @@
+import asyncio
+import io
+import json
+import httpx
+import pytest
+from unittest.mock import patch
+from click.testing import CliRunner
+from llm_jina import telemetry
+from llm_jina.async_client import AsyncJinaClient
+from llm_jina.client import JinaClient
+from llm_jina.commands import cli
+from llm_jina.exceptions import JinaAPIError
+from llm_jina.ratelimit import NO_RETRY
+from llm_jina.telemetry import UsageRecorder, parse_duration, percentile
+
+
+def test_percentile_nearest_rank():
+    """Percentiles use the nearest-rank method"""
+    values = list(range(1, 101))
+    assert percentile(values, 0.5) == 50
+    assert percentile(values, 0.99) == 99
+    assert percentile([7], 0.95) == 7
+    assert percentile([], 0.5) is None
+
+
+def test_parse_duration():
+    """Durations accept s/m/h/d suffixes"""
+    assert parse_duration("90") == 90
+    assert parse_duration("15m") == 900
+    assert parse_duration("7d") == 7 * 86400
+    with pytest.raises(ValueError):
+        parse_duration("soon")
+
+
+def test_client_records_usage(tmp_path, make_response):
+    """Successful and failed requests are recorded with tokens, bytes and status"""
+    recorder = UsageRecorder(tmp_path / "usage.db", flush_interval=60)
+    client = JinaClient(telemetry=recorder, retry=NO_RETRY)
+    responses = [make_response(200, {"usage": {"total_tokens": 12}, "results": []}), make_response(500, {})]
+    with patch.object(client.session, "post", side_effect=responses):
+        client.post("https://api.jina.ai/v1/rerank", {"model": "m", "query": "q"})
+        with pytest.raises(JinaAPIError):
+            client.post("https://api.jina.ai/v1/rerank", {"model": "m", "query": "other"})
+    rows = recorder.rows()
+    assert [(r[1], r[2], r[3], r[6]) for r in rows] == [
+        ("api.jina.ai/v1/rerank", "m", 200, 12),
+        ("api.jina.ai/v1/rerank", "m", 500, None),
+    ]
+    assert rows[0][4] == len(b'{"model": "m"}')
+    recorder.close()
+
+
+SSE_BODY = (b'data: {"choices": [{"delta": {"content": "hi"}}]}\n\n'
+            b'data: {"choices": [], "usage": {"total_tokens": 321}}\n\n'
+            b'data: [DONE]\n\n')
+
+
+def test_post_stream_records_usage(tmp_path, make_response):
+    """Streamed calls are recorded with bytes received and tokens from the last event"""
+    recorder = UsageRecorder(tmp_path / "usage.db", flush_interval=60)
+    client = JinaClient(telemetry=recorder, retry=NO_RETRY)
+    response = make_response(200, {})
+    response.raw = io.BytesIO(SSE_BODY)
+    with patch.object(client.session, "post", return_value=response):
+        list(client.post_stream("https://deepsearch.jina.ai/v1/chat/completions", {"model": "ds"}))
+    [row] = recorder.rows()
+    assert (row[1], row[2], row[3], row[5], row[6]) == (
+        "deepsearch.jina.ai/v1/chat/completions", "ds", 200, len(SSE_BODY), 321)
+    recorder.close()
+
+
+def test_async_post_stream_records_usage(tmp_path):
+    """The async client records streamed calls too"""
+    recorder = UsageRecorder(tmp_path / "usage.db", flush_interval=60)
+
+    async def run():
+        client = AsyncJinaClient(telemetry=recorder, retry=NO_RETRY)
+        client.http = httpx.AsyncClient(
+            transport=httpx.MockTransport(lambda request: httpx.Response(200, content=SSE_BODY)),
+            headers=client.http.headers)
+        async with client:
+            return [line async for line in client.post_stream("https://deepsearch.jina.ai/v1/chat/completions",
+                                                              {"model": "ds"})]
+
+    asyncio.run(run())
+    [row] = recorder.rows()
+    assert (row[3], row[5], row[6]) == (200, len(SSE_BODY), 321)
+    recorder.close()
+
+
+def test_stats_summarise_per_endpoint(tmp_path):
+    """stats reports counts, errors, percentiles and tokens per endpoint"""
+    recorder = UsageRecorder(tmp_path / "usage.db")
+    for i in range(10):
+        recorder.record("https://api.jina.ai/v1/embeddings", "m", 200, 10, 100, 5, (i + 1) / 1000)
+    recorder.record("https://r.jina.ai/", None, 429, 10, 0, None, 0.5)
+    summaries = {s["endpoint"]: s for s in recorder.stats()}
+    embeddings = summaries["api.jina.ai/v1/embeddings"]
+    assert embeddings["requests"] == 10
+    assert embeddings["p50_ms"] == 5.0
+    assert embeddings["p99_ms"] == 10.0
+    assert embeddings["tokens"] == 50
+    assert summaries["r.jina.ai"]["errors"] == 1
+    recorder.close()
+
+
+def test_stats_cli(tmp_path):
+    """llm jina stats prints the summaries as JSON"""
+    recorder = UsageRecorder()
+    recorder.record("https://s.jina.ai/", None, 200, 1, 2, 3, 0.1)
+    recorder.close()
+    result = CliRunner().invoke(cli, ["stats", "--since", "1h", "--by", "hour"])
+    assert result.exit_code == 0, result.output
+    [summary] = json.loads(result.output)
+    assert summary["endpoint"] == "s.jina.ai"
+    assert summary["window_start"].endswith("Z")
+
+
+def test_telemetry_opt_out():
+    """LLM_JINA_TELEMETRY=0 disables the shared recorder"""
+    assert telemetry.get_recorder() is None
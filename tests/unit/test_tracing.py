@@ -0,0 +1,165 @@
+import asyncio
+import json
+import threading
+import httpx
+import pytest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+from click.testing import CliRunner
+from llm_jina import tracing
+from llm_jina.async_client import AsyncJinaClient
+from llm_jina.client import JinaClient, close_clients
+from llm_jina.commands import cli
+from llm_jina.exceptions import JinaAPIError
+from llm_jina.ratelimit import NO_RETRY
+from llm_jina.tracing import RequestTrace, TimingCollector
+
+
+@pytest.fixture(autouse=True)
+def no_global_tracer():
+    """Every test starts without a process-wide tracer"""
+    previous = tracing.set_tracer(None)
+    close_clients()
+    yield
+    tracing.set_tracer(previous)
+    close_clients()
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        status = 500 if self.path == "/fail" else 200
+        body = json.dumps({"results": [{"index": 0, "relevance_score": 0.5}]}).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def server_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+def test_client_traces_phases_and_sizes(server_url):
+    """Connect time is recorded for a new connection only; wait, download and decode always"""
+    collector = TimingCollector()
+    with JinaClient(tracer=collector, retry=NO_RETRY, coalesce=False) as client:
+        client.post(f"{server_url}/v1/rerank", {"model": "m", "query": "a"})
+        client.post(f"{server_url}/v1/rerank", {"model": "m", "query": "b"})
+    first, second = collector.traces
+    assert first.endpoint.endswith("/v1/rerank")
+    assert first.model == "m" and first.status == 200 and first.attempts == 1
+    assert "connect" in first.phases and "connect" not in second.phases
+    for trace in (first, second):
+        assert {"wait", "download", "decode"} <= set(trace.phases)
+        assert trace.bytes_out == len(b'{"model":"m","query":"a"}')
+        assert trace.bytes_in > 0
+        assert trace.duration >= sum(trace.phases.values()) * 0.9
+
+
+def test_client_traces_errors(server_url):
+    """Failed requests are traced with their status and error"""
+    collector = TimingCollector()
+    with JinaClient(tracer=collector, retry=NO_RETRY) as client:
+        with pytest.raises(JinaAPIError):
+            client.post(f"{server_url}/fail", {"model": "m"})
+    trace, = collector.traces
+    assert trace.status == 500
+    assert "500" in trace.error
+    assert collector.summary()[0]["errors"] == 1
+
+
+def test_untraced_requests_are_not_streamed(make_response):
+    """Without a tracer the client sends exactly as before"""
+    client = JinaClient(retry=NO_RETRY)
+    with patch.object(client.session, "post", return_value=make_response(200, {"results": []})) as post:
+        client.post("https://api.jina.ai/v1/rerank", {"model": "m"})
+    assert post.call_args.kwargs["stream"] is False
+
+
+def test_global_tracer_applies_to_existing_clients(make_response):
+    """set_tracer takes effect for clients created before it"""
+    client = JinaClient(retry=NO_RETRY)
+    collector = TimingCollector()
+    assert tracing.set_tracer(collector) is None
+    with patch.object(client.session, "post", return_value=make_response(200, {"results": []})):
+        client.post("https://api.jina.ai/v1/rerank", {"model": "m"})
+    assert [t.endpoint for t in collector.traces] == ["api.jina.ai/v1/rerank"]
+
+
+def test_async_client_traces_phases():
+    """The async client records the same phases through httpx"""
+    collector = TimingCollector()
+
+    def handler(request):
+        return httpx.Response(200, json={"results": []})
+
+    async def run():
+        client = AsyncJinaClient(tracer=collector, retry=NO_RETRY)
+        client.http = httpx.AsyncClient(transport=httpx.MockTransport(handler), headers=client.http.headers)
+        async with client:
+            return await client.post("https://api.jina.ai/v1/rerank", {"model": "m"})
+
+    assert asyncio.run(run()) == {"results": []}
+    trace, = collector.traces
+    assert trace.status == 200
+    assert {"queue", "wait", "download", "decode"} <= set(trace.phases)
+    assert trace.bytes_in == len(b'{"results":[]}')
+
+
+def test_timing_collector_summary():
+    """Phases are averaged over every request to an endpoint"""
+    collector = TimingCollector()
+    for wait in (0.010, 0.030):
+        trace = RequestTrace("https://api.jina.ai/v1/embeddings", "m")
+        trace.add("wait", wait)
+        trace.finish(200, 10, 20)
+        collector.record(trace)
+    summary, = collector.summary()
+    assert summary["requests"] == 2
+    assert summary["mean_phases_ms"] == {"wait": 20.0}
+    assert summary["bytes_out"] == 20 and summary["bytes_in"] == 40
+    assert "api.jina.ai/v1/embeddings" in collector.format()
+    assert TimingCollector().format() == "No API requests were made."
+
+
+def test_cli_trace_prints_breakdown(make_response):
+    """--trace on the group prints the breakdown and removes the tracer afterwards"""
+    with patch("requests.Session.post", return_value=make_response(200, {"results": []})):
+        result = CliRunner().invoke(cli, ["--trace", "rerank", "query", "doc"])
+    assert result.exit_code == 0, result.output
+    assert "api.jina.ai/v1/rerank" in result.output
+    assert "download" in result.output
+    assert tracing.get_tracer() is None
+
+
+def test_opentelemetry_tracer_exports_spans():
+    """Each request becomes a client span with a child span per phase"""
+    pytest.importorskip("opentelemetry.sdk")
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+    from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+
+    exporter = InMemorySpanExporter()
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    trace = RequestTrace("https://api.jina.ai/v1/rerank", "m")
+    trace.add("wait", 0.01)
+    trace.add("decode", 0.001)
+    trace.finish(200, 10, 20)
+    tracing.OpenTelemetryTracer(provider).record(trace)
+    spans = {span.name: span for span in exporter.get_finished_spans()}
+    assert set(spans) == {"POST api.jina.ai/v1/rerank", "wait", "decode"}
+    assert spans["POST api.jina.ai/v1/rerank"].attributes["http.response.status_code"] == 200
+    assert spans["wait"].parent.span_id == spans["POST api.jina.ai/v1/rerank"].context.span_id
@@ -0,0 +1,152 @@
+import asyncio
+import gzip
+import json
+import threading
+import httpx
+import pytest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from llm_jina import codec
+from llm_jina.async_client import AsyncJinaClient
+from llm_jina.client import JinaClient
+from llm_jina.exceptions import JinaAPIError
+from llm_jina.ratelimit import NO_RETRY
+from llm_jina.tracing import TimingCollector
+
+
+class EchoHandler(BaseHTTPRequestHandler):
+    """Replies with what it received: the Content-Encoding, wire size and decoded body"""
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        raw = self.rfile.read(int(self.headers["Content-Length"]))
+        encoding = self.headers.get("Content-Encoding")
+        if encoding == "gzip":
+            body = gzip.decompress(raw)
+        elif encoding == "br":
+            import brotli
+            body = brotli.decompress(raw)
+        else:
+            body = raw
+        if self.path == "/stream":
+            payload = b"data: one\n\ndata: two\n\n"
+            content_type = "text/event-stream"
+        else:
+            payload = json.dumps({"encoding": encoding, "wire": len(raw), "data": [json.loads(body)]}).encode()
+            content_type = "application/json"
+        self.send_response(500 if self.path == "/fail" else 200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+@pytest.fixture
+def server_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), EchoHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+LARGE = {"model": "m", "input": ["the same sentence again and again"] * 100}
+
+
+def test_compress_gzip_is_deterministic():
+    """gzip output depends only on the input, and round-trips"""
+    body = codec.dumps(LARGE)
+    assert codec.compress(body, "gzip") == codec.compress(body, "gzip")
+    assert gzip.decompress(codec.compress(body, "gzip")) == body
+    with pytest.raises(ValueError):
+        codec.compress(body, "zip")
+
+
+def test_compress_brotli():
+    """Brotli bodies round-trip"""
+    brotli = pytest.importorskip("brotli")
+    body = codec.dumps(LARGE)
+    assert brotli.decompress(codec.compress(body, "br")) == body
+
+
+@pytest.mark.parametrize("transport", ["requests", "httpx"])
+def test_request_compression(server_url, transport):
+    """Large bodies are sent compressed with Content-Encoding; small ones are not"""
+    with JinaClient(transport=transport, compress="gzip", retry=NO_RETRY) as client:
+        large = client.post(f"{server_url}/v1/embeddings", LARGE)
+        small = client.post(f"{server_url}/v1/embeddings", {"model": "m", "input": ["hi"]})
+    assert large["encoding"] == "gzip"
+    assert large["data"] == [LARGE]
+    assert large["wire"] < len(codec.dumps(LARGE)) / 5
+    assert small["encoding"] is None
+
+
+def test_httpx_transport_matches_requests(server_url):
+    """post, post_iter and post_stream behave the same over httpx"""
+    with JinaClient(transport="httpx", retry=NO_RETRY) as client:
+        assert client.post(f"{server_url}/v1/rerank", {"q": 1})["data"] == [{"q": 1}]
+        envelope = {}
+        assert list(client.post_iter(f"{server_url}/v1/embeddings", {"q": 2}, envelope=envelope)) == [{"q": 2}]
+        assert envelope["encoding"] is None
+        lines = [line for line in client.post_stream(f"{server_url}/stream", {"q": 3}) if line]
+        assert lines == ["data: one", "data: two"]
+        with pytest.raises(JinaAPIError) as error:
+            client.post(f"{server_url}/fail", {"q": 4})
+        assert error.value.status_code == 500
+
+
+def test_httpx_transport_connection_errors():
+    """Connection failures surface as JinaAPIError"""
+    with JinaClient(transport="httpx", retry=NO_RETRY) as client:
+        with pytest.raises(JinaAPIError):
+            client.post("http://127.0.0.1:9/v1/rerank", {"q": 1})
+
+
+def test_httpx_transport_traces_connect(server_url):
+    """Connection setup is traced through httpcore events"""
+    collector = TimingCollector()
+    with JinaClient(transport="httpx", tracer=collector, retry=NO_RETRY) as client:
+        client.post(f"{server_url}/v1/rerank", {"q": 1})
+    trace, = collector.traces
+    assert {"connect", "wait", "download", "decode"} <= set(trace.phases)
+    assert trace.bytes_out == len(b'{"q":1}')
+
+
+def test_transport_options_validated():
+    """HTTP/2 needs httpx, and only known compressions are accepted"""
+    with pytest.raises(ValueError):
+        JinaClient(transport="requests", http2=True)
+    with pytest.raises(ValueError):
+        JinaClient(transport="urllib")
+    with pytest.raises(ValueError):
+        JinaClient(compress="zip")
+
+
+def test_http2_from_environment(monkeypatch):
+    """LLM_JINA_HTTP2=1 selects the httpx transport with HTTP/2"""
+    pytest.importorskip("h2")
+    monkeypatch.setenv("LLM_JINA_HTTP2", "1")
+    monkeypatch.setenv("LLM_JINA_COMPRESS", "gzip")
+    with JinaClient() as client:
+        assert client.transport == "httpx"
+        assert client.session.http2
+        assert client.compress == "gzip"
+
+
+def test_async_request_compression():
+    """The async client compresses large bodies too"""
+    seen = []
+
+    def handler(request):
+        seen.append((request.headers.get("Content-Encoding"), json.loads(gzip.decompress(request.content))))
+        return httpx.Response(200, json={"ok": True})
+
+    async def run():
+        client = AsyncJinaClient(compress="gzip", retry=NO_RETRY)
+        client.http = httpx.AsyncClient(transport=httpx.MockTransport(handler), headers=client.http.headers)
+        async with client:
+            return await client.post("https://api.jina.ai/v1/embeddings", LARGE)
+
+    assert asyncio.run(run()) == {"ok": True}
+    assert seen == [("gzip", LARGE)]